@@ -0,0 +1,82 @@
+"""Micro-benchmark: per-call overhead slick adds on top of the provider call.
+
+Runs a decorated step against the offline `fake` provider (zero latency, no network)
+and compares it with invoking the same fake model directly with an already-rendered
+prompt, so the difference is the cost of argument binding, template rendering, client
+lookup and output parsing.
+
+Usage:
+    poetry run python benchmarks/bench_overhead.py [--calls 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Dict
+
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel
+
+from slick import llm_step
+from slick.providers.fake import FakeChatModel
+
+RESPONSE = '{"summary": "ok"}'
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+def _per_call_us(fn: Callable[[], Any], calls: int) -> float:
+    for _ in range(min(calls, 50)):  # warm up pools, chains and compiled templates
+        fn()
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def measure(calls: int) -> Dict[str, float]:
+    """Microseconds per call for the raw fake model and for decorated steps."""
+
+    @llm_step(model="fake", responses=[RESPONSE])
+    def summarize_text(text: str) -> str:
+        """
+        Summarize the following text in one sentence.
+        Text: {{ text }}
+        """
+
+    @llm_step(model="fake", responses=[RESPONSE])
+    def summarize_model(text: str) -> Answer:
+        """
+        Summarize the following text in one sentence.
+        Text: {{ text }}
+        """
+
+    raw = FakeChatModel(responses=[RESPONSE])
+    messages = [HumanMessage(content="Summarize the following text in one sentence.\nText: hi")]
+
+    return {
+        "provider_call_us": _per_call_us(lambda: raw.invoke(messages), calls),
+        "llm_step_str_us": _per_call_us(lambda: summarize_text("hi"), calls),
+        "llm_step_model_us": _per_call_us(lambda: summarize_model("hi"), calls),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = measure(args.calls)
+    baseline = result["provider_call_us"]
+    text_step = result["llm_step_str_us"]
+    model_step = result["llm_step_model_us"]
+    print(f"provider call (fake)      {baseline:8.1f} us/call")
+    print(f"llm_step -> str           {text_step:8.1f} us/call  (+{text_step - baseline:.1f})")
+    print(f"llm_step -> BaseModel     {model_step:8.1f} us/call  (+{model_step - baseline:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Offline benchmark suite for slick, run against the `fake` provider.
+
+Benchmarks:
+    overhead     per-call cost of a decorated step over the raw (zero-latency) model
+    import       wall time of `import slick` in a fresh interpreter
+    throughput   requests/s for sequential calls, `fn.batch` (threads) and `fn.abatch`
+    batch        `fn.abatch` throughput as max_concurrency grows (fixed 20 ms latency)
+    streaming    first-token and total latency of `fn.stream` / `fn.astream`
+
+Results are printed as a summary and, with --json, written as one JSON document
+(environment metadata plus one object per benchmark) for tracking over time.
+
+Usage:
+    poetry run python benchmarks/suite.py [--quick] [--only overhead,batch] [--json out.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_overhead  # noqa: E402
+
+import slick  # noqa: E402
+from slick import llm_step, llm_step_async  # noqa: E402
+
+# Fixed provider latency for the throughput and batch benchmarks.
+LATENCY = 0.02
+
+
+def bench_overhead_(quick: bool) -> Dict[str, Any]:
+    result = bench_overhead.measure(200 if quick else 2000)
+    base = result["provider_call_us"]
+    result["overhead_str_us"] = result["llm_step_str_us"] - base
+    result["overhead_model_us"] = result["llm_step_model_us"] - base
+    return result
+
+
+def bench_import(quick: bool) -> Dict[str, Any]:
+    code = "import time; t = time.perf_counter(); import slick; print(time.perf_counter() - t)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.getenv("PYTHONPATH")])))
+    samples = []
+    for _ in range(3 if quick else 10):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+        samples.append(float(out.stdout.strip()) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "runs": len(samples)}
+
+
+def _steps(**llm_kwargs: Any):
+    @llm_step(model="fake", **llm_kwargs)
+    def echo(i: int) -> str:
+        """
+        Repeat the number {{ i }}.
+        """
+
+    @llm_step_async(model="fake", **llm_kwargs)
+    async def aecho(i: int) -> str:
+        """
+        Repeat the number {{ i }}.
+        """
+
+    return echo, aecho
+
+
+def _rate(count: int, fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def bench_throughput(quick: bool) -> Dict[str, Any]:
+    n = 64 if quick else 256
+    echo, aecho = _steps(latency=LATENCY, response_tokens=8)
+    seq_n = max(8, n // 8)
+    return {
+        "requests": n,
+        "latency_s": LATENCY,
+        "sequential_rps": _rate(seq_n, lambda: [echo(i) for i in range(seq_n)]),
+        "batch_threads_rps": _rate(n, lambda: echo.batch(range(n), max_concurrency=32)),
+        "abatch_rps": _rate(n, lambda: asyncio.run(aecho.abatch(range(n), max_concurrency=32))),
+        "gather_rps": _rate(n, lambda: asyncio.run(_gather(aecho, n))),
+    }
+
+
+async def _gather(step: Any, n: int) -> List[Any]:
+    return await asyncio.gather(*(step(i) for i in range(n)))
+
+
+def bench_batch(quick: bool) -> Dict[str, Any]:
+    n = 64 if quick else 256
+    _, aecho = _steps(latency=LATENCY, response_tokens=8)
+    rows = []
+    for concurrency in (1, 4, 16, 64) if not quick else (1, 8, 32):
+        count = min(n, concurrency * 8)
+        rps = _rate(count, lambda: asyncio.run(aecho.abatch(range(count), max_concurrency=concurrency)))
+        ideal = concurrency / LATENCY
+        rows.append({"max_concurrency": concurrency, "requests": count, "rps": rps, "efficiency": rps / ideal})
+    return {"latency_s": LATENCY, "levels": rows}
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": ordered[-1]}
+
+
+def bench_streaming(quick: bool) -> Dict[str, Any]:
+    runs = 10 if quick else 40
+    latency, rate = 0.02, 500.0
+    echo, aecho = _steps(latency=latency, chunk_rate=rate, response_tokens=16)
+
+    def sync_once(i: int) -> tuple:
+        start = time.perf_counter()
+        first = None
+        for _ in echo.stream(i):
+            if first is None:
+                first = time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    async def async_once(i: int) -> tuple:
+        start = time.perf_counter()
+        first = None
+        async for _ in aecho.astream(i):
+            if first is None:
+                first = time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    sync = [sync_once(i) for i in range(runs)]
+    asynchronous = [asyncio.run(async_once(i)) for i in range(runs)]
+    out: Dict[str, Any] = {"latency_s": latency, "chunk_rate": rate, "runs": runs}
+    for name, samples in (("stream", sync), ("astream", asynchronous)):
+        ttft = [s[0] * 1000 for s in samples]
+        out[name] = {
+            "ttft_ms": _percentiles(ttft),
+            "ttft_overhead_ms": statistics.median(ttft) - latency * 1000,
+            "total_ms": _percentiles([s[1] * 1000 for s in samples]),
+        }
+    return out
+
+
+BENCHMARKS: Dict[str, Callable[[bool], Dict[str, Any]]] = {
+    "overhead": bench_overhead_,
+    "import": bench_import,
+    "throughput": bench_throughput,
+    "batch": bench_batch,
+    "streaming": bench_streaming,
+}
+
+
+def _rounded(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, dict):
+        return {k: _rounded(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rounded(v) for v in value]
+    return value
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return out.stdout.strip()
+    except OSError:
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="fewer iterations (smoke run)")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names")
+    parser.add_argument("--json", dest="json_path", help="write results to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    names = [n for n in args.only.split(",") if n] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results: Dict[str, Any] = {
+        "slick_version": slick.__version__,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quick": args.quick,
+        "benchmarks": {},
+    }
+    for name in names:
+        start = time.perf_counter()
+        result = BENCHMARKS[name](args.quick)
+        result["elapsed_s"] = time.perf_counter() - start
+        results["benchmarks"][name] = result
+        if args.json_path != "-":
+            print(f"{name:<11} {json.dumps(_rounded(result))}")
+
+    if args.json_path == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,10 +10,43 @@ try:
 except PackageNotFoundError:  # not installed, e.g., running from source without poetry install
     __version__ = "0.0.0"
 
-from .decorators import llm_step, llm_step_async
+from typing import Any
+
+# The decorators pull in LangChain and the transport pulls in httpx on first use;
+# resolve them lazily so `import slick` (and the CLI) stay fast.
+_LAZY = {
+    "llm_step": "decorators",
+    "llm_step_async": "decorators",
+    "warmup": "transport",
+    "awarmup": "transport",
+    "HedgePolicy": "hedging",
+    "Router": "routing",
+    "Pipeline": "pipeline",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "__version__",
     "llm_step",
     "llm_step_async",
+    "warmup",
+    "awarmup",
+    "HedgePolicy",
+    "Router",
+    "Pipeline",
 ]
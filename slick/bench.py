@@ -0,0 +1,226 @@
+"""Load-test chat models: latency percentiles, time to first token, throughput.
+
+`run_bench` streams the same prompt(s) to each target with a fixed number of requests
+in flight and records, per request, the time to the first non-empty chunk, the total
+latency, output tokens and any error. Targets are measured one after another so they
+see the same conditions; requests go straight to the chat model, bypassing slick's
+provider limiter, so the numbers describe the provider rather than local admission.
+
+Used by `slick bench`:
+
+    slick bench openai:gpt-4o-mini groq:llama-3.1-8b-instant -n 50 -c 8 --prompt-file p.txt
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .metrics import percentile
+
+
+@dataclass
+class RequestSample:
+    ok: bool
+    latency: float
+    ttft: Optional[float] = None
+    output_tokens: int = 0
+    tokens_estimated: bool = False
+    rate_limited: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class BenchResult:
+    """Raw samples for one target plus the wall time of the measured phase."""
+
+    target: str
+    model: str
+    provider: str
+    concurrency: int
+    wall_time: float = 0.0
+    samples: List[RequestSample] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate metrics; latencies in milliseconds, rates as fractions."""
+
+        n = len(self.samples)
+        ok = [s for s in self.samples if s.ok]
+        errors = n - len(ok)
+        latencies = [s.latency * 1000 for s in ok]
+        ttfts = [s.ttft * 1000 for s in ok if s.ttft is not None]
+        decode_rates = [
+            s.output_tokens / (s.latency - s.ttft)
+            for s in ok
+            if s.ttft is not None and s.latency > s.ttft and s.output_tokens
+        ]
+        out_tokens = sum(s.output_tokens for s in ok)
+        summary: Dict[str, Any] = {
+            "target": self.target,
+            "model": self.model,
+            "provider": self.provider,
+            "requests": n,
+            "concurrency": self.concurrency,
+            "ok": len(ok),
+            "error_rate": errors / n if n else 0.0,
+            "rate_limit_rate": sum(s.rate_limited for s in self.samples) / n if n else 0.0,
+            "throughput_rps": len(ok) / self.wall_time if self.wall_time else 0.0,
+            "output_tokens": out_tokens,
+            "tokens_estimated": any(s.tokens_estimated for s in ok),
+            "tokens_per_s": percentile(decode_rates, 50),
+            "aggregate_tokens_per_s": out_tokens / self.wall_time if self.wall_time else 0.0,
+        }
+        for q in (50, 95, 99):
+            summary[f"ttft_p{q}_ms"] = percentile(ttfts, q)
+            summary[f"latency_p{q}_ms"] = percentile(latencies, q)
+        first_error = next((s.error for s in self.samples if s.error), None)
+        if first_error:
+            summary["first_error"] = first_error
+        return summary
+
+
+def load_prompts(path: str) -> List[str]:
+    """Prompts from a file: one JSON string or {"prompt": ...} per line for .jsonl,
+    otherwise the whole file is a single prompt."""
+
+    text = Path(path).read_text(encoding="utf-8")
+    if not path.endswith(".jsonl"):
+        return [text]
+    prompts = []
+    for line in text.splitlines():
+        if line.strip():
+            item = json.loads(line)
+            prompts.append(item["prompt"] if isinstance(item, dict) else str(item))
+    return prompts
+
+
+def _token_count(chunk: Any) -> Optional[int]:
+    usage = getattr(chunk, "usage_metadata", None)
+    if usage and usage.get("output_tokens"):
+        return int(usage["output_tokens"])
+    return None
+
+
+async def _one(chat: Any, prompt: str, timeout: Optional[float]) -> RequestSample:
+    from langchain_core.messages import HumanMessage
+
+    from .limits import is_rate_limit_error
+
+    messages = [HumanMessage(content=prompt)]
+    start = time.perf_counter()
+    ttft: Optional[float] = None
+    chars = 0
+    tokens: Optional[int] = None
+
+    async def consume() -> None:
+        nonlocal ttft, chars, tokens
+        async for chunk in chat.astream(messages):
+            content = chunk.content if isinstance(chunk.content, str) else str(chunk.content or "")
+            if content and ttft is None:
+                ttft = time.perf_counter() - start
+            chars += len(content)
+            counted = _token_count(chunk)
+            if counted is not None:
+                tokens = (tokens or 0) + counted
+
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        return RequestSample(ok=False, latency=time.perf_counter() - start, error="timeout")
+    except Exception as e:  # record and keep going; the error rate is a result
+        return RequestSample(
+            ok=False,
+            latency=time.perf_counter() - start,
+            rate_limited=is_rate_limit_error(e),
+            error=f"{type(e).__name__}: {e}",
+        )
+    latency = time.perf_counter() - start
+    if tokens is None:
+        # Provider did not report usage while streaming; ~4 characters per token.
+        return RequestSample(True, latency, ttft, max(1, chars // 4) if chars else 0, tokens_estimated=True)
+    return RequestSample(True, latency, ttft, tokens)
+
+
+async def abench_target(
+    target: str,
+    prompts: Sequence[str],
+    requests: int = 20,
+    concurrency: int = 4,
+    warmup: int = 1,
+    timeout: Optional[float] = 60.0,
+    **llm_kwargs: Any,
+) -> BenchResult:
+    """Benchmark one "provider:model" (or bare model) target."""
+
+    from .models import create_chat_model, resolve_model
+
+    model, provider = resolve_model(target)
+    chat = create_chat_model(model=model, provider=provider, **llm_kwargs)
+    result = BenchResult(target=target, model=model, provider=provider, concurrency=concurrency)
+    # Warm-up requests set up connections and are not counted.
+    for i in range(warmup):
+        await _one(chat, prompts[i % len(prompts)], timeout)
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(i: int) -> RequestSample:
+        async with sem:
+            return await _one(chat, prompts[i % len(prompts)], timeout)
+
+    start = time.perf_counter()
+    result.samples = list(await asyncio.gather(*(run(i) for i in range(requests))))
+    result.wall_time = time.perf_counter() - start
+    return result
+
+
+def run_bench(targets: Sequence[str], prompts: Sequence[str], **options: Any) -> List[BenchResult]:
+    """Benchmark each target in turn (see `abench_target` for options)."""
+
+    async def main() -> List[BenchResult]:
+        return [await abench_target(t, prompts, **options) for t in targets]
+
+    return asyncio.run(main())
+
+
+_COLUMNS = (
+    ("target", "target", "{}"),
+    ("ok", "ok", "{}"),
+    ("err%", "error_rate", "{:.1%}"),
+    ("429%", "rate_limit_rate", "{:.1%}"),
+    ("ttft p50", "ttft_p50_ms", "{:.0f}ms"),
+    ("ttft p95", "ttft_p95_ms", "{:.0f}ms"),
+    ("p50", "latency_p50_ms", "{:.0f}ms"),
+    ("p95", "latency_p95_ms", "{:.0f}ms"),
+    ("p99", "latency_p99_ms", "{:.0f}ms"),
+    ("tok/s", "tokens_per_s", "{:.1f}"),
+    ("req/s", "throughput_rps", "{:.2f}"),
+)
+
+
+def format_table(summaries: Sequence[Dict[str, Any]]) -> str:
+    """Plain-text table of `BenchResult.summary()` rows."""
+
+    rows = [[title for title, _, _ in _COLUMNS]]
+    for s in summaries:
+        row = []
+        for _, key, fmt in _COLUMNS:
+            value = s.get(key)
+            if key == "ok":
+                row.append(f"{s['ok']}/{s['requests']}")
+            elif value is None:
+                row.append("-")
+            else:
+                row.append(fmt.format(value))
+        rows.append(row)
+    widths = [max(len(r[i]) for r in rows) for i in range(len(_COLUMNS))]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])] + [c.rjust(w) for c, w in zip(row[1:], widths[1:])]
+        lines.append("  ".join(cells))
+    if any(s.get("tokens_estimated") for s in summaries):
+        lines.append("(tok/s estimated from output length where the provider reported no usage)")
+    return "\n".join(lines)
@@ -0,0 +1,163 @@
+"""Submit many step calls as one provider batch job (OpenAI Batch, Anthropic Message Batches).
+
+For offline work that can wait for hours, provider batch endpoints are cheaper and are
+not bound by the realtime rate limits:
+
+    handle = classify.submit_batch(records)     # renders prompts, uploads, returns at once
+    print(handle.id, handle.status())
+    labels = handle.results()                   # polls until done, then parses each result
+
+Inputs are bound like `fn.batch` items, results come back in input order, and a failed
+item (binding, the provider request or parsing) yields its exception in place. Items
+already in the step's result cache are not sent, duplicates are sent once, and parsed
+results are written to the cache.
+
+Request ids are derived from the inputs' positions. A process that stopped after
+submitting can pick the job up again with `fn.attach_batch(batch_id, records)`, given
+the same records.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .providers.batches import BatchError, BatchStatus
+
+# Sentinel for results not fetched yet (None is a legitimate result).
+_PENDING = object()
+
+
+class BatchHandle:
+    """A submitted batch job of one step and the mapping back to its inputs."""
+
+    def __init__(
+        self,
+        step: Any,
+        api: Any,
+        batch_id: Optional[str],
+        results: List[Any],
+        entries: Dict[str, Tuple[List[int], Any, Any]],
+    ) -> None:
+        self.step = step
+        self.api = api
+        self.id = batch_id
+        self._results = results  # cache hits and binding errors are filled in already
+        self._entries = entries  # custom_id -> (positions, cache, cache key)
+        self._fetched = batch_id is None
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __repr__(self) -> str:
+        return f"BatchHandle(id={self.id!r}, provider={getattr(self.api, 'provider', None)!r}, items={len(self)})"
+
+    def status(self) -> BatchStatus:
+        if self.id is None:
+            return BatchStatus(state="completed")
+        return self.api.status(self.id)
+
+    def done(self) -> bool:
+        return self.status().done
+
+    def wait(self, poll_interval: float = 30.0, timeout: Optional[float] = None) -> BatchStatus:
+        """Poll until the job has ended; raises TimeoutError after `timeout` seconds."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.status()
+            if status.done:
+                return status
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch {self.id} still running after {timeout}s")
+            time.sleep(poll_interval if deadline is None else min(poll_interval, max(0.0, deadline - time.monotonic())))
+
+    def results(self, poll_interval: float = 30.0, timeout: Optional[float] = None) -> List[Any]:
+        """Wait for the job, then return one result (or exception) per input, in order."""
+
+        if not self._fetched:
+            status = self.wait(poll_interval, timeout)
+            self._collect(status)
+        return list(self._results)
+
+    def _collect(self, status: BatchStatus) -> None:
+        step = self.step
+        seen = set()
+        for custom_id, outcome in self.api.results(self.id):
+            entry = self._entries.get(custom_id)
+            if entry is None:
+                continue
+            seen.add(custom_id)
+            positions, cache, key = entry
+            if not isinstance(outcome, Exception):
+                try:
+                    if step.multi_output:
+                        raw = step._parse_candidates(outcome)
+                    else:
+                        raw = step._parse_text(outcome[0] if outcome else "")
+                    outcome = step.finish(raw)
+                    step.store(cache, key, outcome)
+                except Exception as e:
+                    outcome = e
+            for i in positions:
+                self._results[i] = outcome
+        for custom_id, (positions, _, _) in self._entries.items():
+            if custom_id not in seen:
+                missing = BatchError(f"No result for request {custom_id} (batch {status.state})")
+                for i in positions:
+                    self._results[i] = missing
+        self._fetched = True
+
+    def cancel(self) -> None:
+        if self.id is not None:
+            self.api.cancel(self.id)
+
+
+def _batch_api(step: Any) -> Tuple[Any, str]:
+    model, provider = step.target()
+    if provider == "router":
+        raise ValueError("Batch submission needs a single provider; routed steps cannot be batched")
+    from .models import get_provider
+
+    api = getattr(get_provider(provider), "batch_api", None)
+    if api is None:
+        raise ValueError(f"Provider {provider!r} has no batch API")
+    return api, model
+
+
+def _prepare(step: Any, items: Sequence[Any]) -> Tuple[Any, List[Any], Dict[str, Any], List[Dict[str, Any]]]:
+    from .decorators import _MISS
+
+    api, model = _batch_api(step)
+    results, pending = step._prepare_batch(items)
+    params = {**step.llm_kwargs, **(step.structured() or {})}
+    entries: Dict[str, Tuple[List[int], Any, Any]] = {}
+    requests = []
+    for positions, inputs, cache, key in pending:
+        custom_id = f"item-{positions[0]}"
+        entries[custom_id] = (positions, cache, key)
+        try:
+            requests.append(api.build_request(custom_id, model, step.messages(inputs), params))
+        except Exception as e:
+            del entries[custom_id]
+            for i in positions:
+                results[i] = e
+    for i, value in enumerate(results):
+        if value is _MISS:
+            results[i] = _PENDING
+    return api, results, entries, requests
+
+
+def submit_batch(step: Any, items: Sequence[Any]) -> BatchHandle:
+    """Render every item's request, submit them as one batch job and return its handle."""
+
+    api, results, entries, requests = _prepare(step, items)
+    batch_id = api.submit(requests) if requests else None
+    return BatchHandle(step, api, batch_id, results, entries)
+
+
+def attach_batch(step: Any, batch_id: str, items: Sequence[Any]) -> BatchHandle:
+    """The handle of a job submitted earlier with the same items (nothing is sent)."""
+
+    api, results, entries, _ = _prepare(step, items)
+    return BatchHandle(step, api, batch_id, results, entries)
@@ -0,0 +1,184 @@
+"""Persistent result cache for decorated steps.
+
+Parsed step results are stored in a local SQLite database as zlib-compressed JSON,
+keyed by a hash of the compiled template, the bound arguments, the provider/model and
+the generation kwargs. Entries expire after a TTL and the least recently used ones are
+evicted once the store grows past its entry or byte budget.
+
+Enable per step with `@llm_step(cache=True)` (or pass a `ResultCache`), or globally
+with `set_default_cache(True)` / `SLICK_CACHE=1`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Optional, Union
+
+# Writes between budget checks; keeps eviction off the per-call path.
+_EVICT_EVERY = 32
+
+
+def default_cache_dir() -> Path:
+    """~/.cache/slick (or $XDG_CACHE_HOME/slick), overridable with SLICK_CACHE_DIR."""
+
+    override = os.getenv("SLICK_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "slick"
+
+
+def make_key(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-encoded parts (unknown objects fall back to repr)."""
+
+    def _default(obj: Any) -> Any:
+        dump = getattr(obj, "model_dump", None)
+        if callable(dump):
+            return dump(mode="json")
+        if isinstance(obj, (set, frozenset)):
+            return sorted(obj, key=repr)
+        return repr(obj)
+
+    blob = json.dumps(parts, sort_keys=True, default=_default, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed key/value store with TTL, LRU eviction and compressed payloads."""
+
+    MISS = object()
+
+    def __init__(
+        self,
+        path: Union[str, Path, None] = None,
+        ttl: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 100_000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        path = Path(path) if path is not None else default_cache_dir() / "results.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def get(self, key: str) -> Any:
+        """Return the stored JSON value, or `ResultCache.MISS`."""
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return self.MISS
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return self.MISS
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, value: Any) -> None:
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._writes += 1
+            if self._writes % _EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # Called with the lock held.
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        excess_rows = max(0, count - self.max_entries)
+        cutoff_size = size - self.max_bytes
+        freed, dropped = 0, []
+        for key, item_size in self._conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if len(dropped) >= excess_rows and freed >= cutoff_size:
+                break
+            dropped.append((key,))
+            freed += item_size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", dropped)
+
+    def evict(self) -> None:
+        """Apply TTL and size budgets now."""
+
+        with self._lock:
+            self._evict(time.time())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_setting: Union[bool, ResultCache, None] = None
+_default_cache: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def set_default_cache(cache: Union[bool, ResultCache, None]) -> None:
+    """Turn the global result cache on (True / a ResultCache) or off (False).
+
+    None (the initial state) defers to the SLICK_CACHE environment variable.
+    """
+
+    global _default_setting
+    _default_setting = cache
+
+
+def default_cache() -> ResultCache:
+    """The process-wide ResultCache at the default location, created on first use."""
+
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = ResultCache()
+    return _default_cache
+
+
+def resolve_cache(setting: Union[bool, ResultCache, None]) -> Optional[ResultCache]:
+    """Resolve a step's `cache=` argument against the global setting and SLICK_CACHE."""
+
+    if setting is None:
+        setting = _default_setting
+    if setting is None:
+        setting = os.getenv("SLICK_CACHE", "").lower() in ("1", "true", "yes", "on")
+    if isinstance(setting, ResultCache):
+        return setting
+    return default_cache() if setting else None
+
@@ -0,0 +1,553 @@
+"""Record chat traffic to a cassette and replay it offline with its original timing.
+
+In record mode every chat model built by `create_chat_model` is wrapped: each request's
+messages, model settings and call options are written to a JSONL cassette together with
+the response (text, or the streamed chunks) and its timing. The file is gzip-compressed
+when its name ends in ".gz". In replay mode the same requests are answered from the
+cassette, after the recorded time to first token and between the recorded chunks. No
+network or provider SDK is involved, and the latency can be scaled:
+
+    with use_cassette("traffic.jsonl.gz", mode="record"):
+        run_jsonl(classify, "sample.jsonl", "labels.jsonl")
+
+    with use_cassette("traffic.jsonl.gz", latency_scale=0.5):   # replay, twice as fast
+        run_jsonl(classify, "sample.jsonl", "labels.jsonl")
+
+Requests match on provider, model, settings, call options and messages. Identical
+requests are answered in recorded order. An unknown request raises `CassetteMiss`, and
+so does one whose recordings have all been used, unless `repeat=True` cycles them.
+Recorded errors are raised again, so a replayed 429 still shrinks the limiter. From the
+CLI, set `SLICK_CASSETTE` (plus `SLICK_CASSETTE_MODE=record`, and optionally
+`SLICK_CASSETTE_LATENCY_SCALE`).
+
+`play` sends the recorded requests again on their original schedule, through the
+provider limiters. This reproduces a production load pattern offline, so you can see
+how slick's admission and concurrency behave under it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import contextlib
+import gzip
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+MODES = ("record", "replay")
+
+# Chat model settings that do not change the answer (client plumbing); not matched on.
+_UNKEYED = frozenset(
+    {"callbacks", "streaming", "base_url", "timeout", "max_retries", "api_key", "http_client", "http_async_client"}
+)
+
+
+class CassetteMiss(LookupError):
+    """Replay has no recorded response for a request."""
+
+
+class ReplayedError(Exception):
+    """A provider error recorded on the cassette, raised again on replay."""
+
+    def __init__(self, type: str, message: str, status_code: Optional[int] = None) -> None:
+        self.type = type
+        self.status_code = status_code
+        super().__init__(f"{type}: {message}")
+
+
+def _jsonable(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=repr))
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):  # content blocks
+        return "".join(b if isinstance(b, str) else str(b.get("text", "")) for b in content)
+    return str(content or "")
+
+
+def _error(e: BaseException) -> Dict[str, Any]:
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    return {"type": type(e).__name__, "message": str(e), "status_code": status if isinstance(status, int) else None}
+
+
+class Cassette:
+    """One cassette file, open for recording (appending) or replay."""
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        mode: str = "replay",
+        latency_scale: float = 1.0,
+        repeat: bool = False,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {', '.join(MODES)}")
+        if latency_scale < 0:
+            raise ValueError("latency_scale must be >= 0")
+        self.path = os.fspath(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.repeat = repeat  # replay: start over once a request's recordings are used up
+        self._lock = threading.Lock()
+        self._file: Any = None
+        self._entries: List[Dict[str, Any]] = []
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        if mode == "replay":
+            self._entries = self._load()
+            for entry in self._entries:
+                self._index.setdefault(entry["key"], []).append(entry)
+
+    def __repr__(self) -> str:
+        return f"Cassette({self.path!r}, mode={self.mode!r}, entries={len(self._entries)})"
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        """Recorded requests in file order (in record mode: those written so far)."""
+
+        return list(self._entries)
+
+    def _compressed(self) -> bool:
+        return self.path.endswith(".gz")
+
+    def _load(self) -> List[Dict[str, Any]]:
+        opener = gzip.open if self._compressed() else open
+        entries = []
+        try:
+            with opener(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue  # torn last line of an interrupted recording
+        except EOFError:
+            pass  # gzip stream of a recording that was not closed; complete lines are kept
+        return entries
+
+    # -- recording ------------------------------------------------------------------
+
+    def save(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=repr)
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                opener = gzip.open if self._compressed() else open
+                self._file = opener(self.path, "at", encoding="utf-8")
+            self._file.write(line + "\n")
+            # Flushed per entry so an interrupted recording keeps what it captured.
+            self._file.flush()
+            self._entries.append(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # -- replay ---------------------------------------------------------------------
+
+    def lookup(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The recorded entry for `request`; identical requests get their recordings in turn."""
+
+        key = request["key"]
+        target = f"{request['provider']}:{request['model']}"
+        with self._lock:
+            found = self._index.get(key)
+            if not found:
+                raise CassetteMiss(f"No recorded response for this {target} request in {self.path}")
+            i = self._cursors.get(key, 0)
+            if i >= len(found) and not self.repeat:
+                raise CassetteMiss(
+                    f"All {len(found)} recorded response(s) for this {target} request in {self.path} "
+                    "were used; pass repeat=True to replay them again"
+                )
+            self._cursors[key] = i + 1
+            return found[i % len(found)]
+
+    def scaled(self, seconds: float) -> float:
+        return max(0.0, seconds * self.latency_scale)
+
+    def chat(
+        self,
+        provider: str,
+        model: str,
+        settings: Dict[str, Any],
+        build: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> Any:
+        """A chat model for one target that records around `build(settings)` or replays.
+
+        `callbacks` and `streaming` apply to the returned model, not to the wrapped one.
+        """
+
+        settings = dict(settings)
+        outer = {k: settings.pop(k) for k in ("callbacks", "streaming") if k in settings}
+        inner = None
+        if self.mode == "record":
+            if build is None:
+                raise ValueError("Recording needs the provider's chat model")
+            inner = build(settings)
+        keyed = {k: v for k, v in settings.items() if k not in _UNKEYED}
+        return _chat_cls()(cassette=self, provider=provider, target_model=model, settings=keyed, inner=inner, **outer)
+
+
+_chat_model_cls = None
+
+
+def _chat_cls():
+    # Built lazily: LangChain is only imported once a cassette is in use.
+    global _chat_model_cls
+    if _chat_model_cls is None:
+        from langchain_core.language_models.chat_models import (
+            BaseChatModel,
+            agenerate_from_stream,
+            generate_from_stream,
+        )
+        from langchain_core.messages import AIMessage, AIMessageChunk, messages_to_dict
+        from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+        from .cache import make_key
+
+        class CassetteChatModel(BaseChatModel):
+            """Chat model that records a provider's traffic or replays it from a `Cassette`."""
+
+            cassette: Any
+            provider: str
+            target_model: str
+            settings: Dict[str, Any] = {}
+            inner: Any = None  # the provider's chat model; None when replaying
+            streaming: bool = False
+
+            @property
+            def _llm_type(self) -> str:
+                return "slick-cassette"
+
+            @property
+            def _identifying_params(self) -> Dict[str, Any]:
+                return {"provider": self.provider, "model": self.target_model, "mode": self.cassette.mode}
+
+            def _request(self, messages: Any, stop: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+                call = dict(kwargs)
+                if stop is not None:
+                    call["stop"] = stop
+                request = {
+                    "provider": self.provider,
+                    "model": self.target_model,
+                    "settings": _jsonable(self.settings),
+                    "call": _jsonable(call),
+                    "messages": messages_to_dict(messages),
+                }
+                request["key"] = make_key(request)
+                return request
+
+            def _save(self, request: Dict[str, Any], ts: float, start: float, **response: Any) -> None:
+                total = time.perf_counter() - start
+                chunks = response.get("chunks")
+                entry = dict(request, ts=ts, total=round(total, 6), **response)
+                entry["ttft"] = chunks[0][0] if chunks else entry["total"]
+                self.cassette.save(entry)
+
+            def _result(self, entry: Dict[str, Any]) -> Any:
+                texts = entry.get("texts") or []
+                if entry.get("error") and not texts:
+                    raise ReplayedError(**entry["error"])
+                generations = [
+                    ChatGeneration(
+                        message=AIMessage(
+                            content=text,
+                            usage_metadata=entry.get("usage") if i == 0 else None,
+                            response_metadata={"model_name": self.target_model, "finish_reason": "stop"},
+                        )
+                    )
+                    for i, text in enumerate(texts)
+                ]
+                return ChatResult(generations=generations, llm_output={"token_usage": entry.get("usage")})
+
+            def _plan(self, entry: Dict[str, Any]) -> List[Tuple[float, str]]:
+                # (seconds after the request, text); a non-streamed recording arrives in one piece.
+                if entry.get("chunks") is not None:
+                    return [(self.cassette.scaled(at), text) for at, text in entry["chunks"]]
+                texts = entry.get("texts") or []
+                return [(self.cassette.scaled(entry["total"]), texts[0])] if texts else []
+
+            def _chunk(self, entry: Dict[str, Any], text: str, last: bool) -> Any:
+                if not last:
+                    return ChatGenerationChunk(message=AIMessageChunk(content=text))
+                return ChatGenerationChunk(
+                    message=AIMessageChunk(
+                        content=text,
+                        usage_metadata=entry.get("usage"),
+                        response_metadata={"model_name": self.target_model, "finish_reason": "stop"},
+                    )
+                )
+
+            def _recorded(self, result: Any) -> Dict[str, Any]:
+                generations = result.generations[0]
+                usage = getattr(generations[0].message, "usage_metadata", None) if generations else None
+                return {"texts": [g.text for g in generations], "usage": usage}
+
+            # -- BaseChatModel -------------------------------------------------------
+
+            def _generate(self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any) -> Any:
+                if self.streaming:
+                    return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+                request = self._request(messages, stop, kwargs)
+                if self.inner is None:
+                    entry = self.cassette.lookup(request)
+                    time.sleep(self.cassette.scaled(entry["total"]))
+                    return self._result(entry)
+                ts, start = time.time(), time.perf_counter()
+                try:
+                    result = self.inner.generate([messages], stop=stop, **kwargs)
+                except Exception as e:
+                    self._save(request, ts, start, texts=[], error=_error(e))
+                    raise
+                self._save(request, ts, start, **self._recorded(result))
+                return ChatResult(generations=result.generations[0], llm_output=result.llm_output)
+
+            async def _agenerate(
+                self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any
+            ) -> Any:
+                if self.streaming:
+                    return await agenerate_from_stream(self._astream(messages, stop, run_manager, **kwargs))
+                request = self._request(messages, stop, kwargs)
+                if self.inner is None:
+                    entry = self.cassette.lookup(request)
+                    await asyncio.sleep(self.cassette.scaled(entry["total"]))
+                    return self._result(entry)
+                ts, start = time.time(), time.perf_counter()
+                try:
+                    result = await self.inner.agenerate([messages], stop=stop, **kwargs)
+                except Exception as e:
+                    self._save(request, ts, start, texts=[], error=_error(e))
+                    raise
+                self._save(request, ts, start, **self._recorded(result))
+                return ChatResult(generations=result.generations[0], llm_output=result.llm_output)
+
+            def _stream(self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any) -> Any:
+                request = self._request(messages, stop, kwargs)
+                if self.inner is None:
+                    entry = self.cassette.lookup(request)
+                    plan, start = self._plan(entry), time.perf_counter()
+                    for i, (at, text) in enumerate(plan):
+                        delay = at - (time.perf_counter() - start)
+                        if delay > 0:
+                            time.sleep(delay)
+                        chunk = self._chunk(entry, text, last=i == len(plan) - 1)
+                        if run_manager is not None:
+                            run_manager.on_llm_new_token(text, chunk=chunk)
+                        yield chunk
+                    if entry.get("error"):
+                        raise ReplayedError(**entry["error"])
+                    return
+                ts, start = time.time(), time.perf_counter()
+                chunks: List[List[Any]] = []
+                usage = None
+                try:
+                    for message in self.inner.stream(messages, stop=stop, **kwargs):
+                        chunks.append([round(time.perf_counter() - start, 6), _text(message.content)])
+                        usage = getattr(message, "usage_metadata", None) or usage
+                        chunk = ChatGenerationChunk(message=message)
+                        if run_manager is not None:
+                            run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                        yield chunk
+                except Exception as e:
+                    self._save(request, ts, start, texts=[], chunks=chunks, error=_error(e))
+                    raise
+                texts = ["".join(text for _, text in chunks)]
+                self._save(request, ts, start, texts=texts, chunks=chunks, usage=usage)
+
+            async def _astream(
+                self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any
+            ) -> Any:
+                request = self._request(messages, stop, kwargs)
+                if self.inner is None:
+                    entry = self.cassette.lookup(request)
+                    plan, start = self._plan(entry), time.perf_counter()
+                    for i, (at, text) in enumerate(plan):
+                        delay = at - (time.perf_counter() - start)
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        chunk = self._chunk(entry, text, last=i == len(plan) - 1)
+                        if run_manager is not None:
+                            await run_manager.on_llm_new_token(text, chunk=chunk)
+                        yield chunk
+                    if entry.get("error"):
+                        raise ReplayedError(**entry["error"])
+                    return
+                ts, start = time.time(), time.perf_counter()
+                chunks: List[List[Any]] = []
+                usage = None
+                try:
+                    async for message in self.inner.astream(messages, stop=stop, **kwargs):
+                        chunks.append([round(time.perf_counter() - start, 6), _text(message.content)])
+                        usage = getattr(message, "usage_metadata", None) or usage
+                        chunk = ChatGenerationChunk(message=message)
+                        if run_manager is not None:
+                            await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                        yield chunk
+                except Exception as e:
+                    self._save(request, ts, start, texts=[], chunks=chunks, error=_error(e))
+                    raise
+                texts = ["".join(text for _, text in chunks)]
+                self._save(request, ts, start, texts=texts, chunks=chunks, usage=usage)
+
+        _chat_model_cls = CassetteChatModel
+    return _chat_model_cls
+
+
+# -- activation ---------------------------------------------------------------------
+
+_active: Optional[Cassette] = None
+_from_env: Optional[Tuple[Tuple[str, str, str], Cassette]] = None
+_active_lock = threading.Lock()
+
+
+def set_cassette(cassette: Optional[Cassette]) -> Optional[Cassette]:
+    """Make `cassette` the one `create_chat_model` records to or replays from (None turns
+    it off); returns the previous one."""
+
+    global _active
+    with _active_lock:
+        previous, _active = _active, cassette
+    return previous
+
+
+@contextlib.contextmanager
+def use_cassette(
+    path: Union[str, os.PathLike], mode: str = "replay", latency_scale: float = 1.0, repeat: bool = False
+) -> Iterator[Cassette]:
+    """Record or replay every chat model created inside the block."""
+
+    tape = Cassette(path, mode=mode, latency_scale=latency_scale, repeat=repeat)
+    previous = set_cassette(tape)
+    try:
+        yield tape
+    finally:
+        set_cassette(previous)
+        tape.close()
+
+
+def active_cassette() -> Optional[Cassette]:
+    """The cassette set with `set_cassette`/`use_cassette`, else the one `SLICK_CASSETTE` names."""
+
+    global _from_env
+    if _active is not None:
+        return _active
+    path = os.getenv("SLICK_CASSETTE")
+    if not path:
+        return None
+    spec = (path, os.getenv("SLICK_CASSETTE_MODE") or "replay", os.getenv("SLICK_CASSETTE_LATENCY_SCALE") or "1")
+    with _active_lock:
+        if _from_env is None or _from_env[0] != spec:
+            if _from_env is not None:
+                _from_env[1].close()
+            tape = Cassette(os.path.expanduser(path), mode=spec[1], latency_scale=float(spec[2]))
+            atexit.register(tape.close)
+            _from_env = (spec, tape)
+        return _from_env[1]
+
+
+# -- traffic playback ---------------------------------------------------------------
+
+
+@dataclass
+class PlayedCall:
+    """One replayed request. Times are seconds; `at` is its scheduled send time after
+    playback started."""
+
+    at: float
+    target: str
+    wait: float = 0.0  # queued for the provider limiter
+    latency: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class PlaybackReport:
+    calls: List[PlayedCall] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate metrics; times in milliseconds."""
+
+        from .metrics import percentile
+
+        ok = [c for c in self.calls if c.error is None]
+        summary: Dict[str, Any] = {
+            "requests": len(self.calls),
+            "errors": len(self.calls) - len(ok),
+            "wall_time_s": self.wall_time,
+        }
+        waits = [c.wait * 1000 for c in self.calls]
+        latencies = [c.latency * 1000 for c in ok]
+        for q in (50, 95, 99):
+            summary[f"wait_p{q}_ms"] = percentile(waits, q)
+            summary[f"latency_p{q}_ms"] = percentile(latencies, q)
+        return summary
+
+
+async def aplay(
+    cassette: Union[Cassette, str, os.PathLike],
+    time_scale: float = 1.0,
+    latency_scale: float = 1.0,
+    limit: bool = True,
+) -> PlaybackReport:
+    """Send every recorded request again at its recorded offset (times `time_scale`)
+    and answer it from the cassette, waiting in the provider limiter first unless
+    `limit=False`. `latency_scale` applies when `cassette` is a path."""
+
+    from langchain_core.messages import messages_from_dict
+
+    from .routing import _admission, _NoAdmission
+
+    tape = cassette if isinstance(cassette, Cassette) else Cassette(cassette, "replay", latency_scale)
+    if tape.mode != "replay":
+        raise ValueError("Playback needs a cassette opened for replay")
+    entries = sorted(tape.entries, key=lambda e: e.get("ts", 0.0))
+    first = entries[0].get("ts", 0.0) if entries else 0.0
+    start = time.perf_counter()
+
+    async def send(entry: Dict[str, Any]) -> PlayedCall:
+        call = PlayedCall(at=(entry.get("ts", first) - first) * time_scale, target=f"{entry['provider']}:{entry['model']}")
+        await asyncio.sleep(max(0.0, call.at - (time.perf_counter() - start)))
+        chat = tape.chat(entry["provider"], entry["model"], entry["settings"])
+        messages = messages_from_dict(entry["messages"])
+        queued = began = time.perf_counter()
+        try:
+            async with _admission(entry["provider"], messages) if limit else _NoAdmission():
+                began = time.perf_counter()
+                if entry.get("chunks") is not None:
+                    async for _ in chat.astream(messages, **entry["call"]):
+                        pass
+                else:
+                    await chat.agenerate([messages], **entry["call"])
+        except Exception as e:
+            call.error = f"{type(e).__name__}: {e}"
+        call.wait, call.latency = began - queued, time.perf_counter() - began
+        return call
+
+    calls = await asyncio.gather(*(send(entry) for entry in entries))
+    return PlaybackReport(calls=list(calls), wall_time=time.perf_counter() - start)
+
+
+def play(
+    cassette: Union[Cassette, str, os.PathLike],
+    time_scale: float = 1.0,
+    latency_scale: float = 1.0,
+    limit: bool = True,
+) -> PlaybackReport:
+    """Blocking `aplay`."""
+
+    return asyncio.run(aplay(cassette, time_scale, latency_scale, limit))
@@ -0,0 +1,134 @@
+"""On-disk catalog of provider model listings and the model-to-provider index.
+
+Model listings are fetched from provider SDKs, which is slow (one network round trip
+per provider), so results are kept in `<cache dir>/models.json` with a TTL. The same
+data backs `infer_provider`, which lets `create_chat_model(model=...)` pick the
+provider without any network access; well-known model families are matched by
+prefix when the catalog has no entry.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_TTL = 24 * 3600.0
+
+# Fallback when a model is not in the catalog yet; checked in order.
+_PREFIX_RULES: Tuple[Tuple[str, str], ...] = (
+    ("gpt-", "openai"),
+    ("chatgpt-", "openai"),
+    ("o1", "openai"),
+    ("o3", "openai"),
+    ("o4", "openai"),
+    ("claude", "anthropic"),
+    ("gemini", "google"),
+    ("models/gemini", "google"),
+    ("mistral-", "mistral"),
+    ("open-mistral", "mistral"),
+    ("open-mixtral", "mistral"),
+    ("codestral", "mistral"),
+    ("ministral", "mistral"),
+    ("pixtral", "mistral"),
+    ("accounts/fireworks/", "fireworks"),
+    ("fake", "fake"),
+)
+
+_lock = threading.Lock()
+_data: Optional[Dict[str, Any]] = None
+_index: Optional[Dict[str, str]] = None
+
+
+def catalog_path() -> Path:
+    from .cache import default_cache_dir
+
+    return default_cache_dir() / "models.json"
+
+
+def _load() -> Dict[str, Any]:
+    global _data
+    if _data is None:
+        try:
+            with open(catalog_path(), encoding="utf-8") as fh:
+                loaded = json.load(fh)
+            _data = loaded if isinstance(loaded, dict) else {}
+        except (OSError, ValueError):
+            _data = {}
+    return _data
+
+
+def _save(data: Dict[str, Any]) -> None:
+    path = catalog_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        # A read-only home directory only costs us the cache.
+        pass
+
+
+def reset() -> None:
+    """Forget the in-memory copy; the next access re-reads the catalog file."""
+
+    global _data, _index
+    with _lock:
+        _data = None
+        _index = None
+
+
+def get(provider: str, ttl: Optional[float] = DEFAULT_TTL) -> Optional[List[str]]:
+    """Cached model ids for a provider, or None when missing or older than `ttl`."""
+
+    with _lock:
+        entry = _load().get(provider)
+    if not entry:
+        return None
+    if ttl is not None and time.time() - entry.get("fetched", 0) > ttl:
+        return None
+    return list(entry.get("models", []))
+
+
+def put(provider: str, model_ids: List[str]) -> None:
+    """Record a fresh listing for a provider and persist the catalog."""
+
+    global _data, _index
+    with _lock:
+        data = dict(_load())
+        data[provider] = {"fetched": time.time(), "models": sorted(model_ids)}
+        _save(data)
+        _data = data
+        _index = None
+
+
+def _build_index(data: Dict[str, Any]) -> Dict[str, str]:
+    index: Dict[str, str] = {}
+    for provider, entry in data.items():
+        for model_id in entry.get("models", []):
+            index.setdefault(model_id, provider)
+            # Google lists "models/<name>"; callers usually pass the bare name.
+            if model_id.startswith("models/"):
+                index.setdefault(model_id[len("models/") :], provider)
+    return index
+
+
+def infer_provider(model: str) -> Optional[str]:
+    """Provider for a model id from the catalog, else from well-known prefixes."""
+
+    global _index
+    index = _index
+    if index is None:
+        with _lock:
+            index = _index = _build_index(_load())
+    provider = index.get(model)
+    if provider:
+        return provider
+    for prefix, name in _PREFIX_RULES:
+        if model.startswith(prefix):
+            return name
+    return None
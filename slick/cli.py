@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import sys
 
 from . import __version__
 from . import models as _models
@@ -18,6 +19,9 @@ def build_parser() -> argparse.ArgumentParser:
 
     models_list = models_sub.add_parser("list", help="List models")
     models_list.add_argument("--provider", help="Filter by provider")
+    models_list.add_argument("--all", action="store_true", help="List models of every provider concurrently")
+    models_list.add_argument("--refresh", action="store_true", help="Ignore the local model catalog cache")
+    models_list.add_argument("--timeout", type=float, default=10.0, help="Per-provider timeout for --all (seconds)")
 
     models_sub.add_parser("providers", help="List providers")
 
@@ -31,18 +35,158 @@ def build_parser() -> argparse.ArgumentParser:
     models_test.add_argument("--model")
     models_test.add_argument("--provider")
     models_test.add_argument("--prompt", default="Hello!")
+    models_test.add_argument("--no-daemon", action="store_true", help="Do not use a running `slick serve` daemon")
+
+    bench = subparsers.add_parser("bench", help="Load-test and compare models")
+    bench.add_argument("targets", nargs="+", metavar="TARGET", help="provider:model (or a model id)")
+    bench.add_argument("-n", "--requests", type=int, default=20, help="Measured requests per target")
+    bench.add_argument("-c", "--concurrency", type=int, default=4, help="Requests in flight per target")
+    bench.add_argument("--prompt", default="Write one sentence about the sea.")
+    bench.add_argument(
+        "--prompt-file", help="Prompt file (whole file), or .jsonl with one prompt per line (cycled)"
+    )
+    bench.add_argument("--max-tokens", type=int, help="Passed to the chat model as max_tokens")
+    bench.add_argument("--warmup", type=int, default=1, help="Unmeasured requests per target first")
+    bench.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (seconds)")
+    bench.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    run = subparsers.add_parser("run", help="Run a function over a JSONL file (resumable)")
+    run.add_argument("function", metavar="MODULE:FUNCTION", help="e.g. mypkg.steps:classify or steps.py:classify")
+    run.add_argument("--input", "-i", required=True, help="JSONL file, one record per line")
+    run.add_argument("--output", "-o", required=True, help="JSONL results; also the checkpoint for resuming")
+    run.add_argument("-c", "--concurrency", type=int, default=32, help="Records in flight")
+    run.add_argument("--restart", action="store_true", help="Truncate the output and run every record again")
+    run.add_argument("--retry-errors", action="store_true", help="Run records that previously failed again")
+    run.add_argument("--omit-input", action="store_true", help="Do not copy each record into its result line")
+    run.add_argument("--no-daemon", action="store_true", help="Run here even if a `slick serve` daemon is up")
+
+    serve = subparsers.add_parser("serve", help="Run a warm daemon on a Unix socket for the CLI and clients")
+    serve.add_argument("--socket", help="Socket path (default: $SLICK_SOCKET or $XDG_RUNTIME_DIR/slick.sock)")
+    serve.add_argument(
+        "--load", action="append", default=[], metavar="MODULE:FUNCTION", help="Preload a function (repeatable)"
+    )
+    serve.add_argument(
+        "--warm",
+        nargs="*",
+        metavar="TARGET",
+        help="Open provider connections at startup (providers or provider:model; none = configured defaults)",
+    )
 
     return parser
 
 
+def _daemon(args: argparse.Namespace):
+    """A client for the running `slick serve` daemon, unless --no-daemon or none is up."""
+
+    if getattr(args, "no_daemon", False):
+        return None
+    from .client import connect
+
+    return connect()
+
+
+def _handle_run(args: argparse.Namespace) -> int:
+    from . import runner
+
+    daemon = _daemon(args)
+    if daemon is not None:
+        with daemon:
+            try:
+                result = daemon.run_jsonl(
+                    args.function,
+                    args.input,
+                    args.output,
+                    concurrency=args.concurrency,
+                    resume=not args.restart,
+                    retry_errors=args.retry_errors,
+                    include_input=not args.omit_input,
+                )
+            except KeyboardInterrupt:
+                print(f"Interrupted; finished records are in {args.output}, run again to resume.", file=sys.stderr)
+                return 130
+            except Exception as e:
+                print(f"slick daemon could not run {args.function}: {e}", file=sys.stderr)
+                return 2
+        stats = runner.RunStats(**result)
+        print(stats.summary(), file=sys.stderr)
+        return 1 if stats.errors else 0
+    try:
+        fn = runner.load_function(args.function)
+    except Exception as e:
+        print(f"Could not load {args.function}: {e}", file=sys.stderr)
+        return 2
+    try:
+        stats = runner.run_jsonl(
+            fn,
+            args.input,
+            args.output,
+            concurrency=args.concurrency,
+            resume=not args.restart,
+            retry_errors=args.retry_errors,
+            include_input=not args.omit_input,
+        )
+    except KeyboardInterrupt:
+        print(f"Interrupted; finished records are in {args.output}, run again to resume.", file=sys.stderr)
+        return 130
+    print(stats.summary(), file=sys.stderr)
+    return 1 if stats.errors else 0
+
+
+def _handle_serve(args: argparse.Namespace) -> int:
+    from .server import serve
+
+    try:
+        serve(args.socket, load=args.load, warm=args.warm)
+    except Exception as e:
+        print(f"Could not start the daemon: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _handle_bench(args: argparse.Namespace) -> None:
+    import json
+
+    from . import bench
+
+    prompts = bench.load_prompts(args.prompt_file) if args.prompt_file else [args.prompt]
+    llm_kwargs = {"max_tokens": args.max_tokens} if args.max_tokens else {}
+    summaries = []
+    for target in args.targets:
+        try:
+            results = bench.run_bench(
+                [target],
+                prompts,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                timeout=args.timeout,
+                **llm_kwargs,
+            )
+        except Exception as e:
+            print(f"Could not benchmark {target}: {e}", file=sys.stderr)
+            continue
+        summaries.extend(r.summary() for r in results)
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        print(bench.format_table(summaries))
+
+
 def _handle_models(args: argparse.Namespace) -> None:
     """Dispatch for 'slick models ...' commands (placeholder outputs)."""
 
     cmd = args.models_cmd
-    if cmd == "list":
+    if cmd == "list" and args.all:
+        listing = _models.list_all_models(timeout=args.timeout, refresh=args.refresh)
+        for provider, names in listing.items():
+            if not names:
+                print(f"{provider}: (no models visible)")
+            for n in names:
+                print(f"{provider}:{n}")
+    elif cmd == "list":
         provider = args.provider or "openai"
         try:
-            names = _models.list_models(provider)
+            names = _models.list_models(provider, refresh=args.refresh)
         except Exception as e:
             print(f"Error listing models for {provider}: {e}")
             return
@@ -61,6 +205,14 @@ def _handle_models(args: argparse.Namespace) -> None:
         m, p = _models.get_default_model()
         print(f"model={m} provider={p}")
     elif cmd == "test":
+        daemon = _daemon(args)
+        if daemon is not None:
+            with daemon:
+                try:
+                    print(daemon.chat(args.prompt or "Hello!", model=args.model, provider=args.provider))
+                except Exception as e:
+                    print(f"Invocation failed: {e}")
+            return
         try:
             chat = _models.create_chat_model(model=args.model, provider=args.provider)
         except Exception as e:
@@ -90,6 +242,16 @@ def main() -> None:
         _handle_models(args)
         return
 
+    if getattr(args, "command", None) == "bench":
+        _handle_bench(args)
+        return
+
+    if getattr(args, "command", None) == "run":
+        sys.exit(_handle_run(args))
+
+    if getattr(args, "command", None) == "serve":
+        sys.exit(_handle_serve(args))
+
     parser.print_help()
 
 
@@ -0,0 +1,151 @@
+"""Client for the `slick serve` daemon (standard library only, so it imports fast).
+
+The daemon keeps provider clients, compiled steps and caches warm in one long-lived
+process. Short-lived callers (cron jobs, shell scripts, the CLI) send it requests over
+a Unix domain socket instead of paying the imports and a fresh TLS handshake each time:
+
+    from slick.client import connect
+
+    daemon = connect()               # None when no daemon is running
+    if daemon is not None:
+        with daemon:
+            label = daemon.call("mypkg.steps:classify", "some text")
+
+`connect()` returns None when nothing listens, so callers can fall back to running
+locally. The wire format is one JSON object per line in each direction:
+
+    {"id": 1, "op": "call", "function": "mypkg.steps:classify", "args": ["..."]}
+    {"id": 1, "ok": true, "result": ...}
+    {"id": 1, "ok": false, "error": {"type": "ValueError", "message": "..."}}
+
+The daemon uses its own environment (API keys, config files), so start it where the
+jobs would otherwise run.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import socket
+from typing import Any, Dict, Optional
+
+
+def socket_path() -> str:
+    """$SLICK_SOCKET, else $XDG_RUNTIME_DIR/slick.sock, else daemon.sock in the cache dir."""
+
+    override = os.getenv("SLICK_SOCKET")
+    if override:
+        return os.path.expanduser(override)
+    runtime = os.getenv("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "slick.sock")
+    from .cache import default_cache_dir
+
+    return str(default_cache_dir() / "daemon.sock")
+
+
+class DaemonError(RuntimeError):
+    """A request failed inside the daemon; `type` is the name of the original exception."""
+
+    def __init__(self, type: str, message: str) -> None:
+        self.type = type
+        super().__init__(f"{type}: {message}")
+
+
+class Client:
+    """A connection to the daemon. Requests are sent one at a time and wait for their
+    reply however long it takes; `timeout` only bounds connecting."""
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = 5.0) -> None:
+        self.path = path or socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.settimeout(timeout)
+            self._sock.connect(self.path)
+            self._sock.settimeout(None)
+        except BaseException:
+            self._sock.close()
+            raise
+        self._reader = self._sock.makefile("rb")
+        self._ids = itertools.count(1)
+
+    def request(self, op: str, **payload: Any) -> Any:
+        request_id = next(self._ids)
+        line = json.dumps({"id": request_id, "op": op, **payload}, ensure_ascii=False)
+        self._sock.sendall(line.encode("utf-8") + b"\n")
+        while True:
+            raw = self._reader.readline()
+            if not raw:
+                raise ConnectionError("slick daemon closed the connection")
+            reply = json.loads(raw)
+            if reply.get("id") == request_id:
+                break
+        if not reply.get("ok"):
+            error = reply.get("error") or {}
+            raise DaemonError(error.get("type", "Error"), error.get("message", ""))
+        return reply.get("result")
+
+    def ping(self) -> Dict[str, Any]:
+        """Daemon version, pid, uptime and loaded functions."""
+
+        return self.request("ping")
+
+    def chat(
+        self, prompt: str, model: Optional[str] = None, provider: Optional[str] = None, **llm_kwargs: Any
+    ) -> str:
+        """One chat completion through the daemon's pooled chat model."""
+
+        return self.request("chat", prompt=prompt, model=model, provider=provider, kwargs=llm_kwargs)["text"]
+
+    def call(self, function: str, *args: Any, **kwargs: Any) -> Any:
+        """Call "module:function" (or "file.py:function") in the daemon; the result is
+        returned as JSON (models as dicts)."""
+
+        return self.request("call", function=_absolute(function), cwd=os.getcwd(), args=list(args), kwargs=kwargs)
+
+    def run_jsonl(self, function: str, input_path: str, output_path: str, **options: Any) -> Dict[str, Any]:
+        """`slick.runner.run_jsonl` in the daemon; returns the run stats as a dict."""
+
+        return self.request(
+            "run",
+            function=_absolute(function),
+            cwd=os.getcwd(),
+            input=os.path.abspath(input_path),
+            output=os.path.abspath(output_path),
+            options=options,
+        )
+
+    def shutdown(self) -> None:
+        self.request("shutdown")
+
+    def close(self) -> None:
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def connect(path: Optional[str] = None, timeout: Optional[float] = 5.0) -> Optional[Client]:
+    """A client for the running daemon, or None if none listens on the socket."""
+
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        return Client(path, timeout)
+    except OSError:
+        return None
+
+
+def _absolute(spec: str) -> str:
+    # File paths are resolved here; the daemon runs in its own working directory.
+    module, sep, attr = spec.partition(":")
+    if sep and module.endswith(".py"):
+        return f"{os.path.abspath(module)}:{attr}"
+    return spec
+
@@ -1,7 +1,43 @@
+"""Configuration loading: environment, user config.toml and pyproject.toml [tool.slick].
+
+Files are parsed once and cached. A cached file is re-read only when its mtime (or
+size) changes, and files are stat'ed at most once per `STAT_INTERVAL` seconds, so a
+call on the hot path (`resolve_defaults`, `provider_settings`) is a dictionary lookup.
+
+Example user config (~/.config/slick/config.toml):
+
+    default_model = "gpt-4o-mini"
+    default_provider = "openai"
+
+    [providers.openai]
+    base_url = "https://my-proxy.example.com/v1"
+    timeout = 30
+    max_concurrency = 32
+    rpm = 500
+
+The same keys live under [tool.slick] / [tool.slick.providers.<name>] in pyproject.toml.
+"""
+
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Optional, Tuple
+import sys
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Minimum seconds between filesystem checks for config changes.
+STAT_INTERVAL = 1.0
+
+_lock = threading.Lock()
+_files: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+# (user, project, merged) as of the last check
+_snapshot: Optional[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]] = None
+_checked_at = 0.0
+_checked_cwd: Optional[str] = None
+_generation = 0
 
 
 def load_env_defaults() -> Tuple[Optional[str], Optional[str]]:
@@ -10,27 +46,164 @@ def load_env_defaults() -> Tuple[Optional[str], Optional[str]]:
     return os.getenv("SLICK_MODEL"), os.getenv("SLICK_PROVIDER")
 
 
-def load_user_config() -> Dict[str, Any]:
-    """Load user-level config (skeleton).
+def user_config_paths() -> List[Path]:
+    """Candidate user config locations, most specific first.
 
-    Intended locations:
-    - Linux: ~/.config/slick/config.toml
-    - macOS: ~/Library/Application Support/slick/config.toml
+    - $SLICK_CONFIG, if set
+    - Linux: $XDG_CONFIG_HOME/slick/config.toml (default ~/.config/slick/config.toml)
+    - macOS: ~/Library/Application Support/slick/config.toml (~/.config is also read)
     - Windows: %APPDATA%/slick/config.toml
-
-    TODO: Implement TOML parsing and path resolution; avoid heavy deps.
     """
 
+    paths: List[Path] = []
+    override = os.getenv("SLICK_CONFIG")
+    if override:
+        paths.append(Path(override).expanduser())
+    home = Path.home()
+    if sys.platform == "win32" and os.getenv("APPDATA"):
+        paths.append(Path(os.environ["APPDATA"]) / "slick" / "config.toml")
+    if sys.platform == "darwin":
+        paths.append(home / "Library" / "Application Support" / "slick" / "config.toml")
+    xdg = os.getenv("XDG_CONFIG_HOME")
+    paths.append((Path(xdg) if xdg else home / ".config") / "slick" / "config.toml")
+    return paths
+
+
+def project_config_path(start: Optional[Path] = None) -> Optional[Path]:
+    """The nearest pyproject.toml at or above `start` (default: the working directory)."""
+
+    here = (start or Path.cwd()).resolve()
+    for directory in (here, *here.parents):
+        candidate = directory / "pyproject.toml"
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _parse_toml(path: Path) -> Dict[str, Any]:
+    # Called once per version of a file (see `_read_cached`), so each problem warns once.
+    try:
+        import tomllib  # type: ignore[import-not-found]
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib  # type: ignore[no-redef]
+        except ImportError:
+            warnings.warn(f"Cannot read {path}: install tomli to parse TOML on Python < 3.11", stacklevel=2)
+            return {}
+    try:
+        with open(path, "rb") as fh:
+            return tomllib.load(fh)
+    except OSError:
+        return {}
+    except ValueError as e:  # tomllib.TOMLDecodeError
+        warnings.warn(f"Ignoring invalid config file {path}: {e}", stacklevel=2)
+        return {}
+
+
+def _read_cached(path: Optional[Path]) -> Dict[str, Any]:
+    """Parse a TOML file, reusing the previous parse while its mtime/size are unchanged."""
+
+    if path is None:
+        return {}
+    try:
+        st = path.stat()
+    except OSError:
+        _files.pop(path, None)
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _files.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    data = _parse_toml(path)
+    _files[path] = (stamp, data)
+    return data
+
+
+def _user_config() -> Dict[str, Any]:
+    for path in user_config_paths():
+        data = _read_cached(path)
+        if data:
+            return data
     return {}
 
 
+def _project_config() -> Dict[str, Any]:
+    data = _read_cached(project_config_path())
+    section = data.get("tool", {}).get("slick", {})
+    return section if isinstance(section, dict) else {}
+
+
+def _merge(low: Dict[str, Any], high: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(low)
+    for key, value in high.items():
+        if isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = _merge(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+def _load() -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    global _snapshot, _checked_at, _checked_cwd, _generation
+    now = time.monotonic()
+    cwd = os.getcwd()
+    snapshot = _snapshot
+    if snapshot is not None and now - _checked_at < STAT_INTERVAL and cwd == _checked_cwd:
+        return snapshot
+    with _lock:
+        user = _user_config()
+        project = _project_config()
+        if _snapshot is None or (user, project) != _snapshot[:2]:
+            _snapshot = (user, project, _merge(project, user))
+            _generation += 1
+        _checked_at = now
+        _checked_cwd = cwd
+        return _snapshot
+
+
+def load_config() -> Dict[str, Any]:
+    """The merged file config (user config over project config), cached.
+
+    Returns a shared dict; callers must not mutate it.
+    """
+
+    return _load()[2]
+
+
+def generation() -> int:
+    """Counter bumped whenever the merged config changes (for dependent caches)."""
+
+    load_config()
+    return _generation
+
+
+def clear_cache() -> None:
+    """Forget parsed files; the next lookup re-reads them."""
+
+    global _snapshot, _checked_at
+    with _lock:
+        _files.clear()
+        _snapshot = None
+        _checked_at = 0.0
+
+
+def load_user_config() -> Dict[str, Any]:
+    """Load user-level config (cached; see `user_config_paths` for locations)."""
+
+    return _load()[0]
+
+
 def load_project_config() -> Dict[str, Any]:
-    """Load project-level config from pyproject.toml under [tool.slick] (skeleton).
+    """Load project-level config from the nearest pyproject.toml under [tool.slick] (cached)."""
 
-    TODO: Implement TOML parsing and extraction; avoid heavy deps.
-    """
+    return _load()[1]
 
-    return {}
+
+def provider_settings(provider: str) -> Dict[str, Any]:
+    """Per-provider settings ([providers.<name>]), e.g. base_url, timeout, rpm."""
+
+    settings = load_config().get("providers", {}).get(provider, {})
+    return settings if isinstance(settings, dict) else {}
 
 
 def resolve_defaults() -> Tuple[Optional[str], Optional[str]]:
@@ -45,14 +218,11 @@ def resolve_defaults() -> Tuple[Optional[str], Optional[str]]:
     if env_model or env_provider:
         return env_model, env_provider
 
-    user = load_user_config()
+    user, proj, _ = _load()
     if "default_model" in user or "default_provider" in user:
         return user.get("default_model"), user.get("default_provider")
 
-    proj = load_project_config()
     if "default_model" in proj or "default_provider" in proj:
         return proj.get("default_model"), proj.get("default_provider")
 
     return None, None
-
-
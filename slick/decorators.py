@@ -1,189 +1,1035 @@
 # llm_script.py
-import os, inspect
+import asyncio
+import inspect
+import json
+import re
+import threading
+from collections.abc import Mapping
+from contextlib import closing
 from functools import wraps
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import PydanticOutputParser, StructuredOutputParser, ResponseSchema
-from pydantic import BaseModel
-from typing import get_origin
-from langchain.schema import HumanMessage
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-from langchain.schema import BaseMessage
+from typing import Any, get_args, get_origin, get_type_hints
+
+from . import metrics
+from .singleflight import SingleFlight
+
+# LangChain, pydantic and the provider SDKs are imported on a step's first call, not at
+# import or decoration time, so `import slick` and the CLI stay cheap.
+
+# Chains are cached per chat model instance; bound the cache in case the pool churns.
+_MAX_CHAINS_PER_STEP = 8
+
+# Marks a result-cache miss (None is a legitimate cached value).
+_MISS = object()
+
+# Identical in-flight async calls (same rendered prompt and model config) share one request.
+_INFLIGHT = SingleFlight()
+
+# Start of any jinja2 construct; docstring lines before the first one are static.
+_JINJA_START = re.compile(r"\{\{|\{%|\{#")
+
+_stdout_callbacks = None
+_prompt_template_cls = None
+
+
+def _get_stdout_callbacks():
+    # Stateless handler shared by all steps so pooled chat models keyed on callbacks are reused.
+    global _stdout_callbacks
+    if _stdout_callbacks is None:
+        from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
+
+        _stdout_callbacks = [StreamingStdOutCallbackHandler()]
+    return _stdout_callbacks
+
+
+def _compiled_prompt_template():
+    """jinja2 PromptTemplate subclass that compiles its template once, not on every format()."""
+    global _prompt_template_cls
+    if _prompt_template_cls is None:
+        from langchain.prompts import PromptTemplate
+        from pydantic import PrivateAttr
+
+        class _CompiledPromptTemplate(PromptTemplate):
+            _compiled: Any = PrivateAttr(default=None)
+
+            def format(self, **kwargs: Any) -> str:
+                if self._compiled is None:
+                    from jinja2.sandbox import SandboxedEnvironment
+
+                    self._compiled = SandboxedEnvironment().from_string(self.template)
+                return self._compiled.render(**self._merge_partial_and_user_variables(**kwargs))
+
+        _prompt_template_cls = _CompiledPromptTemplate
+    return _prompt_template_cls
+
+
+def _split_static_prefix(template):
+    """Split a docstring template into (static leading lines, the rest).
+
+    The split is on a line boundary before the first jinja2 construct. A template with
+    no constructs is all "rest", so the user message is never empty.
+    """
+    match = _JINJA_START.search(template)
+    if match is None:
+        return "", template
+    cut = template.rfind("\n", 0, match.start()) + 1
+    return template[:cut].strip(), template[cut:]
+
+
+class _Step:
+    """The per-function parts of an LLM step, built once on the step's first call.
+
+    Holds the compiled docstring template, its variables, the output parser and the
+    `prompt | llm | parser` chains (one per chat model instance handed out by the pool).
+    For multi-output steps (`List[...]` return with `n>1`) the chain is a runnable that
+    collects candidates and parses each one into the list's element type.
+
+    The prompt is sent as a static system message (the docstring lines before the first
+    template variable, then the parser's format instructions) followed by the rendered
+    remainder as the user message. Identical requests then share a long prefix that
+    provider prompt caches can reuse; providers that need explicit hints get them from
+    their `mark_cacheable` hook.
+
+    Structured returns (BaseModel, dict) use the provider's native JSON-schema output
+    when its `structured_output` hook offers it for the model: the format instructions
+    are left out and the reply is validated with `model_validate_json`. Other targets
+    (and routed steps) keep the format instructions and LangChain's output parsers.
+
+    Multi-output steps ask for all candidates in one request when the provider honours
+    `n` (`Provider.supports_n`); otherwise, or with `first_k`, they send `n` concurrent
+    single requests and can return once `first_k` candidates have parsed.
+    """
+
+    def __init__(self, fn, model, llm_kwargs, cache=None, hedge=None, first_k=None):
+        self.fn = fn
+        self.model = model
+        self.llm_kwargs = llm_kwargs
+        self.cache_setting = cache
+        if first_k is not None and (not isinstance(first_k, int) or first_k < 1):
+            raise ValueError(f"first_k must be a positive integer, got {first_k!r}")
+        self.first_k = first_k
+        self.hedger = None
+        if hedge is not None and hedge is not False:
+            from .hedging import Hedger, resolve_policy
+
+            self.hedger = Hedger(resolve_policy(hedge))
+        self.sig = inspect.signature(fn)
+        self.prompt = None
+        self._compile_lock = threading.Lock()
+        self._chains = {}
+        self._chat_prompts = {}
+        self._limited = {}
+        self._structured = {}
+        self._native_n = {}
+        self._adapter = None
+        self._kwargs_key = None
+
+    def compile(self):
+        """Resolve annotations, build the parser and compile the template (first call only)."""
+        if self.prompt is not None:
+            return
+        with self._compile_lock:
+            if self.prompt is None:
+                self._compile()
+
+    def _compile(self):
+        from pydantic import BaseModel
+        from langchain.output_parsers import PydanticOutputParser, StructuredOutputParser, ResponseSchema
+
+        fn = self.fn
+        try:
+            # resolves string annotations (from __future__ import annotations)
+            self.return_type = get_type_hints(fn).get('return', self.sig.return_annotation)
+        except Exception:
+            self.return_type = self.sig.return_annotation
+        self.n = self.llm_kwargs.get('n', 1)
+        self.multi_output = get_origin(self.return_type) is list and self.n > 1
+        # multi-output steps parse each candidate into the list's element type
+        args = get_args(self.return_type) if self.multi_output else ()
+        self.parsed_type = args[0] if args else self.return_type
+        if self.first_k is not None and not self.multi_output:
+            raise ValueError("first_k needs a List[...] return annotation and n > 1")
+        # pick parser + format_instructions for JSON/Pydantic
+        self.output_parser = None
+        self._schema = None  # (name, JSON schema) offered to providers with native JSON output
+        format_instructions = ""
+        if isinstance(self.parsed_type, type) and issubclass(self.parsed_type, BaseModel):
+            self.output_parser = PydanticOutputParser(pydantic_object=self.parsed_type)
+            format_instructions = self.output_parser.get_format_instructions()
+            self._schema = (self.parsed_type.__name__, self.parsed_type.model_json_schema())
+        elif self.parsed_type is dict:
+            schema = ResponseSchema(name="output", description="Valid JSON object")
+            self.output_parser = StructuredOutputParser.from_response_schemas([schema])
+            format_instructions = self.output_parser.get_format_instructions()
+            self._schema = ("output", {"type": "object"})
+
+        # build the prompt from the docstring: static prefix + instructions, then the rest
+        template = inspect.cleandoc(fn.__doc__ or "")
+        static, variable = _split_static_prefix(template)
+        self.system = "\n\n".join(part for part in (static, format_instructions) if part) or None
+        self.static = static or None  # the system message when output is structured natively
+        # Result-cache keys cover the whole template, static part included.
+        self._cache_template = template + "\n\n" + format_instructions if format_instructions else template
+        prompt = _compiled_prompt_template().from_template(variable, template_format="jinja2")
+        self.input_variables = list(prompt.input_variables)
+        self._template_chars = len(self._cache_template)
+        self._max_tokens = self.llm_kwargs.get('max_tokens') or self.llm_kwargs.get('max_completion_tokens') or 0
+        # assigned last: a non-None prompt means the step is fully compiled
+        self.prompt = prompt
+
+    def bind(self, args, kwargs):
+        """Map call arguments onto template inputs (unbound variables render empty)."""
+        self.compile()
+        bound = self.sig.bind_partial(*args, **kwargs)
+        bound.apply_defaults()
+        inputs = dict.fromkeys(self.input_variables, "")
+        inputs.update(bound.arguments)
+        return inputs
+
+    def bind_item(self, item):
+        """Bind one batch input: a mapping of keyword arguments, a tuple of positional
+        arguments, or a single value for the first parameter."""
+        if isinstance(item, Mapping):
+            return self.bind((), dict(item))
+        if isinstance(item, tuple):
+            return self.bind(item, {})
+        return self.bind((item,), {})
+
+    def llm(self, stream=False):
+        # stream=True echoes tokens to stdout; other calls get a model with no handlers.
+        echo = {'streaming': True, 'callbacks': _get_stdout_callbacks()} if stream else {}
+        from .models import create_chat_model
+
+        return create_chat_model(model=self.model, **echo, **self.chat_kwargs())
+
+    def chat_kwargs(self, target=None):
+        """Chat model settings for `target`: `n` is dropped when candidates are fanned out."""
+        if not self.multi_output or self.native_n(target):
+            return self.llm_kwargs
+        return {k: v for k, v in self.llm_kwargs.items() if k != 'n'}
+
+    def native_n(self, target=None):
+        """Whether `target` (default the step's own) returns all `n` candidates in one request."""
+        if self.first_k is not None:
+            return False  # independent requests, so early finishers can count
+        if target is None:
+            target = self.target()
+        native = self._native_n.get(target)
+        if native is None:
+            native = False
+            if target[1] not in (None, "router"):
+                try:
+                    from .models import get_provider
+
+                    native = bool(getattr(get_provider(target[1]), "supports_n", False))
+                except Exception:
+                    native = False
+            self._native_n[target] = native
+        return native
+
+    def chain(self, llm):
+        """`prompt | llm | parser` (or the multi-output runnable) for a chat model."""
+        return self._cached_chain("result", llm, self._build_chain)
+
+    def text_chain(self, llm, target=None):
+        """`prompt | llm | StrOutputParser` used for streaming text chunks.
+
+        `target` is the (model, provider) of `llm` when it is not the step's own (hedge targets).
+        """
+        if target is None:
+            return self._cached_chain("text", llm, self._build_text_chain)
+        return self._cached_chain(("text", target), llm, lambda llm: self._build_text_chain(llm, target))
+
+    def _cached_chain(self, kind, llm, build):
+        cached = self._chains.get((kind, id(llm)))
+        if cached is None or cached[0] is not llm:
+            if len(self._chains) >= _MAX_CHAINS_PER_STEP:
+                self._chains.clear()
+                self._limited.clear()
+            cached = self._chains[(kind, id(llm))] = (llm, build(llm))
+        return cached[1]
+
+    def _build_chain(self, llm):
+        from langchain_core.runnables import RunnableLambda
+
+        if self.multi_output:
+            return RunnableLambda(
+                lambda inputs, config: self._candidates(llm, inputs, config),
+                afunc=lambda inputs, config: self._acandidates(llm, inputs, config),
+            )
+        options = self.structured()
+        if options is not None:
+            from langchain_core.output_parsers import StrOutputParser
+
+            return self.chat_prompt(native=True) | llm.bind(**options) | StrOutputParser() | self._validate_json
+        seq = self.chat_prompt() | llm
+        if self.output_parser:
+            seq = seq | self.output_parser
+        return seq
+
+    def _build_text_chain(self, llm, target=None):
+        from langchain_core.output_parsers import StrOutputParser
+
+        target = target or self.target()
+        options = self.structured(target)
+        if options is not None:
+            llm = llm.bind(**options)
+        return self.chat_prompt(target[1], native=options is not None) | llm | StrOutputParser()
+
+    def structured(self, target=None):
+        """Request options for native structured output on `target` ((model, provider),
+        default the step's own), or None when the format-instruction path is used."""
+        if self._schema is None:
+            return None
+        if target is None:
+            target = self.target()
+        options = self._structured.get(target, _MISS)
+        if options is _MISS:
+            options = None
+            model, provider = target
+            if provider not in (None, "router"):
+                try:
+                    from .config import provider_settings
+                    from .models import get_provider
+
+                    settings = provider_settings(provider)
+                    opted = settings.get("structured_output")
+                    # A custom endpoint may not accept response formats; native output
+                    # there needs `structured_output = true` in the provider's config.
+                    custom = self.llm_kwargs.get("base_url") or settings.get("base_url")
+                    hook = getattr(get_provider(provider), "structured_output", None)
+                    if hook is not None and opted is not False and (opted is True or not custom):
+                        options = hook(model, *self._schema)
+                except Exception:
+                    options = None
+            self._structured[target] = options
+        return options
+
+    def _validate_json(self, text):
+        """Parse a native structured reply (the same shapes the output parsers return)."""
+        from langchain_core.exceptions import OutputParserException
+
+        try:
+            if self.parsed_type is dict:
+                return {"output": json.loads(text)}
+            return self.parsed_type.model_validate_json(text)
+        except ValueError as e:  # invalid JSON and pydantic ValidationError alike
+            raise OutputParserException(f"Invalid structured output: {e}", llm_output=text) from e
+
+    def chat_prompt(self, provider=None, native=False):
+        """The prompt runnable for the provider this step resolves to (or `provider`).
+
+        With `native` the format instructions are left out (see `structured`). Without a
+        static part this is the plain template (one user message).
+        """
+        content = self.static if native else self.system
+        if content is None:
+            return self.prompt
+        if provider is None:
+            provider = self.target()[1]
+        prompt = self._chat_prompts.get((provider, native))
+        if prompt is None:
+            from langchain_core.messages import SystemMessage
+            from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+
+            system = SystemMessage(content=content)
+            mark = None
+            if provider is not None:
+                try:
+                    from .models import get_provider
+
+                    mark = getattr(get_provider(provider), "mark_cacheable", None)
+                except Exception:
+                    mark = None
+            if mark is not None:
+                system = mark(system)
+            prompt = self._chat_prompts[(provider, native)] = ChatPromptTemplate.from_messages(
+                [system, HumanMessagePromptTemplate(prompt=self.prompt)]
+            )
+        return prompt
+
+    def target(self):
+        """The (model, provider) this step currently resolves to.
+
+        Routed steps (a list of targets or a `slick.routing.Router`) report the router's
+        label and the pseudo-provider "router"; each target has its own limiter.
+        """
+        if self.model is not None and not isinstance(self.model, str):
+            from .routing import as_router
+
+            return as_router(self.model).label, "router"
+        try:
+            from .models import resolve_model
+
+            return resolve_model(self.model)
+        except Exception:
+            return self.model, None
+
+    def limiter(self, provider=None):
+        """The shared rate limiter of the provider this step resolves to (or `provider`), if any."""
+        try:
+            from .models import get_limiter
+
+            return get_limiter(provider or self.target()[1])
+        except Exception:
+            return None
+
+    def key_kwargs(self):
+        """The settings that tell results of the same prompt apart: `llm_kwargs`, plus
+        `first_k` when set (it changes how many candidates come back)."""
+        if self.first_k is None:
+            return self.llm_kwargs
+        return {**self.llm_kwargs, "first_k": self.first_k}
+
+    def flight_key(self, inputs):
+        """Single-flight key: the rendered prompt plus the resolved model config."""
+        if self._kwargs_key is None:
+            from .cache import make_key
+
+            self._kwargs_key = make_key(self.key_kwargs())
+        return (self.system, self.prompt.format(**inputs), *self.target(), self._kwargs_key)
+
+    def estimate_tokens(self, inputs):
+        # ~4 characters per token is close enough for budgeting against TPM limits
+        chars = self._template_chars + sum(len(str(v)) for v in inputs.values())
+        return chars // 4 + self._max_tokens
+
+    def limited(self, llm, limiter):
+        """The chain for async calls, admitting each request through the provider limiter."""
+        chain = self.chain(llm)
+        if limiter is None or (self.multi_output and not self.native_n()):
+            # fanned-out candidates are admitted one request at a time
+            return chain
+        cached = self._limited.get(id(chain))
+        if cached is None or cached[0] is not chain or cached[1] is not limiter:
+            from langchain_core.runnables import RunnableLambda
+
+            async def ainvoke(inputs, config=None):
+                timer = metrics.timer_from_config(config) if metrics.enabled() else None
+                if timer is not None:
+                    timer.mark("queue_start")
+                async with limiter.limit(self.estimate_tokens(inputs)):
+                    if timer is not None:
+                        timer.mark("admitted")
+                    return await chain.ainvoke(inputs, config)
+
+            cached = self._limited[id(chain)] = (chain, limiter, RunnableLambda(chain.invoke, afunc=ainvoke))
+        return cached[2]
+
+    def messages(self, inputs):
+        prompt = self.chat_prompt(native=self.structured() is not None)
+        if prompt is self.prompt:
+            from langchain_core.messages import HumanMessage
+
+            return [HumanMessage(content=self.prompt.format(**inputs))]
+        return prompt.format_messages(**inputs)
+
+    # -- multi-output candidates ---------------------------------------------------
+
+    def _candidates(self, llm, inputs, config=None, target=None):
+        """Parsed candidates of a multi-output call, in arrival order (see `_Candidates`)."""
+        callbacks = config.get("callbacks") if config else None
+        target = target or self.target()
+        options = self.structured(target) or {}
+        messages = self.messages(inputs)
+        if self.native_n(target):
+            gens = llm.generate([messages], callbacks=callbacks, **options).generations[0]
+            return self._parse_candidates([_generation_text(g) for g in gens], target)
+        found = _Candidates(self, target)
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        pool = ThreadPoolExecutor(max_workers=self.n)
+        try:
+            futures = [
+                pool.submit(llm.invoke, messages, {"callbacks": callbacks}, **options) for _ in range(self.n)
+            ]
+            for future in as_completed(futures):
+                error = future.exception()
+                if found.add(error if error is not None else future.result().content):
+                    break
+            return found.result()
+        finally:
+            # Returning at first_k leaves the slower requests to finish unobserved.
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _parse_candidates(self, texts, target=None):
+        found = _Candidates(self, target or self.target())
+        for text in texts:
+            if found.add(text):
+                break
+        return found.result()
+
+    async def _acandidates(self, llm, inputs, config=None, target=None):
+        callbacks = config.get("callbacks") if config else None
+        target = target or self.target()
+        options = self.structured(target) or {}
+        messages = self.messages(inputs)
+        if self.native_n(target):
+            gens = await llm.agenerate([messages], callbacks=callbacks, **options)
+            return self._parse_candidates([_generation_text(g) for g in gens.generations[0]], target)
+        found = _Candidates(self, target)
+        # Each request is admitted by the provider limiter on its own.
+        limiter = self.limiter(target[1])
+
+        async def one():
+            if limiter is None:
+                return (await llm.ainvoke(messages, {"callbacks": callbacks}, **options)).content
+            async with limiter.limit(self.estimate_tokens(inputs)):
+                return (await llm.ainvoke(messages, {"callbacks": callbacks}, **options)).content
+
+        tasks = [asyncio.ensure_future(one()) for _ in range(self.n)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    outcome = await next_done
+                except Exception as e:
+                    outcome = e
+                if found.add(outcome):
+                    break
+            return found.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # -- single calls and metrics -------------------------------------------------
+
+    def timer(self, streamed=False):
+        """A `metrics.CallTimer` for one call when a metrics sink is installed, else None."""
+        if not metrics.enabled():
+            return None
+        model, provider = self.target()
+        return metrics.CallTimer(self.fn.__qualname__, provider, model, streamed)
+
+    def invoke(self, inputs, stream=False, timer=None):
+        # stream=True echoes to stdout, which a duplicate request would do twice.
+        hedged = self.hedger is not None and not stream
+        if timer is None:
+            if hedged:
+                return self.finish(self.hedged(self.llm(), inputs))
+            return self.finish(self.chain(self.llm(stream)).invoke(inputs))
+        timer.mark("prepared")
+        llm = self.llm(stream)
+        timer.mark("client")
+        try:
+            if hedged:
+                raw = self.hedged(llm, inputs, timer.config())
+            else:
+                raw = self.chain(llm).invoke(inputs, timer.config())
+            result = self.finish(raw)
+        except BaseException as e:
+            timer.finish(e)
+            raise
+        timer.finish()
+        return result
+
+    async def ainvoke(self, inputs, stream=False, timer=None):
+        hedged = self.hedger is not None and not stream
+        if timer is None:
+            if hedged:
+                return self.finish(await self.ahedged(self.llm(), inputs))
+            return self.finish(await self.limited(self.llm(stream), self.limiter()).ainvoke(inputs))
+        timer.mark("prepared")
+        llm = self.llm(stream)
+        timer.mark("client")
+        try:
+            if hedged:
+                raw = await self.ahedged(llm, inputs, timer.config())
+            else:
+                raw = await self.limited(llm, self.limiter()).ainvoke(inputs, timer.config())
+            result = self.finish(raw)
+        except BaseException as e:
+            timer.finish(e)
+            raise
+        timer.finish()
+        return result
+
+    # -- hedged calls -------------------------------------------------------------
+
+    def hedged(self, llm, inputs, config=None):
+        """Raw result of a sync call raced against a duplicate (see `slick.hedging`)."""
+        target = self.target()
+
+        def backup(progress):
+            return self._attempt(*self._backup_llm(llm, target), inputs, config)(progress)
+
+        return self.hedger.run(self._attempt(llm, target, inputs, config), backup)
+
+    async def ahedged(self, llm, inputs, config=None):
+        target = self.target()
+
+        async def backup(progress):
+            return await self._aattempt(*self._backup_llm(llm, target), inputs, config)(progress)
+
+        return await self.hedger.arun(self._aattempt(llm, target, inputs, config, primary=True), backup)
+
+    def _backup_llm(self, llm, target):
+        """(chat model, (model, provider)) for the duplicate request: the policy's target, if any."""
+        if self.hedger.policy.target is None:
+            return llm, target
+        from .models import create_chat_model, resolve_model
+
+        model, provider = resolve_model(self.hedger.policy.target)
+        target = (model, provider)
+        return create_chat_model(model=model, provider=provider, **self.chat_kwargs(target)), target
+
+    def _parse_text(self, text, target=None):
+        if self.structured(target) is not None:
+            return self._validate_json(text)
+        return self.output_parser.parse(text) if self.output_parser else text
+
+    def _attempt(self, llm, target, inputs, config):
+        # Streams so the first token is visible; stops reading once the race is lost.
+        def run(progress):
+            progress.admitted()
+            if self.multi_output:
+                # Candidates are not streamed: their completion stands in for the first token.
+                candidates = self._candidates(llm, inputs, config, target)
+                progress.first_token()
+                return candidates
+            chunks = []
+            with closing(self.text_chain(llm, target).stream(inputs, config)) as stream:
+                for chunk in stream:
+                    if chunk:
+                        progress.first_token()
+                    chunks.append(chunk)
+                    if progress.cancelled.is_set():
+                        return None
+            return self._parse_text("".join(chunks), target)
+
+        return run
+
+    def _aattempt(self, llm, target, inputs, config, primary=False):
+        # Each attempt is admitted by the limiter of the provider it goes to (fanned-out
+        # candidates by request, in `_acandidates`).
+        limiter = None if self.multi_output and not self.native_n(target) else self.limiter(target[1])
+        timer = metrics.timer_from_config(config) if primary and metrics.enabled() else None
+
+        async def body(progress):
+            progress.admitted()
+            if self.multi_output:
+                candidates = await self._acandidates(llm, inputs, config, target)
+                progress.first_token()
+                return candidates
+            chunks = []
+            async for chunk in self.text_chain(llm, target).astream(inputs, config):
+                if chunk:
+                    progress.first_token()
+                chunks.append(chunk)
+            return self._parse_text("".join(chunks), target)
+
+        async def run(progress):
+            if limiter is None:
+                return await body(progress)
+            if timer is not None:
+                timer.mark("queue_start")
+            async with limiter.limit(self.estimate_tokens(inputs)):
+                if timer is not None:
+                    timer.mark("admitted")
+                return await body(progress)
+
+        return run
+
+    def finish(self, raw):
+        from langchain_core.messages import BaseMessage
+
+        # If the raw output is a BaseMessage (e.g., AIMessage), extract its content
+        if isinstance(raw, BaseMessage):
+            raw = raw.content
+        if self.return_type is dict:
+            raw = raw['output']
+        return raw
+
+    # -- streaming ----------------------------------------------------------------
+
+    def stream_inputs(self, args, kwargs):
+        """Bind a streaming call eagerly, so argument errors raise at call time."""
+        inputs = self.bind(args, kwargs)
+        if self.multi_output:
+            raise ValueError("Streaming is not supported for multi-output (n>1) steps")
+        return inputs
+
+    def stream(self, inputs):
+        if metrics.enabled():
+            return self._timed_stream(inputs)
+        return self.text_chain(self.llm()).stream(inputs)
+
+    def _timed_stream(self, inputs):
+        timer = self.timer(streamed=True)
+        timer.mark("prepared")
+        llm = self.llm()
+        timer.mark("client")
+        error = None
+        try:
+            yield from self.text_chain(llm).stream(inputs, timer.config())
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            # An abandoned stream (GeneratorExit) is still a successful call.
+            timer.finish(None if isinstance(error, GeneratorExit) else error)
+
+    async def astream(self, inputs):
+        timer = self.timer(streamed=True)
+        if timer is not None:
+            timer.mark("prepared")
+        chain = self.text_chain(self.llm())
+        limiter = self.limiter()
+        config = None
+        if timer is not None:
+            timer.mark("client")
+            config = timer.config()
+        error = None
+        try:
+            if limiter is None:
+                async for chunk in chain.astream(inputs, config):
+                    yield chunk
+                return
+            # The provider slot is held while the consumer pulls; a slow consumer slows
+            # the upstream read instead of buffering the whole response.
+            if timer is not None:
+                timer.mark("queue_start")
+            async with limiter.limit(self.estimate_tokens(inputs)):
+                if timer is not None:
+                    timer.mark("admitted")
+                async for chunk in chain.astream(inputs, config):
+                    yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if timer is not None:
+                timer.finish(None if isinstance(error, GeneratorExit) else error)
+
+    def partial_inputs(self, args, kwargs):
+        inputs = self.stream_inputs(args, kwargs)
+        from pydantic import BaseModel
+
+        if not (isinstance(self.return_type, type) and issubclass(self.return_type, BaseModel)):
+            raise TypeError("Partial streaming requires a pydantic BaseModel return annotation")
+        return inputs
+
+    def stream_partial(self, inputs):
+        from .partial import PartialModelStream
+
+        parser = PartialModelStream(self.return_type)
+        for chunk in self.stream(inputs):
+            update = parser.feed(chunk)
+            if update is not None:
+                yield update
+        yield parser.finish()
+
+    async def astream_partial(self, inputs):
+        from .partial import PartialModelStream
+
+        parser = PartialModelStream(self.return_type)
+        async for chunk in self.astream(inputs):
+            update = parser.feed(chunk)
+            if update is not None:
+                yield update
+        yield parser.finish()
+
+    # -- result cache -------------------------------------------------------------
+
+    def lookup(self, inputs):
+        """Return (cache, key, value) for a call; value is _MISS unless served from cache."""
+        from .cache import resolve_cache
+
+        cache = resolve_cache(self.cache_setting)
+        if cache is None:
+            return None, None, _MISS
+        model, provider = self.target()
+        from .cache import make_key
+
+        key = make_key(self._cache_template, inputs, provider, model, self.key_kwargs())
+        data = cache.get(key)
+        if data is cache.MISS:
+            return cache, key, _MISS
+        try:
+            return cache, key, self._type_adapter().validate_python(data)
+        except Exception:
+            # Entry written for a different return type; recompute and overwrite it.
+            return cache, key, _MISS
+
+    def store(self, cache, key, result):
+        if cache is None:
+            return
+        try:
+            cache.set(key, self._type_adapter().dump_python(result, mode="json"))
+        except Exception:
+            # Unserializable results are simply not cached.
+            pass
+
+    def _type_adapter(self):
+        if self._adapter is None:
+            from pydantic import TypeAdapter
+
+            annotation = self.return_type
+            if annotation is inspect.Signature.empty:
+                annotation = Any
+            self._adapter = TypeAdapter(annotation)
+        return self._adapter
+
+    # -- batching -----------------------------------------------------------------
+
+    def _prepare_batch(self, items):
+        # Binding errors are per-item results too, not a reason to fail the batch.
+        # Items that render to the same prompt are sent once and share the result.
+        results, pending, by_flight = [], [], {}
+        for i, item in enumerate(items):
+            try:
+                inputs = self.bind_item(item)
+                cache, key, hit = self.lookup(inputs)
+                flight = self.flight_key(inputs) if hit is _MISS else None
+            except Exception as e:
+                results.append(e)
+                continue
+            results.append(hit)
+            if hit is not _MISS:
+                continue
+            if flight in by_flight:
+                by_flight[flight][0].append(i)
+            else:
+                by_flight[flight] = entry = ([i], inputs, cache, key)
+                pending.append(entry)
+        return results, pending
+
+    def _collect(self, results, raws, pending):
+        for (positions, _, cache, key), raw in zip(pending, raws):
+            if not isinstance(raw, Exception):
+                try:
+                    raw = self.finish(raw)
+                    self.store(cache, key, raw)
+                except Exception as e:
+                    raw = e
+            for i in positions:
+                results[i] = raw
+        return results
+
+    def _batch_timers(self, pending):
+        timers = [self.timer() for _ in pending] if pending and metrics.enabled() else None
+        for timer in timers or ():
+            timer.mark("prepared")
+        return timers
+
+    def _batch_config(self, timers, max_concurrency):
+        if timers is None:
+            return {"max_concurrency": max_concurrency}
+        for timer in timers:
+            timer.mark("client")
+        return [timer.config(max_concurrency=max_concurrency) for timer in timers]
+
+    @staticmethod
+    def _finish_timers(timers, results, pending):
+        for timer, (positions, *_) in zip(timers or (), pending):
+            outcome = results[positions[0]]
+            timer.finish(outcome if isinstance(outcome, Exception) else None)
+
+    def batch(self, items, max_concurrency=None):
+        results, pending = self._prepare_batch(items)
+        if pending:
+            timers = self._batch_timers(pending)
+            llm = self.llm(False)
+            raws = self.chain(llm).batch(
+                [p[1] for p in pending], config=self._batch_config(timers, max_concurrency), return_exceptions=True
+            )
+            self._collect(results, raws, pending)
+            self._finish_timers(timers, results, pending)
+        return results
+
+    async def abatch(self, items, max_concurrency=None):
+        results, pending = self._prepare_batch(items)
+        if pending:
+            timers = self._batch_timers(pending)
+            llm = self.llm(False)
+            raws = await self.limited(llm, self.limiter()).abatch(
+                [p[1] for p in pending], config=self._batch_config(timers, max_concurrency), return_exceptions=True
+            )
+            self._collect(results, raws, pending)
+            self._finish_timers(timers, results, pending)
+        return results
+
+
+class _Candidates:
+    """Collects the candidates of a multi-output call as they arrive.
+
+    Each text is parsed into the step's element type; candidates that fail to parse (or
+    requests that fail) are dropped. `add` reports when `first_k` (default all `n`)
+    candidates are in; `result` raises the first error if none parsed.
+    """
+
+    def __init__(self, step, target):
+        self.step = step
+        self.target = target
+        self.want = min(step.first_k or step.n, step.n)
+        self.parsed = []
+        self.errors = []
+
+    def add(self, outcome):
+        if isinstance(outcome, Exception):
+            self.errors.append(outcome)
+            return False
+        try:
+            value = self.step._parse_text(outcome, self.target)
+        except Exception as e:
+            self.errors.append(e)
+            return False
+        if self.step.parsed_type is dict:
+            value = value['output']
+        self.parsed.append(value)
+        return len(self.parsed) >= self.want
+
+    def result(self):
+        if not self.parsed and self.errors:
+            raise self.errors[0]
+        return self.parsed
+
+
+def _attach_methods(wrapper, step):
+    """Expose batching and streaming helpers on a decorated function.
+
+    `fn.batch(inputs)` / `await fn.abatch(inputs)`: each input is a mapping of keyword
+    arguments, a tuple of positional arguments or a single value. Results come back in
+    input order; an item that fails (binding, the provider call or parsing) yields its
+    exception in place of a result. Set `max_concurrency` to bound how many requests
+    are in flight at once.
+
+    `fn.submit_batch(inputs)` sends the inputs as one provider batch job (OpenAI Batch,
+    Anthropic Message Batches) and returns a `slick.bulk.BatchHandle`; its `results()`
+    come back in input order like `batch`. `fn.attach_batch(batch_id, inputs)` picks
+    up a job submitted earlier.
+
+    `fn.hedger` is the step's `slick.hedging.Hedger` (None unless `hedge=` was given),
+    with `calls`, `hedged` and `backup_wins` counters.
+
+    `fn.stream(...)` returns an iterator and `fn.astream(...)` an async iterator over
+    the completion's text chunks as they arrive (raw text, before output parsing).
+
+    For BaseModel returns, `fn.stream_partial(...)` / `fn.astream_partial(...)` yield
+    `slick.partial.PartialResult` updates: a partially populated model plus the fields
+    completed so far; the last update is the validated model with `done=True`.
+    """
+    def stream(*args, **kwargs):
+        return step.stream(step.stream_inputs(args, kwargs))
+
+    def astream(*args, **kwargs):
+        return step.astream(step.stream_inputs(args, kwargs))
+
+    def stream_partial(*args, **kwargs):
+        return step.stream_partial(step.partial_inputs(args, kwargs))
+
+    def astream_partial(*args, **kwargs):
+        return step.astream_partial(step.partial_inputs(args, kwargs))
+
+    def submit_batch(inputs):
+        from .bulk import submit_batch
+
+        return submit_batch(step, inputs)
+
+    def attach_batch(batch_id, inputs):
+        from .bulk import attach_batch
+
+        return attach_batch(step, batch_id, inputs)
+
+    wrapper.batch = step.batch
+    wrapper.hedger = step.hedger
+    wrapper.abatch = step.abatch
+    wrapper.stream = stream
+    wrapper.astream = astream
+    wrapper.stream_partial = stream_partial
+    wrapper.astream_partial = astream_partial
+    wrapper.submit_batch = submit_batch
+    wrapper.attach_batch = attach_batch
+    return wrapper
+
+
+def _generation_text(g):
+    return g.message.content if hasattr(g, 'message') else g.text
+
 
 ## llm_step: use function docstring as template and inject raw LLM output into the function
-def llm_step(fn=None, *, model="o4-mini-2025-04-16", **llm_kwargs):
+def llm_step(fn=None, *, model="o4-mini-2025-04-16", cache=None, hedge=None, first_k=None, **llm_kwargs):
     """
     Decorator that uses the function's docstring as the LLM prompt.
     Runs the LLM call (with JSON/Pydantic parsing or multi-output support) and returns
     the parsed LLM result directly, without invoking the wrapped function body.
-    Supports multi-output for List[...] return types with n>1 via the `n` parameter.
+    Supports multi-output for List[...] return types with n>1 via the `n` parameter:
+    each candidate is parsed into the element type and unparseable ones are dropped.
+    With `first_k=k` the call returns as soon as k candidates have parsed.
+    The decorated function also gets `.batch(inputs, max_concurrency=None)` and
+    `.abatch(...)` for running many inputs through the provider's batch path, and
+    `.stream(...)` / `.astream(...)` for iterating over text chunks as they arrive.
+    Pass `cache=True` (or a `slick.cache.ResultCache`) to memoize parsed results on
+    disk; `cache=None` follows the global setting (`slick.cache.set_default_cache`).
+    Pass `hedge=` (a `slick.hedging.HedgePolicy`, a delay in seconds or True) to send a
+    duplicate request when the first one is slow to produce its first token.
     """
     # support usage with or without args
     if fn is None:
-        return lambda f: llm_step(f, model=model, **llm_kwargs)
-
-    sig = inspect.signature(fn)
-    return_type = sig.return_annotation
-    # pick parser + format_instructions for JSON/Pydantic
-    output_parser = None
-    format_instructions = ""
-    if isinstance(return_type, type) and issubclass(return_type, BaseModel):
-        output_parser = PydanticOutputParser(pydantic_object=return_type)
-        format_instructions = output_parser.get_format_instructions()
-    elif return_type is dict:
-        schema = ResponseSchema(name="output", description="Valid JSON object")
-        output_parser = StructuredOutputParser.from_response_schemas([schema])
-        format_instructions = output_parser.get_format_instructions()
-
-    # build full prompt from docstring
-    template = inspect.cleandoc(fn.__doc__ or "")
-    if format_instructions:
-        escaped = format_instructions.replace("{", "{{").replace("}", "}}")
-        template = template.rstrip() + "\n\n" + escaped
+        return lambda f: llm_step(f, model=model, cache=cache, hedge=hedge, first_k=first_k, **llm_kwargs)
+
+    step = _Step(fn, model, llm_kwargs, cache, hedge, first_k)
 
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        # Extract 'stream' flag to control streaming output
-        stream = kwargs.pop('stream', True)
-        bound = sig.bind_partial(*args, **kwargs).arguments
-        # init LLM
-        # Use factory for dynamic provider selection
-        try:
-            from .models import create_chat_model
-
-            llm = create_chat_model(
-                model=model,
-                streaming=stream,
-                callbacks=[StreamingStdOutCallbackHandler()],
-                **llm_kwargs,
-            )
-        except Exception:
-            # Fallback: Configure ChatOpenAI with streaming if requested
-            # (kept for backward compatibility if factory not usable)
-            llm_init_kwargs = {
-                'model': model,
-                'openai_api_key': os.getenv('OPENAI_API_KEY'),
-                **llm_kwargs
-            }
-            if stream:
-                llm = ChatOpenAI(streaming=True, callbacks=[StreamingStdOutCallbackHandler()], **llm_init_kwargs)
-            else:
-                llm = ChatOpenAI(**llm_init_kwargs)
-        llm_init_kwargs = {
-            'model': model,
-            'openai_api_key': os.getenv('OPENAI_API_KEY'),
-            **llm_kwargs
-        }
-        if stream:
-            llm = ChatOpenAI(streaming=True, callbacks=[StreamingStdOutCallbackHandler()], **llm_init_kwargs)
-        else:
-            llm = ChatOpenAI(**llm_init_kwargs)
-        origin = get_origin(return_type)
-        # multi-output support
-        if origin == list and llm_kwargs.get('n', 1) > 1:
-            prompt_str = PromptTemplate(input_variables=list(bound.keys()), template=template, template_format="jinja2").format(**bound)
-            messages = [HumanMessage(content=prompt_str)]
-            gens = llm.generate([messages]).generations[0]
-            raw = [(g.message.content if hasattr(g, 'message') else g.text) for g in gens]
-        else:
-            # single-output or JSON
-            seq = PromptTemplate(input_variables=list(bound.keys()), template=template, template_format="jinja2") | llm
-            if output_parser:
-                seq = seq | output_parser
-            raw = seq.invoke(bound)
-            # If the raw output is a BaseMessage (e.g., AIMessage), extract its content
-            if isinstance(raw, BaseMessage):
-                raw = raw.content
-            if return_type is dict:
-                raw = raw['output']
-        # return the LLM output directly
-        return raw
-    return wrapper
+        # stream=True echoes tokens to stdout while waiting; use fn.stream() to consume them
+        stream = kwargs.pop('stream', False)
+        timer = step.timer()
+        inputs = step.bind(args, kwargs)
+        cache, key, result = step.lookup(inputs)
+        if result is not _MISS:
+            if timer is not None:
+                timer.finish(status="cache_hit")
+            return result
+        # single-output, JSON or multi-output; return the LLM output directly
+        result = step.invoke(inputs, stream, timer)
+        step.store(cache, key, result)
+        return result
+    return _attach_methods(wrapper, step)
 
 
 ## llm_step_async: async version of llm_step
-def llm_step_async(fn=None, *, model="o4-mini-2025-04-16", **llm_kwargs):
+def llm_step_async(fn=None, *, model="o4-mini-2025-04-16", cache=None, hedge=None, first_k=None, **llm_kwargs):
     """
     Async decorator that uses the function's docstring as the LLM prompt.
-    Same as llm_step but for async functions.
+    Same as llm_step but for async functions. Concurrent calls that render the same
+    prompt for the same model config share one request and receive the same result.
     """
     # support usage with or without args
     if fn is None:
-        return lambda f: llm_step_async(f, model=model, **llm_kwargs)
-
-    sig = inspect.signature(fn)
-    return_type = sig.return_annotation
-    # pick parser + format_instructions for JSON/Pydantic
-    output_parser = None
-    format_instructions = ""
-    if isinstance(return_type, type) and issubclass(return_type, BaseModel):
-        output_parser = PydanticOutputParser(pydantic_object=return_type)
-        format_instructions = output_parser.get_format_instructions()
-    elif return_type is dict:
-        schema = ResponseSchema(name="output", description="Valid JSON object")
-        output_parser = StructuredOutputParser.from_response_schemas([schema])
-        format_instructions = output_parser.get_format_instructions()
-
-    # build full prompt from docstring
-    template = inspect.cleandoc(fn.__doc__ or "")
-    if format_instructions:
-        escaped = format_instructions.replace("{", "{{").replace("}", "}}")
-        template = template.rstrip() + "\n\n" + escaped
+        return lambda f: llm_step_async(f, model=model, cache=cache, hedge=hedge, first_k=first_k, **llm_kwargs)
+
+    step = _Step(fn, model, llm_kwargs, cache, hedge, first_k)
 
     @wraps(fn)
     async def wrapper(*args, **kwargs):
-        # Extract 'stream' flag to control streaming output
-        stream = kwargs.pop('stream', True)
-        bound = sig.bind_partial(*args, **kwargs).arguments
-        # init LLM
-        # Use factory for dynamic provider selection
-        try:
-            from .models import create_chat_model
+        # stream=True echoes tokens to stdout while waiting; use fn.stream() to consume them
+        stream = kwargs.pop('stream', False)
+        timer = step.timer()
+        inputs = step.bind(args, kwargs)
+        cache, key, result = step.lookup(inputs)
+        if result is not _MISS:
+            if timer is not None:
+                timer.finish(status="cache_hit")
+            return result
 
-            llm = create_chat_model(
-                model=model,
-                streaming=stream,
-                callbacks=[StreamingStdOutCallbackHandler()],
-                **llm_kwargs,
-            )
-        except Exception:
-            # Fallback: Configure ChatOpenAI with streaming if requested
-            llm_init_kwargs = {
-                'model': model,
-                'openai_api_key': os.getenv('OPENAI_API_KEY'),
-                **llm_kwargs
-            }
-            if stream:
-                llm = ChatOpenAI(streaming=True, callbacks=[StreamingStdOutCallbackHandler()], **llm_init_kwargs)
-            else:
-                llm = ChatOpenAI(**llm_init_kwargs)
-        llm_init_kwargs = {
-            'model': model,
-            'openai_api_key': os.getenv('OPENAI_API_KEY'),
-            **llm_kwargs
-        }
-        if stream:
-            llm = ChatOpenAI(streaming=True, callbacks=[StreamingStdOutCallbackHandler()], **llm_init_kwargs)
-        else:
-            llm = ChatOpenAI(**llm_init_kwargs)
-        origin = get_origin(return_type)
-        # multi-output support
-        if origin == list and llm_kwargs.get('n', 1) > 1:
-            prompt_str = PromptTemplate(input_variables=list(bound.keys()), template=template, template_format="jinja2").format(**bound)
-            messages = [HumanMessage(content=prompt_str)]
-            gens = await llm.agenerate([messages])
-            raw = [(g.message.content if hasattr(g, 'message') else g.text) for g in gens.generations[0]]
-        else:
-            # single-output or JSON
-            seq = PromptTemplate(input_variables=list(bound.keys()), template=template, template_format="jinja2") | llm
-            if output_parser:
-                seq = seq | output_parser
-            raw = await seq.ainvoke(bound)
-            # If the raw output is a BaseMessage (e.g., AIMessage), extract its content
-            if isinstance(raw, BaseMessage):
-                raw = raw.content
-            if return_type is dict:
-                raw = raw['output']
-        # return the LLM output directly
-        return raw
-    return wrapper
+        led = False
+
+        async def call():
+            # single-output, JSON or multi-output; return the LLM output directly
+            nonlocal led
+            led = True
+            result = await step.ainvoke(inputs, stream, timer)
+            step.store(cache, key, result)
+            return result
+
+        if timer is None:
+            return await _INFLIGHT.do(step.flight_key(inputs), call)
+        try:
+            result = await _INFLIGHT.do(step.flight_key(inputs), call)
+        except BaseException as e:
+            if not led:  # the leader's call() records the request itself
+                timer.finish(e, status="coalesced")
+            raise
+        if not led:
+            timer.finish(status="coalesced")
+        return result
+    return _attach_methods(wrapper, step)
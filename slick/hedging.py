@@ -0,0 +1,279 @@
+"""Hedged requests: send a duplicate when the first one is slow to start.
+
+Provider latency is heavy-tailed, so a few slow responses set the latency of a whole
+fan-out. With hedging on, a step call that has not produced its first token within a
+delay fires a second, identical request (optionally to another model or provider),
+takes whichever finishes first and cancels the other:
+
+    @llm_step(model="gpt-4o-mini", hedge=HedgePolicy(percentile=95, max_rate=0.05))
+    def classify(text: str) -> Label: ...
+
+    @llm_step_async(model="gpt-4o-mini", hedge=HedgePolicy(delay=1.5, target="groq:llama-3.1-8b-instant"))
+    async def summarize(text: str) -> str: ...
+
+The delay is either fixed or the given percentile of recently observed times to first
+token (no hedging until `min_samples` calls were seen). The hedge rate is capped: each
+call earns `max_rate` of a hedge and a hedge spends one, so at most that fraction of
+calls is duplicated over time (plus a saved-up `burst`).
+
+The time to first token is only visible when the request streams, so hedged calls
+stream their completion and parse the joined text; multi-output (n>1) steps can only
+hedge on completion time. Batches and `stream`/`astream` are not hedged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from .metrics import percentile
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to send a duplicate request, where to, and how often at most."""
+
+    delay: Optional[float] = None  # seconds; None = adaptive, from `percentile`
+    percentile: float = 95.0  # of recent times to first token
+    max_rate: float = 0.05  # long-run fraction of calls that may be hedged
+    burst: float = 1.0  # hedges that can be saved up while calls are fast
+    target: Optional[str] = None  # model for the duplicate ("provider:model"); None = same
+    min_samples: int = 20  # adaptive delay needs this many observations
+    window: int = 500  # observations kept for the adaptive delay
+
+
+def resolve_policy(hedge: Union[None, bool, float, HedgePolicy]) -> Optional[HedgePolicy]:
+    """The decorators' `hedge=` argument: a policy, True (adaptive), a delay, or off."""
+
+    if hedge is None or hedge is False:
+        return None
+    if hedge is True:
+        return HedgePolicy()
+    if isinstance(hedge, HedgePolicy):
+        return hedge
+    if isinstance(hedge, (int, float)):
+        return HedgePolicy(delay=float(hedge))
+    raise TypeError(f"hedge must be a HedgePolicy, a delay in seconds or a bool, not {type(hedge).__name__}")
+
+
+class Progress:
+    """Passed to each attempt, which reports admission and its first token through it.
+
+    Sync attempts cannot be interrupted from outside; they should stop reading once
+    `cancelled` is set.
+    """
+
+    __slots__ = ("_on_admitted", "_on_first_token", "cancelled")
+
+    def __init__(
+        self,
+        on_admitted: Optional[Callable[[], None]] = None,
+        on_first_token: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._on_admitted = on_admitted
+        self._on_first_token = on_first_token
+        self.cancelled = threading.Event()
+
+    def admitted(self) -> None:
+        """The request cleared local admission (rate limiter) and is being sent."""
+
+        if self._on_admitted is not None:
+            self._on_admitted()
+            self._on_admitted = None
+
+    def first_token(self) -> None:
+        if self._on_first_token is not None:
+            self._on_first_token()
+            self._on_first_token = None
+
+
+Attempt = Callable[[Progress], Any]
+AsyncAttempt = Callable[[Progress], Awaitable[Any]]
+
+
+class Hedger:
+    """Hedging state of one step: recent times to first token and the hedge budget."""
+
+    def __init__(self, policy: HedgePolicy) -> None:
+        self.policy = policy
+        self.calls = 0
+        self.hedged = 0
+        self.backup_wins = 0
+        self._samples: Deque[float] = deque(maxlen=max(1, policy.window))
+        self._credit = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait for the first token before hedging; None = do not hedge."""
+
+        if self.policy.delay is not None:
+            return self.policy.delay
+        with self._lock:
+            if len(self._samples) < self.policy.min_samples:
+                return None
+            samples = list(self._samples)
+        return percentile(samples, self.policy.percentile)
+
+    def observe(self, ttft: float) -> None:
+        with self._lock:
+            self._samples.append(ttft)
+
+    def _start_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self._credit = min(max(self.policy.burst, 1.0), self._credit + self.policy.max_rate)
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self._credit < 1.0:
+                return False
+            self._credit -= 1.0
+            self.hedged += 1
+            return True
+
+    # -- async --------------------------------------------------------------------
+
+    async def arun(self, primary: AsyncAttempt, backup: AsyncAttempt) -> Any:
+        """Run `primary`, hedging with `backup` if it is slow to produce a first token."""
+
+        self._start_call()
+        delay = self.delay()
+        admitted = asyncio.Event()
+        started = asyncio.Event()
+        sent_at: List[float] = []
+        raced: List[bool] = []
+
+        def on_admitted() -> None:
+            sent_at.append(time.perf_counter())
+            admitted.set()
+
+        def on_first_token() -> None:
+            if sent_at and not raced:
+                self.observe(time.perf_counter() - sent_at[0])
+            started.set()
+
+        main = asyncio.ensure_future(primary(Progress(on_admitted, on_first_token)))
+        tasks = [main]
+        try:
+            # The delay runs from admission: time queued behind our own limiter is not
+            # provider latency, and a duplicate would only queue behind it too.
+            if not await _until(admitted, main, None) or started.is_set():
+                return await main
+            if delay is None:
+                # Not enough samples yet: just collect this call's time to first token.
+                return await main
+            if await _until(started, main, delay) or main.done() or not self._take_hedge():
+                return await main
+            # Censored observation: the primary took at least this long.
+            raced.append(True)
+            self.observe(time.perf_counter() - sent_at[0])
+            tasks.append(asyncio.ensure_future(backup(Progress())))
+            winner, result = await _first_success(tasks)
+            if winner == 1:
+                self.backup_wins += 1
+            return result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    # -- sync ---------------------------------------------------------------------
+
+    def run(self, primary: Attempt, backup: Attempt) -> Any:
+        """Thread-based `arun` for sync steps; the losing attempt is told to stop."""
+
+        self._start_call()
+        delay = self.delay()
+        if delay is None:
+            # Nothing to race: run inline and only record the time to first token.
+            start = time.perf_counter()
+            return primary(Progress(None, lambda: self.observe(time.perf_counter() - start)))
+
+        signal = threading.Event()
+        start = time.perf_counter()
+        raced: List[bool] = []
+
+        def on_first_token() -> None:
+            if not raced:
+                self.observe(time.perf_counter() - start)
+            signal.set()
+
+        progress = [Progress(None, on_first_token)]
+        futures = [_in_thread(primary, progress[0])]
+        futures[0].add_done_callback(lambda _: signal.set())
+        try:
+            if signal.wait(delay) or not self._take_hedge():
+                return futures[0].result()
+            raced.append(True)
+            self.observe(time.perf_counter() - start)
+            progress.append(Progress())
+            futures.append(_in_thread(backup, progress[1]))
+            pending = set(futures)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    exc = future.exception()
+                    if exc is None:
+                        if future is futures[1]:
+                            self.backup_wins += 1
+                        return future.result()
+                    if future is futures[0] or error is None:
+                        error = exc
+            assert error is not None
+            raise error
+        finally:
+            for p, future in zip(progress, futures):
+                if not future.done():
+                    p.cancelled.set()
+
+
+async def _until(event: asyncio.Event, task: "asyncio.Future[Any]", timeout: Optional[float]) -> bool:
+    """Wait for `event` or for `task` to finish; False if the task finished first or
+    the timeout passed."""
+
+    if event.is_set():
+        return True
+    waiter = asyncio.ensure_future(event.wait())
+    try:
+        await asyncio.wait({waiter, task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        waiter.cancel()
+    return event.is_set() and not task.done()
+
+
+async def _first_success(tasks: List["asyncio.Future[Any]"]) -> Any:
+    """(index, result) of the first task to succeed; the primary's error if all fail."""
+
+    pending = set(tasks)
+    errors: Dict[int, BaseException] = {}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.cancelled():
+                errors[tasks.index(task)] = asyncio.CancelledError()
+            elif task.exception() is None:
+                return tasks.index(task), task.result()
+            else:
+                errors[tasks.index(task)] = task.exception()
+    raise errors.get(0) or next(iter(errors.values()))
+
+
+def _in_thread(fn: Attempt, progress: Progress) -> "Future[Any]":
+    future: "Future[Any]" = Future()
+    context = contextvars.copy_context()
+
+    def target() -> None:
+        try:
+            future.set_result(context.run(fn, progress))
+        except BaseException as e:  # delivered to the caller through the future
+            future.set_exception(e)
+
+    threading.Thread(target=target, name="slick-hedge", daemon=True).start()
+    return future
@@ -0,0 +1,201 @@
+"""Per-provider admission control for async LLM requests.
+
+A `ProviderLimiter` combines:
+- token buckets for requests-per-minute and tokens-per-minute budgets, and
+- an AIMD concurrency window: it doubles every round trip until the first 429 (slow
+  start), then grows by roughly one slot per window of successful requests and shrinks
+  multiplicatively on 429s.
+
+Without an RPM or TPM budget the window starts at its maximum, so an unthrottled
+provider does not slow down a large fan-out while the window ramps up.
+
+Latency is deliberately not a congestion signal: a slot is held from admission until the
+caller is done with the response, which includes generation and however long a consumer
+keeps a stream open, so long (or heavy-tailed) calls say nothing about the provider
+being overloaded.
+
+Limiters are created per provider by `slick.models.get_limiter` from the settings on
+the matching `PROVIDERS` entry.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Optional
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Best-effort detection of a provider 429 across SDKs."""
+
+    for obj in (exc, getattr(exc, "response", None)):
+        if getattr(obj, "status_code", None) == 429 or getattr(obj, "status", None) == 429:
+            return True
+    return "ratelimit" in type(exc).__name__.lower()
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` tokens per minute.
+
+    `reserve` always succeeds and may put the bucket into debt; the caller waits for the
+    returned delay before sending, which keeps admission FIFO without a queue.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens; return seconds to wait before they are available."""
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency window shared by coroutines, possibly on different event loops."""
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.5,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.backoff = backoff
+        self.in_flight = 0
+        self.slow_start = True
+        self.baseline_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            if self.in_flight < int(self.limit) and not self._waiters:
+                self.in_flight += 1
+                return
+            fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was granted just as we were cancelled; hand it back.
+                self._release_slot()
+            raise
+
+    def release(self, outcome: str = "ok", latency: Optional[float] = None) -> None:
+        """Return a slot and adapt the window. `outcome` is "ok", "throttled" or "error"."""
+
+        with self._lock:
+            if latency is not None:
+                self._observe(latency)
+            if outcome == "throttled":
+                self._decrease(time.monotonic())
+            elif outcome == "ok":
+                # One slot per success doubles the window each round trip; after the
+                # first 429, one slot per window's worth of successes.
+                step = 1.0 if self.slow_start else 1.0 / self.limit
+                self.limit = min(self.maximum, self.limit + step)
+            self.in_flight -= 1
+            self._wake()
+
+    def _observe(self, latency: float) -> None:
+        # Only used to space out decreases, never to trigger them.
+        base = self.baseline_latency
+        self.baseline_latency = latency if base is None else 0.95 * base + 0.05 * latency
+
+    def _decrease(self, now: float) -> None:
+        # One decrease per round trip: a burst of 429s from the same window counts once.
+        cooldown = self.baseline_latency or 1.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self.slow_start = False
+        self.limit = max(float(self.minimum), self.limit * self.backoff)
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def _wake(self) -> None:
+        # Called with the lock held.
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.get_loop().call_soon_threadsafe(self._grant, fut)
+
+    def _grant(self, fut: asyncio.Future[None]) -> None:
+        if fut.done():  # cancelled while the grant was in transit
+            self._release_slot()
+        else:
+            fut.set_result(None)
+
+
+class ProviderLimiter:
+    """RPM/TPM budgets plus an adaptive concurrency window for one provider."""
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_concurrency: int = 64,
+        initial_concurrency: Optional[int] = None,
+    ) -> None:
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        if initial_concurrency is None:
+            budgeted = self.requests is not None or self.tokens is not None
+            initial_concurrency = 8 if budgeted else max_concurrency
+        self.concurrency = AdaptiveConcurrency(initial=initial_concurrency, maximum=max_concurrency)
+
+    def _budget_delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        return delay
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold a request slot for the body; `tokens` is the estimated request size."""
+
+        delay = self._budget_delay(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await self.concurrency.acquire()
+        start = time.monotonic()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        except BaseException as e:
+            if is_rate_limit_error(e):
+                outcome = "throttled"
+            raise
+        finally:
+            self.concurrency.release(outcome, latency=time.monotonic() - start)
+
+    def stats(self) -> dict[str, Any]:
+        c = self.concurrency
+        return {"limit": int(c.limit), "in_flight": c.in_flight, "waiting": len(c._waiters)}
@@ -0,0 +1,435 @@
+"""Per-call phase timing for decorated steps, with pluggable sinks.
+
+When at least one sink is installed, every `llm_step` / `llm_step_async` call (and
+`batch`, `abatch`, `stream`, `astream`) produces a `CallRecord` with the time spent in
+each phase:
+
+    client      getting the chat model from the pool (construction on a miss)
+    queue       waiting for the provider limiter (async calls)
+    render      binding arguments into the template, up to the request being sent
+    ttft        request sent until the first token arrives; for non-streamed calls
+                the whole response arrives at once, so this is the full network time
+    generation  first token until the last (streamed calls)
+    parse       output parsing and anything after the response
+
+plus input/output token counts (and input tokens read from the provider's prompt
+cache), retry count and tags (function, provider, model and
+any set with `tags(...)`). With no sink installed the decorators skip all of this.
+
+    from slick import metrics
+
+    registry = metrics.enable()          # in-process histograms
+    ...
+    print(registry.to_prometheus())      # Prometheus text exposition format
+
+A sink is any callable taking a `CallRecord`; add your own with `add_sink`.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PHASES = ("client", "queue", "render", "ttft", "generation", "parse")
+
+# Upper bounds (seconds) of the latency histograms.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Sink = Callable[["CallRecord"], None]
+
+_sinks: List[Sink] = []
+_sinks_lock = threading.Lock()
+_tags: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("slick_metric_tags", default={})
+
+
+@dataclass
+class CallRecord:
+    """Timing and usage of one step call."""
+
+    function: str
+    provider: Optional[str]
+    model: str
+    status: str  # "ok", "error", "cache_hit" or "coalesced" (shared an identical in-flight request)
+    duration: float  # seconds, whole call
+    phases: Dict[str, float] = field(default_factory=dict)  # seconds per phase in PHASES
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cache_read_tokens: Optional[int] = None  # input tokens served from the provider's prompt cache
+    retries: int = 0
+    streamed: bool = False
+    error: Optional[str] = None  # exception type name
+    tags: Dict[str, str] = field(default_factory=dict)
+    started_at: float = 0.0  # time.time() at call start
+
+
+def add_sink(sink: Sink) -> None:
+    """Send every CallRecord to `sink` (a callable). Sinks must be cheap and thread-safe."""
+
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks.append(sink)
+
+
+def remove_sink(sink: Sink) -> None:
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def clear_sinks() -> None:
+    with _sinks_lock:
+        _sinks.clear()
+
+
+def enabled() -> bool:
+    """True when at least one sink is installed (checked on every call)."""
+
+    return bool(_sinks)
+
+
+def emit(record: CallRecord) -> None:
+    for sink in list(_sinks):
+        try:
+            sink(record)
+        except Exception:
+            # A broken sink must never fail the step call it is observing.
+            pass
+
+
+@contextmanager
+def tags(**values: Any) -> Iterator[None]:
+    """Attach tags to the records of calls made inside the block."""
+
+    token = _tags.set({**_tags.get(), **{k: str(v) for k, v in values.items()}})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+_handler_cls = None
+
+
+def _callback_handler_cls():
+    # Built lazily: LangChain is only imported once a step actually runs.
+    global _handler_cls
+    if _handler_cls is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class _PhaseHandler(BaseCallbackHandler):
+            run_inline = True  # no executor hop in async runs
+
+            def __init__(self, timer: "CallTimer") -> None:
+                self.timer = timer
+
+            def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+                self.timer.marks.setdefault("llm_start", time.perf_counter())
+
+            def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+                self.timer.marks.setdefault("llm_start", time.perf_counter())
+
+            def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+                self.timer.marks.setdefault("first_token", time.perf_counter())
+
+            def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+                self.timer.marks["llm_end"] = time.perf_counter()
+                self.timer.add_usage(response)
+
+            def on_retry(self, retry_state: Any, **kwargs: Any) -> None:
+                self.timer.retries += 1
+
+        _handler_cls = _PhaseHandler
+    return _handler_cls
+
+
+class CallTimer:
+    """Collects phase timestamps for one call and emits its CallRecord on `finish`."""
+
+    def __init__(self, function: str, provider: Optional[str], model: str, streamed: bool = False) -> None:
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.function = function
+        self.provider = provider
+        self.model = model
+        self.streamed = streamed
+        self.tags = _tags.get()
+        self.marks: Dict[str, float] = {}
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+        self.cache_read_tokens: Optional[int] = None
+        self.retries = 0
+        self._handler: Any = None
+
+    def mark(self, name: str) -> None:
+        self.marks[name] = time.perf_counter()
+
+    def config(self, **extra: Any) -> Dict[str, Any]:
+        """Runnable config that routes LangChain callbacks for this call to the timer."""
+
+        if self._handler is None:
+            self._handler = _callback_handler_cls()(self)
+        return {"callbacks": [self._handler], **extra}
+
+    def add_usage(self, response: Any) -> None:
+        for generations in getattr(response, "generations", None) or ():
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+                if usage:
+                    self.input_tokens = (self.input_tokens or 0) + int(usage.get("input_tokens") or 0)
+                    self.output_tokens = (self.output_tokens or 0) + int(usage.get("output_tokens") or 0)
+                    cache_read = (usage.get("input_token_details") or {}).get("cache_read")
+                    if cache_read is not None:
+                        self.cache_read_tokens = (self.cache_read_tokens or 0) + int(cache_read)
+                    # One usage entry covers the whole request; later generations of the
+                    # same request (n > 1) repeat it on some providers.
+                    return
+
+    def phases(self, end: float) -> Dict[str, float]:
+        m = self.marks
+        # Binding and the cache lookup run before the client is fetched; count them as render.
+        prepared = m.get("prepared", self.started)
+        client_end = m.get("client", prepared)
+        out = {"client": client_end - prepared}
+        if "queue_start" in m and "admitted" in m:
+            out["queue"] = m["admitted"] - m["queue_start"]
+        llm_start = m.get("llm_start")
+        if llm_start is None:
+            return out
+        sent_after = max(client_end, m.get("admitted", client_end))
+        out["render"] = (prepared - self.started) + max(0.0, llm_start - sent_after)
+        llm_end = m.get("llm_end", end)
+        first = min(m.get("first_token", llm_end), llm_end)
+        out["ttft"] = first - llm_start
+        out["generation"] = llm_end - first
+        out["parse"] = max(0.0, end - llm_end)
+        return out
+
+    def finish(self, error: Optional[BaseException] = None, status: Optional[str] = None) -> CallRecord:
+        end = time.perf_counter()
+        record = CallRecord(
+            function=self.function,
+            provider=self.provider,
+            model=self.model,
+            status=status or ("error" if error is not None else "ok"),
+            duration=end - self.started,
+            phases=self.phases(end) if status not in ("cache_hit", "coalesced") else {},
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            cache_read_tokens=self.cache_read_tokens,
+            retries=self.retries,
+            streamed=self.streamed,
+            error=type(error).__name__ if error is not None else None,
+            tags=self.tags,
+            started_at=self.started_at,
+        )
+        emit(record)
+        return record
+
+
+def timer_from_config(config: Any) -> Optional[CallTimer]:
+    """The CallTimer whose handler is attached to a runnable config, if any."""
+
+    callbacks = (config or {}).get("callbacks")
+    for handler in getattr(callbacks, "handlers", callbacks) or ():
+        timer = getattr(handler, "timer", None)
+        if isinstance(timer, CallTimer):
+            return timer
+    return None
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile; None for no values."""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil(n * q / 100)
+    return ordered[int(min(rank, len(ordered))) - 1]
+
+
+# -- in-process registry -------------------------------------------------------------
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate by linear interpolation within the bucket holding the q-th value."""
+
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            upper = self.bounds[i] if i < len(self.bounds) else math.inf
+            if n and seen + n >= rank:
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper
+        return lower
+
+
+_LABELS = ("function", "provider", "model")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Tuple[Tuple[str, str], ...]) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    # Full precision: "%g" would print 1234567 as 1.23457e+06.
+    if isinstance(value, int) or (math.isfinite(value) and float(value).is_integer()):
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Sink that aggregates records into histograms and counters, labelled by
+    function, provider and model (tags are not labels, to bound cardinality)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def __call__(self, record: CallRecord) -> None:
+        base = tuple(zip(_LABELS, (record.function, record.provider or "", record.model)))
+        with self._lock:
+            self._inc("slick_calls_total", base + (("status", record.status),))
+            if record.status == "cache_hit":
+                return
+            self._hist("slick_call_duration_seconds", base).observe(record.duration)
+            for phase, seconds in record.phases.items():
+                self._hist("slick_call_phase_seconds", base + (("phase", phase),)).observe(seconds)
+            if record.input_tokens is not None:
+                self._inc("slick_tokens_total", base + (("direction", "input"),), record.input_tokens)
+            if record.output_tokens is not None:
+                self._inc("slick_tokens_total", base + (("direction", "output"),), record.output_tokens)
+            if record.cache_read_tokens is not None:
+                self._inc("slick_tokens_total", base + (("direction", "cache_read"),), record.cache_read_tokens)
+            if record.retries:
+                self._inc("slick_retries_total", base, record.retries)
+
+    def _hist(self, name: str, labels: Tuple[Tuple[str, str], ...]) -> Histogram:
+        hist = self._histograms.get((name, labels))
+        if hist is None:
+            hist = self._histograms[(name, labels)] = Histogram(self.buckets)
+        return hist
+
+    def _inc(self, name: str, labels: Tuple[Tuple[str, str], ...], amount: float = 1) -> None:
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        """Look up one histogram, e.g. `histogram("slick_call_phase_seconds", function=..., ...)`."""
+
+        wanted = set(labels.items())
+        for (hist_name, pairs), hist in self._histograms.items():
+            if hist_name == name and set(pairs) == wanted:
+                return hist
+        return None
+
+    def counter(self, name: str, **labels: str) -> float:
+        wanted = set(labels.items())
+        return sum(v for (n, pairs), v in self._counters.items() if n == name and wanted <= set(pairs))
+
+    def summary(self, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[str, Dict[str, Any]]:
+        """Estimated latency quantiles per function and phase ("total" for whole calls)."""
+
+        out: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (name, pairs), hist in self._histograms.items():
+                labels = dict(pairs)
+                phase = labels.get("phase", "total")
+                row = out.setdefault(labels["function"], {})
+                row[phase] = {f"p{round(q * 100)}": hist.quantile(q) for q in quantiles}
+                row[phase]["count"] = hist.count
+        return out
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+
+        help_text = {
+            "slick_call_duration_seconds": ("histogram", "Wall time of llm_step calls."),
+            "slick_call_phase_seconds": ("histogram", "Time spent per phase of llm_step calls."),
+            "slick_calls_total": ("counter", "llm_step calls by status."),
+            "slick_tokens_total": ("counter", "Tokens reported by providers."),
+            "slick_retries_total": ("counter", "Retried provider requests."),
+        }
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, text) in help_text.items():
+                series = []
+                if kind == "histogram":
+                    for (hist_name, pairs), hist in sorted(self._histograms.items()):
+                        if hist_name != name:
+                            continue
+                        cumulative = 0
+                        for bound, n in zip(hist.bounds + (math.inf,), hist.counts):
+                            cumulative += n
+                            le = "+Inf" if math.isinf(bound) else repr(bound)
+                            series.append(f"{name}_bucket{_labels(pairs + (('le', le),))} {cumulative}")
+                        series.append(f"{name}_sum{_labels(pairs)} {hist.sum!r}")
+                        series.append(f"{name}_count{_labels(pairs)} {hist.count}")
+                else:
+                    for (counter_name, pairs), value in sorted(self._counters.items()):
+                        if counter_name == name:
+                            series.append(f"{name}{_labels(pairs)} {_number(value)}")
+                if series:
+                    lines.append(f"# HELP {name} {text}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    lines.extend(series)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def default_registry() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def enable(registry: Optional[MetricsRegistry] = None) -> MetricsRegistry:
+    """Install a registry (default: the process-wide one) as a sink and return it."""
+
+    registry = registry or default_registry()
+    add_sink(registry)
+    return registry
+
+
+def prometheus_text() -> str:
+    """The default registry in Prometheus text format (for a /metrics endpoint)."""
+
+    return default_registry().to_prometheus()
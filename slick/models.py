@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple, Callable
-import os
+import threading
+import time
  
 
 
@@ -39,10 +41,34 @@ def _load_provider(name: str):
         from .providers.fireworks import FireworksProvider
 
         return FireworksProvider
+    if name == "fake":
+        from .providers.fake import FakeProvider
+
+        return FakeProvider
     raise ValueError(f"Unknown provider: {name}")
 
 
-PROVIDERS = {name: name for name in ["openai", "anthropic", "google", "mistral", "groq", "together", "fireworks"]}
+@dataclass
+class ProviderSpec:
+    """Settings for one entry in PROVIDERS.
+
+    Rate limits apply to async decorated steps through the provider's limiter
+    (see `get_limiter`); `None` means no budget is enforced for that dimension.
+    """
+
+    name: str
+    rpm: Optional[int] = None  # requests per minute
+    tpm: Optional[int] = None  # tokens per minute (estimated from prompt size + max_tokens)
+    max_concurrency: int = 64  # ceiling for the adaptive concurrency window
+    initial_concurrency: Optional[int] = None  # default: 8 with an rpm/tpm budget, else max
+
+
+PROVIDERS: Dict[str, ProviderSpec] = {
+    name: ProviderSpec(name)
+    for name in ["openai", "anthropic", "google", "mistral", "groq", "together", "fireworks"]
+}
+# Offline provider for tests and benchmarks; there is no server to protect.
+PROVIDERS["fake"] = ProviderSpec("fake", max_concurrency=1024)
 
 # In-memory defaults (overridden by resolution logic)
 _default_model: Optional[str] = None
@@ -61,12 +87,12 @@ def set_default_model(model: str, provider: Optional[str] = None) -> None:
 
 
 def get_default_model() -> Tuple[Optional[str], Optional[str]]:
-    """Return the currently resolved default (in-memory only for now).
+    """Return the currently resolved default: in-memory, else env / user / project config."""
 
-    TODO: Load from env, user config, project config if in-memory is not set.
-    """
+    from .config import resolve_defaults
 
-    return _default_model, _default_provider
+    cfg_model, cfg_provider = resolve_defaults()
+    return _default_model or cfg_model, _default_provider or cfg_provider
 
 
 def list_providers() -> List[str]:
@@ -75,30 +101,100 @@ def list_providers() -> List[str]:
     return list(PROVIDERS.keys())
 
 
-def list_models(provider: str) -> List[str]:
-    """List models for a given provider (best-effort).
+def get_provider(provider: str) -> Any:
+    """The Provider class for a PROVIDERS key (imports its SDK on first use)."""
+
+    spec = PROVIDERS.get(provider)
+    if not spec:
+        raise ValueError(f"Unknown provider: {provider}")
+    return _load_provider(spec.name)
+
+
+def _fetch_models(provider: str) -> List[str]:
+    return get_provider(provider).list_models()
 
-    This aims to call the provider SDK's list models endpoint if available.
-    For example (to be implemented):
-    - openai: client.models.list()
-    - anthropic: client.models.list() (if available)
-    - google: genai.list_models()
-    - mistral: client.models.list()
-    - cohere: cohere.Client(...).models.list()
-    - groq: client.models.list()
 
-    TODO: Implement per-provider listing using their official SDKs, with graceful fallbacks.
+def list_models(provider: str, refresh: bool = False) -> List[str]:
+    """List models for a given provider (best-effort).
+
+    Listings come from the provider SDK's list-models endpoint and are cached on disk
+    (see `slick.catalog`) for a day; pass `refresh=True` to refetch. Errors and missing
+    API keys yield an empty list, which is never cached.
     """
 
-    provider_key = PROVIDERS.get(provider)
-    if not provider_key:
+    from . import catalog
+
+    spec = PROVIDERS.get(provider)
+    if not spec:
         raise ValueError(f"Unknown provider: {provider}")
+    if not refresh:
+        cached = catalog.get(provider)
+        if cached is not None:
+            return cached
     try:
-        provider_cls = _load_provider(provider_key)
-        return provider_cls.list_models()
+        names = _fetch_models(provider)
     except Exception:
         # Keep errors non-fatal for listing. Callers can inspect logs later.
         return []
+    if names:
+        catalog.put(provider, names)
+    return names
+
+
+def list_all_models(
+    providers: Optional[List[str]] = None, timeout: float = 10.0, refresh: bool = False
+) -> Dict[str, List[str]]:
+    """List models for every provider concurrently.
+
+    Fresh catalog entries are used as-is; the rest are fetched in parallel threads,
+    bounded together by `timeout` seconds. A provider that fails or times out falls back
+    to its stale catalog entry (or an empty list).
+    """
+
+    import queue
+
+    from . import catalog
+
+    names = providers or list_providers()
+    results: Dict[str, List[str]] = {}
+    todo = []
+    for name in names:
+        cached = None if refresh else catalog.get(name)
+        if cached is not None:
+            results[name] = cached
+        else:
+            todo.append(name)
+    if not todo:
+        return results
+
+    done: "queue.Queue[Tuple[str, List[str]]]" = queue.Queue()
+
+    def fetch(name: str) -> None:
+        try:
+            fetched = _fetch_models(name)
+        except Exception:
+            fetched = []
+        done.put((name, fetched))
+
+    # Daemon threads: a provider that hangs past the timeout must not keep the process alive.
+    for name in todo:
+        threading.Thread(target=fetch, args=(name,), name=f"slick-models-{name}", daemon=True).start()
+    deadline = time.monotonic() + timeout
+    fetched_by_name: Dict[str, List[str]] = {}
+    while len(fetched_by_name) < len(todo):
+        try:
+            name, fetched = done.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        fetched_by_name[name] = fetched
+    for name in todo:
+        fetched = fetched_by_name.get(name) or []
+        if fetched:
+            catalog.put(name, fetched)
+            results[name] = fetched
+        else:
+            results[name] = catalog.get(name, ttl=None) or []
+    return {name: results[name] for name in names}
 
 
 def is_available(provider: str) -> bool:
@@ -120,8 +216,154 @@ def _dynamic_import(dotted_path: str) -> Any:
     return getattr(mod, attr)
 
 
+def resolve_model(model: Optional[str] = None, provider: Optional[str] = None) -> Tuple[str, str]:
+    """Resolve the (model, provider) pair a call would use, without building a client.
+
+    Without an explicit provider, an explicitly requested model is looked up in the
+    local model index (`slick.catalog.infer_provider`) before the configured default
+    provider applies; no network call is made. A model written as "provider:model"
+    (e.g. "groq:llama-3.1-8b-instant") selects the provider directly when the prefix
+    names a known provider.
+    """
+
+    from .catalog import infer_provider
+    from .config import resolve_defaults
+
+    if model and not provider:
+        prefix, sep, rest = model.partition(":")
+        if sep and rest and prefix in PROVIDERS:
+            model, provider = rest, prefix
+    cfg_model, cfg_provider = resolve_defaults()
+    sel_model = model or _default_model or cfg_model or "gpt-4o-mini"
+    sel_provider = (
+        provider
+        or (model and infer_provider(model))
+        or _default_provider
+        or cfg_provider
+        or infer_provider(sel_model)
+        or "openai"
+    )
+    if sel_provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider: {sel_provider}")
+    return sel_model, sel_provider
+
+
+_LIMIT_FIELDS = ("rpm", "tpm", "max_concurrency", "initial_concurrency")
+# Chat model constructor settings that may come from [providers.<name>] in config files.
+_CHAT_SETTING_FIELDS = ("base_url", "timeout", "max_retries")
+
+# provider -> (config generation, limiter)
+_limiters: Dict[str, Tuple[int, Any]] = {}
+_limiters_lock = threading.Lock()
+# Settings passed to configure_limits win over config files and ProviderSpec defaults.
+_explicit_limits: Dict[str, Dict[str, Any]] = {}
+
+
+def get_limiter(provider: str) -> Any:
+    """Return the shared ProviderLimiter for a provider.
+
+    Settings come from the PROVIDERS entry, overridden by the provider's section in the
+    config files, overridden by `configure_limits`. The limiter is rebuilt when the
+    config files change.
+    """
+
+    from .config import generation, provider_settings
+
+    gen = generation()
+    cached = _limiters.get(provider)
+    if cached is not None and cached[0] == gen:
+        return cached[1]
+    spec = PROVIDERS.get(provider)
+    if not spec:
+        raise ValueError(f"Unknown provider: {provider}")
+    from .limits import ProviderLimiter
+
+    with _limiters_lock:
+        cached = _limiters.get(provider)
+        if cached is not None and cached[0] == gen:
+            return cached[1]
+        settings = {name: getattr(spec, name) for name in _LIMIT_FIELDS}
+        file_settings = provider_settings(provider)
+        settings.update((k, file_settings[k]) for k in _LIMIT_FIELDS if k in file_settings)
+        settings.update(_explicit_limits.get(provider, {}))
+        limiter = ProviderLimiter(**settings)
+        _limiters[provider] = (gen, limiter)
+    return limiter
+
+
+def configure_limits(provider: str, **settings: Any) -> None:
+    """Update rate-limit settings on a PROVIDERS entry (rpm, tpm, max_concurrency, ...).
+
+    The provider's limiter is rebuilt on next use; requests already admitted keep
+    their slots on the old limiter.
+    """
+
+    spec = PROVIDERS.get(provider)
+    if not spec:
+        raise ValueError(f"Unknown provider: {provider}")
+    for name, value in settings.items():
+        if name not in _LIMIT_FIELDS:
+            raise ValueError(f"Unknown limit setting: {name}")
+        setattr(spec, name, value)
+    with _limiters_lock:
+        _explicit_limits.setdefault(provider, {}).update(settings)
+        _limiters.pop(provider, None)
+
+
+def _chat_settings(provider: str) -> Dict[str, Any]:
+    settings = {}
+    from .config import provider_settings
+
+    file_settings = provider_settings(provider)
+    for name in _CHAT_SETTING_FIELDS:
+        if name in file_settings:
+            settings[name] = file_settings[name]
+    return settings
+
+
+# Bounded LRU pool of constructed chat models. Building a LangChain chat model creates a
+# fresh SDK client (and with it a new HTTP connection pool), so identical configurations
+# share one warm instance instead of paying construction and TLS setup on every call.
+CHAT_MODEL_POOL_SIZE = 64
+
+_chat_pool: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+_chat_pool_lock = threading.Lock()
+
+
+def _freeze(value: Any) -> Any:
+    """Return a hashable, order-independent form of a kwargs value.
+
+    Mappings and sequences are frozen recursively; other objects (e.g. callback
+    handlers) are keyed by their own hash, which is identity for plain objects.
+    Raises TypeError for values that cannot be hashed.
+    """
+
+    if isinstance(value, dict):
+        return ("__dict__",) + tuple(sorted(((str(k), _freeze(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+def _pool_key(provider: str, model: str, kwargs: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    try:
+        return (provider, model, _freeze(kwargs))
+    except TypeError:
+        return None
+
+
+def clear_chat_model_cache() -> None:
+    """Drop all pooled chat model instances."""
+
+    with _chat_pool_lock:
+        _chat_pool.clear()
+
+
 def create_chat_model(
-    model: Optional[str] = None,
+    model: Optional[Any] = None,
     provider: Optional[str] = None,
     **kwargs: Any,
 ) -> Any:
@@ -135,22 +377,65 @@ def create_chat_model(
     5) Project config (pyproject.toml [tool.slick])
     6) Built-in default (openai:gpt-4o-mini)
 
-    TODO:
-    - Implement the full resolution order.
-    - Resolve provider from registry if only model provided.
-    - Dynamic import of provider class; instantiate with kwargs and API key from env.
-    - Support Azure deployment nuances (deployment name vs model).
-    - Respect 'streaming' flag if passed; allow callbacks passthrough.
-    """
+    A model without a provider is looked up in the local model index, and a
+    "provider:model" string selects the provider directly (see `resolve_model`).
 
-    # Resolve provider/model
-    sel_provider = provider or _default_provider or os.getenv("SLICK_PROVIDER") or "openai"
-    sel_model = model or _default_model or os.getenv("SLICK_MODEL") or "gpt-4o-mini"
+    Per-provider `base_url`, `timeout` and `max_retries` from the config files
+    (`[providers.<name>]`) are applied unless passed explicitly.
 
-    provider_key = PROVIDERS.get(sel_provider)
-    if not provider_key:
-        raise ValueError(f"Unknown provider: {sel_provider}")
-    provider_cls = _load_provider(provider_key)
-    return provider_cls.make_chat(sel_model, **kwargs)
+    Instances are pooled: calls with the same provider, model and kwargs return the same
+    chat model (up to ``CHAT_MODEL_POOL_SIZE`` configurations, least recently used evicted).
+
+    `model` may also be a `slick.routing.Router` or a list of "provider:model" targets;
+    the result is then a chat model that routes each request across them with failover.
 
+    While a cassette is active (`slick.cassette`), the model records its traffic to it or
+    replays responses from it.
+    """
 
+    if model is not None and not isinstance(model, str):
+        from .routing import as_router, make_routed_chat
+
+        if provider is not None:
+            raise ValueError("provider cannot be combined with a routed model; use 'provider:model' targets")
+        router = as_router(model)
+        return _pooled(_pool_key("router", router, kwargs), lambda: make_routed_chat(router, **kwargs))
+
+    sel_model, provider_key = resolve_model(model, provider)
+    settings = _chat_settings(provider_key)
+    if settings:
+        # Explicit kwargs win over config-file settings.
+        kwargs = {**settings, **kwargs}
+    key = _pool_key(provider_key, sel_model, kwargs)
+    from .cassette import active_cassette
+
+    tape = active_cassette()
+    if tape is not None:
+        # Recorded or replayed traffic (slick.cassette); replay never builds the provider's client.
+        def build(settings: Dict[str, Any]) -> Any:
+            return _load_provider(PROVIDERS[provider_key].name).make_chat(sel_model, **settings)
+
+        return _pooled(None if key is None else key + (tape,), lambda: tape.chat(provider_key, sel_model, kwargs, build))
+    provider_cls = _load_provider(PROVIDERS[provider_key].name)
+    return _pooled(key, lambda: provider_cls.make_chat(sel_model, **kwargs))
+
+
+def _pooled(key: Optional[Tuple[Any, ...]], build: Callable[[], Any]) -> Any:
+    if key is not None:
+        with _chat_pool_lock:
+            chat = _chat_pool.get(key)
+            if chat is not None:
+                _chat_pool.move_to_end(key)
+                return chat
+
+    chat = build()
+    if key is None:
+        # Unhashable kwargs: cannot be pooled safely, hand out a private instance.
+        return chat
+    with _chat_pool_lock:
+        # Another thread may have built the same model meanwhile; keep the first one.
+        chat = _chat_pool.setdefault(key, chat)
+        _chat_pool.move_to_end(key)
+        while len(_chat_pool) > CHAT_MODEL_POOL_SIZE:
+            _chat_pool.popitem(last=False)
+    return chat
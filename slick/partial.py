@@ -0,0 +1,151 @@
+"""Incremental parsing of streamed JSON into partially populated Pydantic models.
+
+Used by `fn.stream_partial(...)` / `fn.astream_partial(...)` on steps whose return
+annotation is a `BaseModel`. As text chunks arrive, the JSON object is parsed
+incrementally and each update is reported as a `PartialResult`. A top-level field
+counts as complete once the next field starts or the object closes; the last event
+carries the fully validated model.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PartialResult(Generic[T]):
+    """One streaming update for a structured step."""
+
+    value: T  # model built with `model_construct` until `done`, then fully validated
+    completed: Tuple[str, ...]  # top-level fields whose values are final
+    newly_completed: Tuple[str, ...]  # fields completed by this update
+    done: bool = False
+
+
+class PartialModelStream(Generic[T]):
+    """Feed text chunks of a JSON object; get partial models back.
+
+    Text before the opening brace (e.g. a ```json fence) and after the matching closing
+    brace is ignored. Each chunk is scanned once: top-level members are parsed when the
+    comma after them arrives and kept, and only the member still being written is
+    re-read, so a long stream costs time linear in its length.
+    """
+
+    def __init__(self, model_cls: Type[T]) -> None:
+        self.model_cls = model_cls
+        self.text = ""
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._stack: List[str] = []  # closers of the open containers, outermost first
+        self._in_string = False
+        self._escape = False
+        self._member = 0  # where the top-level member being written starts
+        self._fields: Dict[str, Any] = {}  # finished top-level members
+        self._current: Optional[Dict[str, Any]] = None
+        self._last: Optional[Dict[str, Any]] = None
+        self._completed: Tuple[str, ...] = ()
+
+    @property
+    def closed(self) -> bool:
+        return self._end is not None
+
+    def _scan(self, offset: int) -> None:
+        text = self.text
+        stack = self._stack
+        for i in range(offset, len(text)):
+            ch = text[i]
+            if self._start is None:
+                if ch == "{":
+                    self._start = i
+                    self._member = i + 1
+                    stack.append("}")
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                stack.append("}")
+            elif ch == "[":
+                stack.append("]")
+            elif ch in "}]":
+                stack.pop()
+                if not stack:
+                    self._end = i
+                    return
+            elif ch == "," and len(stack) == 1:
+                self._finish_member(text[self._member : i])
+                self._member = i + 1
+
+    def _finish_member(self, member: str) -> None:
+        try:
+            self._fields.update(json.loads("{" + member + "}", strict=False))
+        except ValueError:
+            pass  # malformed; the final validation reports it
+
+    def _partial_member(self) -> Dict[str, Any]:
+        """The top-level member being written, e.g. {"body": "long te"}."""
+
+        member = self.text[self._member :]
+        if self._in_string:
+            body = member + '"'
+        else:
+            body = member.rstrip()
+            if body.endswith(","):
+                body = body[:-1]
+        try:
+            # Close what the scanner knows is open; cheap and right at most cut points.
+            data = json.loads("{" + body + "".join(reversed(self._stack)), strict=False)
+        except ValueError:
+            from langchain_core.utils.json import parse_partial_json
+
+            data = parse_partial_json("{" + member)
+        return data if isinstance(data, dict) else {}
+
+    def feed(self, chunk: str) -> Optional[PartialResult[T]]:
+        """Add a chunk; return an update if the parsed object changed."""
+
+        if self.closed or not chunk:
+            return None
+        offset = len(self.text)
+        self.text += chunk
+        finished = len(self._fields)
+        self._scan(offset)
+        if self._start is None:
+            return None
+        if self.closed:
+            data = json.loads(self.text[self._start : self._end + 1])  # type: ignore[operator]
+            completed = tuple(data)
+        else:
+            current = self._partial_member()
+            if current == self._current and len(self._fields) == finished:
+                return None
+            self._current = current
+            data = {**self._fields, **current}
+            completed = tuple(self._fields)
+        self._last = data
+        newly = completed[len(self._completed) :]
+        self._completed = completed
+        value = self.model_cls.model_construct(**data)  # type: ignore[attr-defined]
+        return PartialResult(value=value, completed=completed, newly_completed=newly)
+
+    def finish(self) -> PartialResult[T]:
+        """Validate the full object; raises if the stream did not contain one."""
+
+        if not self.closed:
+            raise ValueError(f"Stream ended before the JSON object was complete: {self.text!r}")
+        value = self.model_cls.model_validate_json(  # type: ignore[attr-defined]
+            self.text[self._start : self._end + 1]  # type: ignore[operator]
+        )
+        keys = tuple(self._last or ())
+        newly = keys[len(self._completed) :]
+        return PartialResult(value=value, completed=keys, newly_completed=newly, done=True)
@@ -0,0 +1,359 @@
+"""Pipelines: run dependent steps as a graph, each one as soon as its inputs are ready.
+
+Nodes are decorated steps (or any function). A node's parameters are wired by name to
+other nodes' outputs or to the pipeline's inputs, so the graph follows from the
+signatures:
+
+    pipe = Pipeline()
+    pipe.add(summarize)                          # summarize(doc) -> Summary
+    pipe.add(extract_keywords)                   # extract_keywords(doc) -> Keywords
+    pipe.add(write_report)                       # write_report(summarize, extract_keywords)
+    pipe.add(translate, inputs={"text": "write_report"}, name="report_fr")
+
+    result = await pipe.arun(doc=text)
+    result["report_fr"], result.trace.critical_path()
+
+Independent nodes run concurrently (`summarize` and `extract_keywords` above), so the
+end-to-end latency is that of the critical path rather than the sum of all nodes.
+Async nodes (`llm_step_async`) run on the event loop, sync ones in worker threads; the
+provider limiters still apply to every request.
+
+`astream` yields a `NodeEvent` as each node finishes, and every run records a `Trace`
+with per-node ready/start/end times. A failed node does not stop independent branches;
+the nodes that depend on it are skipped, and `arun` raises `PipelineError` carrying the
+partial result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+
+@dataclass
+class NodeTrace:
+    """One node's run. Times are seconds since the pipeline started."""
+
+    name: str
+    deps: Tuple[str, ...]
+    status: str = "pending"  # ok | error | skipped
+    ready: float = 0.0  # all inputs available
+    start: float = 0.0  # admitted (differs from `ready` under max_concurrency)
+    end: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class Trace:
+    nodes: Dict[str, NodeTrace] = field(default_factory=dict)
+    total: float = 0.0
+
+    def critical_path(self) -> List[str]:
+        """The chain of nodes that set the end-to-end latency, first to last.
+
+        Starts from the node that finished last and walks back through the dependency
+        that became available last, i.e. the one each node was waiting for.
+        """
+
+        ran = [t for t in self.nodes.values() if t.status != "skipped"]
+        if not ran:
+            return []
+        node = max(ran, key=lambda t: t.end)
+        path = [node.name]
+        while node.deps:
+            node = max((self.nodes[d] for d in node.deps), key=lambda t: t.end)
+            path.append(node.name)
+        return path[::-1]
+
+    def summary(self) -> str:
+        critical = set(self.critical_path())
+        rows = sorted(self.nodes.values(), key=lambda t: (t.start, t.name))
+        width = max([len("node")] + [len(t.name) for t in rows])
+        lines = [f"{'node':<{width}}  {'start':>7}  {'end':>7}  {'took':>7}  status"]
+        for t in rows:
+            mark = " *" if t.name in critical else ""
+            lines.append(
+                f"{t.name:<{width}}  {t.start:7.3f}  {t.end:7.3f}  {t.duration:7.3f}  {t.status}{mark}"
+            )
+        lines.append(f"total {self.total:.3f}s; * = critical path")
+        return "\n".join(lines)
+
+
+@dataclass
+class NodeEvent:
+    """A node finished: its value, or the error it failed with (skipped nodes carry
+    the upstream error)."""
+
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    trace: Optional[NodeTrace] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class PipelineResult:
+    outputs: Dict[str, Any]
+    trace: Trace
+
+    def __getitem__(self, name: str) -> Any:
+        return self.outputs[name]
+
+
+class PipelineError(RuntimeError):
+    """Some nodes failed; `errors` maps node names to their exceptions and `result`
+    holds the outputs of the nodes that succeeded."""
+
+    def __init__(self, errors: Dict[str, BaseException], result: PipelineResult) -> None:
+        self.errors = errors
+        self.result = result
+        detail = "; ".join(f"{name}: {type(e).__name__}: {e}" for name, e in errors.items())
+        super().__init__(f"{len(errors)} pipeline node(s) failed: {detail}")
+
+
+@dataclass
+class _Node:
+    name: str
+    fn: Callable[..., Any]
+    sources: Dict[str, str]  # parameter -> node or pipeline input
+    optional: frozenset  # parameters with a default
+    is_async: bool
+
+
+class Pipeline:
+    """A graph of steps wired by parameter names (see the module docstring)."""
+
+    def __init__(self, max_concurrency: Optional[int] = None) -> None:
+        self.max_concurrency = max_concurrency
+        self._nodes: Dict[str, _Node] = {}
+
+    def add(
+        self,
+        fn: Callable[..., Any],
+        name: Optional[str] = None,
+        inputs: Optional[Mapping[str, str]] = None,
+    ) -> str:
+        """Add a node; returns its name (default: the function's name).
+
+        Each parameter is fed by the node or pipeline input of the same name, unless
+        `inputs` maps it to another source. Parameters with a default may stay unfed.
+        """
+
+        name = name or getattr(fn, "__name__", None)
+        if not name:
+            raise ValueError("Pass a name for nodes without __name__")
+        if name in self._nodes:
+            raise ValueError(f"Duplicate pipeline node: {name}")
+        params = [
+            p
+            for p in inspect.signature(fn).parameters.values()
+            if p.kind not in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD)
+        ]
+        inputs = dict(inputs or {})
+        unknown = set(inputs) - {p.name for p in params}
+        if unknown:
+            raise ValueError(f"{name}: no parameter(s) {', '.join(sorted(unknown))}")
+        self._nodes[name] = _Node(
+            name=name,
+            fn=fn,
+            sources={p.name: inputs.get(p.name, p.name) for p in params},
+            optional=frozenset(p.name for p in params if p.default is not inspect.Parameter.empty),
+            is_async=inspect.iscoroutinefunction(fn),
+        )
+        return name
+
+    def node(self, name: Optional[str] = None, inputs: Optional[Mapping[str, str]] = None) -> Callable[..., Any]:
+        """Decorator form of `add`; returns the function unchanged."""
+
+        def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+            self.add(fn, name=name, inputs=inputs)
+            return fn
+
+        return register
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def deps(self, name: str) -> Tuple[str, ...]:
+        """The nodes `name` waits for."""
+
+        node = self._nodes[name]
+        return tuple(dict.fromkeys(s for s in node.sources.values() if not self._is_input(node, s)))
+
+    @property
+    def inputs(self) -> List[str]:
+        """Pipeline inputs that some node requires (parameters without a default)."""
+
+        needed = []
+        for node in self._nodes.values():
+            for param, source in node.sources.items():
+                if self._is_input(node, source) and param not in node.optional and source not in needed:
+                    needed.append(source)
+        return needed
+
+    def order(self, outputs: Optional[Iterable[str]] = None) -> List[str]:
+        """Nodes in dependency order, limited to those `outputs` need; raises
+        ValueError on unknown nodes and cycles."""
+
+        wanted = list(self._nodes) if outputs is None else list(outputs)
+        for name in wanted:
+            if name not in self._nodes:
+                raise ValueError(f"Unknown pipeline node: {name}")
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                cycle = path[path.index(name) :] + (name,)
+                raise ValueError(f"Pipeline has a cycle: {' -> '.join(cycle)}")
+            state[name] = 1
+            for dep in self.deps(name):
+                visit(dep, path + (name,))
+            state[name] = 2
+            order.append(name)
+
+        for name in wanted:
+            visit(name, ())
+        return order
+
+    # -- running --------------------------------------------------------------------
+
+    def _is_input(self, node: _Node, source: str) -> bool:
+        # A parameter named like its own node reads the pipeline input of that name.
+        return source == node.name or source not in self._nodes
+
+    async def astream(self, outputs: Optional[Sequence[str]] = None, **inputs: Any) -> AsyncIterator[NodeEvent]:
+        """Run the pipeline, yielding a `NodeEvent` as each node finishes.
+
+        With `outputs`, only those nodes and what they depend on run. Leaving the
+        iteration early cancels the nodes still running.
+        """
+
+        async for event in _Run(self, outputs, inputs).events():
+            yield event
+
+    async def arun(self, outputs: Optional[Sequence[str]] = None, **inputs: Any) -> PipelineResult:
+        """Run to completion; raises `PipelineError` if any node failed."""
+
+        run = _Run(self, outputs, inputs)
+        async for _ in run.events():
+            pass
+        result = run.result()
+        failed = {name: e for name, e in run.errors.items() if result.trace.nodes[name].status == "error"}
+        if failed:
+            raise PipelineError(failed, result)
+        return result
+
+    def run(self, outputs: Optional[Sequence[str]] = None, **inputs: Any) -> PipelineResult:
+        """Blocking `arun`."""
+
+        return asyncio.run(self.arun(outputs, **inputs))
+
+
+class _Run:
+    """The state of one pipeline run (a pipeline may run many times concurrently)."""
+
+    def __init__(self, pipeline: Pipeline, outputs: Optional[Sequence[str]], inputs: Dict[str, Any]) -> None:
+        self.pipeline = pipeline
+        self.order = pipeline.order(outputs)
+        self.inputs = inputs
+        nodes = pipeline._nodes
+        missing = [
+            source
+            for name in self.order
+            for param, source in nodes[name].sources.items()
+            if pipeline._is_input(nodes[name], source) and source not in inputs and param not in nodes[name].optional
+        ]
+        if missing:
+            raise TypeError(f"Missing pipeline input(s): {', '.join(dict.fromkeys(missing))}")
+        self.traces = {name: NodeTrace(name, pipeline.deps(name)) for name in self.order}
+        self.values: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.start = 0.0
+        self.total = 0.0
+
+    def result(self) -> PipelineResult:
+        outputs = {name: self.values[name] for name in self.order if name in self.values}
+        return PipelineResult(outputs, Trace(self.traces, self.total))
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.start
+
+    async def events(self) -> AsyncIterator[NodeEvent]:
+        self.start = time.perf_counter()
+        done = {name: asyncio.Event() for name in self.order}
+        queue: "asyncio.Queue[NodeEvent]" = asyncio.Queue()
+        limit = self.pipeline.max_concurrency
+        gate = asyncio.Semaphore(limit) if limit else None
+
+        async def run(name: str) -> None:
+            trace = self.traces[name]
+            try:
+                for dep in trace.deps:
+                    await done[dep].wait()
+                trace.ready = trace.start = trace.end = self._now()
+                failed = next((dep for dep in trace.deps if dep in self.errors), None)
+                if failed is not None:
+                    trace.status, trace.error = "skipped", f"upstream node {failed} failed"
+                    self.errors[name] = self.errors[failed]
+                    queue.put_nowait(NodeEvent(name, error=self.errors[failed], trace=trace))
+                    return
+                if gate is None:
+                    value = await self._call(name)
+                else:
+                    async with gate:
+                        value = await self._call(name)
+            except Exception as e:
+                trace.end = self._now()
+                trace.status, trace.error = "error", f"{type(e).__name__}: {e}"
+                self.errors[name] = e
+                queue.put_nowait(NodeEvent(name, error=e, trace=trace))
+            else:
+                trace.status = "ok"
+                self.values[name] = value
+                queue.put_nowait(NodeEvent(name, value=value, trace=trace))
+            finally:
+                done[name].set()
+
+        tasks = [asyncio.ensure_future(run(name)) for name in self.order]
+        try:
+            for _ in self.order:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.total = self._now()
+
+    async def _call(self, name: str) -> Any:
+        node, trace = self.pipeline._nodes[name], self.traces[name]
+        kwargs = {}
+        for param, source in node.sources.items():
+            if self.pipeline._is_input(node, source):
+                if source in self.inputs:
+                    kwargs[param] = self.inputs[source]
+            else:
+                kwargs[param] = self.values[source]
+        trace.start = self._now()
+        try:
+            if node.is_async:
+                return await node.fn(**kwargs)
+            loop = asyncio.get_running_loop()
+            value = await loop.run_in_executor(None, lambda: node.fn(**kwargs))
+            if inspect.isawaitable(value):
+                value = await value
+            return value
+        finally:
+            trace.end = self._now()
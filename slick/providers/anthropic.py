@@ -3,19 +3,22 @@ from typing import Any, List
 import anthropic
 import langchain_anthropic
 
+from ..transport import get_client
 from .base import Provider
+from .batches import AnthropicBatchAPI
 
 
 class AnthropicProvider(Provider):
     name = "anthropic"
     env_key = "ANTHROPIC_API_KEY"
+    batch_api = AnthropicBatchAPI("anthropic", "ANTHROPIC_API_KEY")
 
     @staticmethod
     def list_models() -> List[str]:
         key = AnthropicProvider.get_api_key()
         if not key:
             return []
-        client = anthropic.Anthropic(api_key=key)
+        client = anthropic.Anthropic(api_key=key, http_client=get_client("anthropic"))
         models = client.models.list()
         return sorted(m.id for m in models.data)
 
@@ -23,4 +26,10 @@ class AnthropicProvider(Provider):
     def make_chat(model: str, **kwargs: Any):
         return langchain_anthropic.ChatAnthropic(model=model, api_key=AnthropicProvider.get_api_key(), **kwargs)
 
+    @staticmethod
+    def mark_cacheable(message: Any):
+        # Anthropic only caches prefixes ending in a block marked with cache_control.
+        from langchain_core.messages import SystemMessage
 
+        block = {"type": "text", "text": message.content, "cache_control": {"type": "ephemeral"}}
+        return SystemMessage(content=[block])
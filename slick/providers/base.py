@@ -2,7 +2,16 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 import os
-from typing import Any, List
+from typing import Any, Dict, List, Optional
+
+
+def json_schema_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """An OpenAI-style `response_format` asking for JSON that matches `schema`.
+
+    Not strict: strict mode rejects schemas with optional fields or free-form objects.
+    """
+
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": False}}
 
 
 class Provider(ABC):
@@ -13,6 +22,11 @@ class Provider(ABC):
 
     name: str
     env_key: str
+    # Bulk batch endpoint (`slick.providers.batches`), or None if the provider has none.
+    batch_api: Any = None
+    # Whether one request can return several completions (`n`). Multi-output steps send
+    # `n` single requests concurrently to providers that cannot.
+    supports_n: bool = False
 
     @classmethod
     def get_api_key(cls) -> str:
@@ -39,4 +53,25 @@ class Provider(ABC):
 
         raise NotImplementedError
 
+    @staticmethod
+    def mark_cacheable(message: Any) -> Any:
+        """Mark a step's static system message for the provider's prompt cache.
+
+        Decorated steps send the docstring's static lines and the format instructions
+        as a leading system message, so repeated calls share a prefix. Providers that
+        cache prefixes automatically (OpenAI, Groq, ...) need no hint and return the
+        message unchanged.
+        """
+
+        return message
+
+    @staticmethod
+    def structured_output(model: str, name: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Request options that make `model` reply with JSON matching `schema`, or None.
+
+        Steps with a BaseModel or dict return bind these options to the chat model,
+        leave the format instructions out of the prompt and validate the reply with
+        pydantic. Returning None (the default) keeps the format-instruction path.
+        """
 
+        return None
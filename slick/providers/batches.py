@@ -0,0 +1,300 @@
+"""Provider bulk batch endpoints: OpenAI-style Batch API and Anthropic Message Batches.
+
+Each API object turns step requests into the provider's batch format, submits them,
+reports job status and yields per-request results. They speak HTTP through the
+provider's shared client (`slick.transport`), and the base URL follows the provider's
+config section, so a proxy or a local stand-in works like it does for chat models.
+No provider SDK is needed.
+
+Used through `slick.bulk` (`fn.submit_batch(...)`); providers expose theirs as
+`Provider.batch_api`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Generation settings a step may carry that mean the same thing in a batch request.
+_OPENAI_PARAMS = (
+    "temperature",
+    "top_p",
+    "max_tokens",
+    "max_completion_tokens",
+    "stop",
+    "seed",
+    "n",
+    "presence_penalty",
+    "frequency_penalty",
+    "response_format",
+)
+_ANTHROPIC_PARAMS = ("temperature", "top_p", "top_k", "max_tokens")
+# Anthropic requires max_tokens; used when the step does not set it.
+ANTHROPIC_DEFAULT_MAX_TOKENS = 4096
+
+_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+class BatchError(RuntimeError):
+    """A batch request failed on the provider side, or the job could not be used."""
+
+
+@dataclass
+class BatchStatus:
+    """Provider-neutral job status.
+
+    `state` is one of "running" (validating, queued or in progress), "completed",
+    "failed", "cancelled" or "expired".
+    """
+
+    state: str
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    raw: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state != "running"
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+
+
+class BatchAPI(ABC):
+    """Common plumbing (base URL, shared HTTP client, API key); subclasses implement the protocol."""
+
+    def __init__(self, provider: str, env_key: str) -> None:
+        self.provider = provider
+        self.env_key = env_key
+
+    def base_url(self) -> str:
+        from ..config import provider_settings
+        from ..transport import BASE_URLS
+
+        return (provider_settings(self.provider).get("base_url") or BASE_URLS[self.provider]).rstrip("/")
+
+    def client(self) -> Any:
+        from ..transport import get_client
+
+        return get_client(self.provider)
+
+    def api_key(self) -> str:
+        key = os.getenv(self.env_key)
+        if not key:
+            raise BatchError(f"{self.env_key} is not set")
+        return key
+
+    @staticmethod
+    def _check(response: Any) -> Any:
+        if response.status_code >= 400:
+            raise BatchError(f"HTTP {response.status_code}: {response.text[:500]}")
+        return response
+
+    @abstractmethod
+    def build_request(self, custom_id: str, model: str, messages: Sequence[Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """One request of the batch file/body, in the provider's format."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def submit(self, requests: List[Dict[str, Any]]) -> str:
+        """Create the batch job; return its id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def status(self, batch_id: str) -> BatchStatus:
+        raise NotImplementedError
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[Tuple[str, Any]]:
+        """(custom_id, list of completion texts or a BatchError) per request."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def cancel(self, batch_id: str) -> None:
+        raise NotImplementedError
+
+
+class OpenAIBatchAPI(BatchAPI):
+    """The OpenAI Batch API (also served by OpenAI-compatible providers such as Groq):
+    upload a JSONL file, create a batch on /chat/completions, download the output file."""
+
+    _STATES = {
+        "validating": "running",
+        "in_progress": "running",
+        "finalizing": "running",
+        "cancelling": "running",
+        "completed": "completed",
+        "failed": "failed",
+        "expired": "expired",
+        "cancelled": "cancelled",
+    }
+
+    def __init__(self, provider: str = "openai", env_key: str = "OPENAI_API_KEY", window: str = "24h") -> None:
+        super().__init__(provider, env_key)
+        self.window = window
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key()}"}
+
+    def build_request(self, custom_id: str, model: str, messages: Sequence[Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        body: Dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": _ROLES.get(m.type, "user"), "content": _text(m.content)} for m in messages],
+        }
+        body.update((k, v) for k, v in params.items() if k in _OPENAI_PARAMS)
+        return {"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body}
+
+    def submit(self, requests: List[Dict[str, Any]]) -> str:
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in requests).encode("utf-8")
+        base, client, headers = self.base_url(), self.client(), self._headers()
+        uploaded = self._check(
+            client.post(
+                f"{base}/files",
+                headers=headers,
+                data={"purpose": "batch"},
+                files={"file": ("batch.jsonl", payload, "application/jsonl")},
+            )
+        ).json()
+        job = self._check(
+            client.post(
+                f"{base}/batches",
+                headers=headers,
+                json={
+                    "input_file_id": uploaded["id"],
+                    "endpoint": "/v1/chat/completions",
+                    "completion_window": self.window,
+                },
+            )
+        ).json()
+        return job["id"]
+
+    def _job(self, batch_id: str) -> Dict[str, Any]:
+        return self._check(self.client().get(f"{self.base_url()}/batches/{batch_id}", headers=self._headers())).json()
+
+    def status(self, batch_id: str) -> BatchStatus:
+        job = self._job(batch_id)
+        counts = job.get("request_counts") or {}
+        return BatchStatus(
+            state=self._STATES.get(job.get("status", ""), "running"),
+            total=int(counts.get("total") or 0),
+            succeeded=int(counts.get("completed") or 0),
+            failed=int(counts.get("failed") or 0),
+            raw=job,
+        )
+
+    def results(self, batch_id: str) -> Iterator[Tuple[str, Any]]:
+        job = self._job(batch_id)
+        for file_id in (job.get("output_file_id"), job.get("error_file_id")):
+            if not file_id:
+                continue
+            response = self._check(
+                self.client().get(f"{self.base_url()}/files/{file_id}/content", headers=self._headers())
+            )
+            for line in response.text.splitlines():
+                if line.strip():
+                    yield self._parse_line(json.loads(line))
+
+    @staticmethod
+    def _parse_line(entry: Dict[str, Any]) -> Tuple[str, Any]:
+        custom_id = entry["custom_id"]
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code", 200) >= 400:
+            error = entry.get("error") or (response.get("body") or {}).get("error") or {}
+            return custom_id, BatchError(error.get("message") or json.dumps(error) or "request failed")
+        choices = (response.get("body") or {}).get("choices") or []
+        return custom_id, [(c.get("message") or {}).get("content") or "" for c in choices]
+
+    def cancel(self, batch_id: str) -> None:
+        self._check(self.client().post(f"{self.base_url()}/batches/{batch_id}/cancel", headers=self._headers()))
+
+
+class AnthropicBatchAPI(BatchAPI):
+    """Anthropic Message Batches: requests are posted inline; results are a JSONL
+    download from the batch's `results_url`."""
+
+    VERSION = "2023-06-01"
+
+    def __init__(self, provider: str = "anthropic", env_key: str = "ANTHROPIC_API_KEY") -> None:
+        super().__init__(provider, env_key)
+
+    def _headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key(), "anthropic-version": self.VERSION}
+
+    def build_request(self, custom_id: str, model: str, messages: Sequence[Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        if params.get("n", 1) > 1:
+            raise BatchError("Anthropic batches return one completion per request (n>1 is not supported)")
+        system: List[Any] = []
+        turns = []
+        for m in messages:
+            if m.type == "system":
+                # Content blocks (e.g. with cache_control) are passed through as they are.
+                system.extend(m.content if isinstance(m.content, list) else [{"type": "text", "text": m.content}])
+            else:
+                turns.append({"role": _ROLES.get(m.type, "user"), "content": m.content})
+        body: Dict[str, Any] = {"model": model, "messages": turns}
+        if system:
+            body["system"] = system
+        body.update((k, v) for k, v in params.items() if k in _ANTHROPIC_PARAMS)
+        body.setdefault("max_tokens", ANTHROPIC_DEFAULT_MAX_TOKENS)
+        if params.get("stop"):
+            body["stop_sequences"] = list(params["stop"])
+        return {"custom_id": custom_id, "params": body}
+
+    def submit(self, requests: List[Dict[str, Any]]) -> str:
+        job = self._check(
+            self.client().post(
+                f"{self.base_url()}/v1/messages/batches", headers=self._headers(), json={"requests": requests}
+            )
+        ).json()
+        return job["id"]
+
+    def _job(self, batch_id: str) -> Dict[str, Any]:
+        return self._check(
+            self.client().get(f"{self.base_url()}/v1/messages/batches/{batch_id}", headers=self._headers())
+        ).json()
+
+    def status(self, batch_id: str) -> BatchStatus:
+        job = self._job(batch_id)
+        counts = job.get("request_counts") or {}
+        total = sum(int(v or 0) for v in counts.values())
+        failed = sum(int(counts.get(k) or 0) for k in ("errored", "canceled", "expired"))
+        if job.get("processing_status") != "ended":
+            state = "running"
+        elif job.get("cancel_initiated_at") and not counts.get("succeeded"):
+            state = "cancelled"
+        else:
+            state = "completed"
+        return BatchStatus(state=state, total=total, succeeded=int(counts.get("succeeded") or 0), failed=failed, raw=job)
+
+    def results(self, batch_id: str) -> Iterator[Tuple[str, Any]]:
+        url = self._job(batch_id).get("results_url")
+        if not url:
+            return
+        response = self._check(self.client().get(url, headers=self._headers()))
+        for line in response.text.splitlines():
+            if line.strip():
+                yield self._parse_line(json.loads(line))
+
+    @staticmethod
+    def _parse_line(entry: Dict[str, Any]) -> Tuple[str, Any]:
+        custom_id = entry["custom_id"]
+        result = entry.get("result") or {}
+        if result.get("type") != "succeeded":
+            error = (result.get("error") or {}).get("error") or result.get("error") or {}
+            message = error.get("message") if isinstance(error, dict) else str(error)
+            return custom_id, BatchError(message or f"request {result.get('type', 'failed')}")
+        message = result.get("message") or {}
+        return custom_id, [_text(message.get("content") or [])]
+
+    def cancel(self, batch_id: str) -> None:
+        self._check(
+            self.client().post(f"{self.base_url()}/v1/messages/batches/{batch_id}/cancel", headers=self._headers())
+        )
+
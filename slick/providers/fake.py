@@ -0,0 +1,335 @@
+"""Offline provider for tests and benchmarks.
+
+`FakeChatModel` answers without any network access. It can return canned responses,
+or a response that conforms to the requested JSON schema (a `response_format`, like
+OpenAI's native structured output, or format instructions in the prompt) so structured
+steps parse, and can model latency, streaming speed and rate-limit errors:
+
+    @llm_step(model="fake", latency=0.2, latency_distribution="lognormal",
+              chunk_rate=80, error_rate=0.02)
+    def summarize(text: str) -> Answer: ...
+
+The `fake-*` models are presets; keyword arguments override them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import (
+    BaseChatModel,
+    agenerate_from_stream,
+    generate_from_stream,
+)
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from .base import Provider, json_schema_format
+
+PRESETS: Dict[str, Dict[str, Any]] = {
+    "fake": {},
+    "fake-fast": {"latency": 0.2, "latency_distribution": "lognormal", "chunk_rate": 200.0},
+    "fake-slow": {"latency": 1.5, "latency_distribution": "lognormal", "chunk_rate": 40.0},
+    "fake-flaky": {
+        "latency": 0.2,
+        "latency_distribution": "lognormal",
+        "chunk_rate": 200.0,
+        "error_rate": 0.1,
+    },
+}
+
+_FENCE = re.compile(r"```(?:json)?\s*\n(.*?)\n\s*```", re.DOTALL)
+_FIELD_LINE = re.compile(r'^\s*"([^"]+)":\s*([\w\[\]]+)', re.MULTILINE)
+
+
+class FakeRateLimitError(Exception):
+    """Raised by `FakeChatModel` to simulate an HTTP 429 from a provider."""
+
+    status_code = 429
+
+
+def _sample(schema: Dict[str, Any], defs: Dict[str, Any], name: str = "value") -> Any:
+    """A small value that validates against a (pydantic-generated) JSON schema."""
+
+    if "$ref" in schema:
+        return _sample(defs.get(schema["$ref"].rsplit("/", 1)[-1], {}), defs, name)
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if schema.get(key):
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return _sample(options[0], defs, name)
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        props = schema.get("properties", {})
+        return {key: _sample(sub, defs, key) for key, sub in props.items()}
+    if kind == "array":
+        return [_sample(schema.get("items", {}), defs, name)] * max(1, schema.get("minItems", 1))
+    if kind == "integer":
+        return int(schema.get("minimum", 1))
+    if kind == "number":
+        return float(schema.get("minimum", 1.0))
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    text = f"fake {name}"
+    return text.ljust(schema.get("minLength", 0), "x")
+
+
+def structured_response(prompt: str) -> Optional[str]:
+    """A JSON answer for the format instructions in `prompt`, if it contains any.
+
+    Understands a JSON schema in a fenced block (PydanticOutputParser) and the
+    `"name": type  // description` listing used by StructuredOutputParser.
+    """
+
+    for block in reversed(_FENCE.findall(prompt)):
+        try:
+            schema = json.loads(block)
+        except ValueError:
+            fields = _FIELD_LINE.findall(block)
+            if fields:
+                sample = {name: _sample({"type": kind}, {}, name) for name, kind in fields}
+                return "```json\n" + json.dumps(sample) + "\n```"
+            continue
+        if isinstance(schema, dict) and ("properties" in schema or "$ref" in schema):
+            return json.dumps(_sample(schema, schema.get("$defs", {})))
+    return None
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with configurable latency, streaming rate, errors and responses."""
+
+    model: str = "fake"
+    responses: Optional[List[str]] = None  # cycled; otherwise schema-conforming or filler text
+    response_tokens: int = 32  # length of filler text, in words
+    latency: float = 0.0  # seconds before the first token (median for random distributions)
+    latency_distribution: str = "fixed"  # fixed | uniform | exponential | lognormal
+    latency_sigma: float = 0.5  # lognormal sigma; uniform spread as a fraction of latency
+    chunk_rate: Optional[float] = None  # streamed chunks per second; None streams instantly
+    chunk_chars: int = 4
+    error_rate: float = 0.0  # probability that a call raises FakeRateLimitError
+    seed: Optional[int] = None
+    n: int = 1  # completions per (non-streaming) request
+    streaming: bool = False
+
+    _rng: random.Random = PrivateAttr(default=None)
+    _cursor: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default=None)
+    _cached_prefixes: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes = set()
+
+    @property
+    def _llm_type(self) -> str:
+        return "slick-fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model}
+
+    # -- behaviour ------------------------------------------------------------------
+
+    def sample_latency(self) -> float:
+        base = self.latency
+        if base <= 0:
+            return 0.0
+        dist = self.latency_distribution
+        with self._lock:
+            if dist == "uniform":
+                spread = base * self.latency_sigma
+                return max(0.0, self._rng.uniform(base - spread, base + spread))
+            if dist == "exponential":
+                return self._rng.expovariate(1.0 / base)
+            if dist == "lognormal":
+                return self._rng.lognormvariate(math.log(base), self.latency_sigma)
+        return base
+
+    def _should_fail(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _text_for(self, messages: List[BaseMessage], response_format: Optional[Dict[str, Any]] = None) -> str:
+        if self.responses:
+            with self._lock:
+                text = self.responses[self._cursor % len(self.responses)]
+                self._cursor += 1
+            return text
+        if response_format and response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            return json.dumps(_sample(schema, schema.get("$defs", {})))
+        prompt = "\n".join(str(m.content) for m in messages)
+        structured = structured_response(prompt)
+        if structured is not None:
+            return structured
+        return " ".join(["lorem"] * self.response_tokens)
+
+    def _chunks(self, text: str) -> List[str]:
+        size = max(1, self.chunk_chars)
+        return [text[i : i + size] for i in range(0, len(text), size)] or [""]
+
+    def _usage(self, messages: List[BaseMessage], text: str) -> Dict[str, Any]:
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        input_tokens = max(1, prompt_chars // 4)
+        output_tokens = max(1, len(text) // 4)
+        usage: Dict[str, Any] = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        # Models automatic prefix caching: a leading system message seen before is a hit.
+        if messages and isinstance(messages[0], SystemMessage):
+            prefix = str(messages[0].content)
+            with self._lock:
+                hit = prefix in self._cached_prefixes
+                self._cached_prefixes.add(prefix)
+            usage["input_token_details"] = {"cache_read": len(prefix) // 4 if hit else 0}
+        return usage
+
+    def _start(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> tuple:
+        if self._should_fail():
+            raise FakeRateLimitError(f"{self.model}: simulated rate limit (429)")
+        text = self._text_for(messages, kwargs.get("response_format"))
+        return self.sample_latency(), text, self._chunks(text)
+
+    def _generation_time(self, chunks: List[str]) -> float:
+        return len(chunks) / self.chunk_rate if self.chunk_rate else 0.0
+
+    def _texts(self, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> tuple:
+        """Like `_start`, with `n` completions; timing follows the longest one."""
+        delay, text, chunks = self._start(messages, kwargs)
+        texts = [text] + [self._text_for(messages, kwargs.get("response_format")) for _ in range(self.n - 1)]
+        longest = max((self._chunks(t) for t in texts), key=len)
+        return delay + self._generation_time(longest), texts
+
+    def _result(self, messages: List[BaseMessage], texts: List[str]) -> ChatResult:
+        usage = self._usage(messages, "".join(texts))
+        generations = [
+            ChatGeneration(
+                message=AIMessage(
+                    content=text,
+                    usage_metadata=usage if i == 0 else None,
+                    response_metadata={"model_name": self.model, "finish_reason": "stop"},
+                )
+            )
+            for i, text in enumerate(texts)
+        ]
+        return ChatResult(generations=generations, llm_output={"token_usage": usage})
+
+    # -- BaseChatModel ---------------------------------------------------------------
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.streaming:
+            return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+        wait, texts = self._texts(messages, kwargs)
+        time.sleep(wait)
+        return self._result(messages, texts)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.streaming:
+            return await agenerate_from_stream(self._astream(messages, stop, run_manager, **kwargs))
+        wait, texts = self._texts(messages, kwargs)
+        await asyncio.sleep(wait)
+        return self._result(messages, texts)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        delay, text, chunks = self._start(messages, kwargs)
+        if delay:
+            time.sleep(delay)
+        interval = 1.0 / self.chunk_rate if self.chunk_rate else 0.0
+        for i, piece in enumerate(chunks):
+            if i and interval:
+                time.sleep(interval)
+            chunk = self._chunk(piece, messages, text, last=i == len(chunks) - 1)
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        delay, text, chunks = self._start(messages, kwargs)
+        if delay:
+            await asyncio.sleep(delay)
+        interval = 1.0 / self.chunk_rate if self.chunk_rate else 0.0
+        for i, piece in enumerate(chunks):
+            if i and interval:
+                await asyncio.sleep(interval)
+            chunk = self._chunk(piece, messages, text, last=i == len(chunks) - 1)
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+
+    def _chunk(self, piece: str, messages: List[BaseMessage], text: str, last: bool) -> ChatGenerationChunk:
+        if not last:
+            return ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=piece,
+                usage_metadata=self._usage(messages, text),
+                response_metadata={"model_name": self.model, "finish_reason": "stop"},
+            )
+        )
+
+
+class FakeProvider(Provider):
+    name = "fake"
+    env_key = "SLICK_FAKE_API_KEY"  # never required
+    supports_n = True
+
+    @staticmethod
+    def list_models() -> List[str]:
+        return sorted(PRESETS)
+
+    @staticmethod
+    def make_chat(model: str, **kwargs: Any):
+        settings = dict(PRESETS.get(model, {}))
+        settings.update(kwargs)
+        return FakeChatModel(model=model, **settings)
+
+    @staticmethod
+    def structured_output(model: str, name: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return {"response_format": json_schema_format(name, schema)}
@@ -11,6 +11,7 @@ from .base import Provider
 class FireworksProvider(Provider):
     name = "fireworks"
     env_key = "FIREWORKS_API_KEY"
+    supports_n = True
 
     @staticmethod
     def list_models() -> List[str]:
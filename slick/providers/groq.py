@@ -5,24 +5,27 @@ from typing import Any, List
 import groq  # type: ignore
 import langchain_groq  # type: ignore
 
+from ..transport import chat_kwargs, get_client
 from .base import Provider
+from .batches import OpenAIBatchAPI
 
 
 class GroqProvider(Provider):
     name = "groq"
     env_key = "GROQ_API_KEY"
+    batch_api = OpenAIBatchAPI("groq", "GROQ_API_KEY")
 
     @staticmethod
     def list_models() -> List[str]:
         key = GroqProvider.get_api_key()
         if not key:
             return []
-        client = groq.Groq(api_key=key)
+        client = groq.Groq(api_key=key, http_client=get_client("groq"))
         models = client.models.list()
         return sorted(m.id for m in models.data)
 
     @staticmethod
     def make_chat(model: str, **kwargs: Any):
-        return langchain_groq.ChatGroq(model=model, api_key=GroqProvider.get_api_key(), **kwargs)
+        return langchain_groq.ChatGroq(model=model, api_key=GroqProvider.get_api_key(), **chat_kwargs("groq", kwargs))
 
 
@@ -1,28 +1,60 @@
 from __future__ import annotations
 
-from typing import Any, List
+import re
+from typing import Any, Dict, List, Optional
 
 import langchain_openai  # type: ignore
 from openai import OpenAI  # type: ignore
 
-from .base import Provider
+from ..transport import chat_kwargs, get_client
+from .base import Provider, json_schema_format
+from .batches import OpenAIBatchAPI
 
 
 class OpenAIProvider(Provider):
     name = "openai"
     env_key = "OPENAI_API_KEY"
+    batch_api = OpenAIBatchAPI("openai", "OPENAI_API_KEY")
+    supports_n = True
 
     @staticmethod
     def list_models() -> List[str]:
         key = OpenAIProvider.get_api_key()
         if not key:
             return []
-        client = OpenAI(api_key=key)
+        client = OpenAI(api_key=key, http_client=get_client("openai"))
         models = client.models.list()
         return sorted(m.id for m in models.data)
 
     @staticmethod
     def make_chat(model: str, **kwargs: Any):
-        return langchain_openai.ChatOpenAI(model=model, api_key=OpenAIProvider.get_api_key(), **kwargs)
-
+        return langchain_openai.ChatOpenAI(
+            model=model, api_key=OpenAIProvider.get_api_key(), **chat_kwargs("openai", kwargs)
+        )
 
+    @staticmethod
+    def structured_output(model: str, name: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not supports_json_schema(model):
+            return None
+        return {"response_format": json_schema_format(name, schema)}
+
+
+# Models that accept `response_format={"type": "json_schema", ...}` (optionally followed
+# by a -YYYY-MM-DD snapshot date). gpt-4o itself only from its 2024-08-06 snapshot.
+_JSON_SCHEMA_MODELS = re.compile(
+    r"(gpt-4o-mini|gpt-4\.1(-mini|-nano)?|gpt-4\.5-preview|gpt-5(\.\d+)?(-mini|-nano|-chat-latest)?"
+    r"|o1|o3-mini|o3|o4-mini)(-\d{4}-\d{2}-\d{2})?"
+)
+_GPT_4O = re.compile(r"gpt-4o(-(\d{4}-\d{2}-\d{2}))?")
+
+
+def supports_json_schema(model: str) -> bool:
+    """True for OpenAI models known to support native structured output (an allow-list;
+    fine-tunes "ft:<base>:..." follow their base model)."""
+
+    if model.startswith("ft:"):
+        model = model.split(":")[1]
+    if _JSON_SCHEMA_MODELS.fullmatch(model):
+        return True
+    match = _GPT_4O.fullmatch(model)
+    return bool(match) and (match.group(2) is None or match.group(2) >= "2024-08-06")
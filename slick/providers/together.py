@@ -4,11 +4,13 @@ from typing import Any, List
 
 import langchain_together
 import together  # type: ignore
+from ..transport import chat_kwargs
 from .base import Provider
 
 class TogetherProvider(Provider):
     name = "together"
     env_key = "TOGETHER_API_KEY"
+    supports_n = True
 
     @staticmethod
     def list_models() -> List[str]:
@@ -18,4 +20,6 @@ class TogetherProvider(Provider):
 
     @staticmethod
     def make_chat(model: str, **kwargs: Any):
-        return langchain_together.ChatTogetherAI(model=model, api_key=TogetherProvider.get_api_key(), **kwargs)
+        return langchain_together.ChatTogetherAI(
+            model=model, api_key=TogetherProvider.get_api_key(), **chat_kwargs("together", kwargs)
+        )
@@ -0,0 +1,375 @@
+"""Route a step across equivalent models on several providers, with failover.
+
+A `Router` is an ordered (optionally weighted) set of interchangeable "provider:model"
+targets. Pass one, or just a list of targets, wherever a model is accepted:
+
+    @llm_step(model=["anthropic:claude-3-5-haiku-latest", "openai:gpt-4o-mini", "groq:llama-3.1-8b-instant"])
+    def classify(text: str) -> Label: ...
+
+    chat = create_chat_model(model=Router(["openai:gpt-4o-mini", "together:..."], strategy="priority"))
+
+Every request goes to the best available target and fails over to the next one on an
+error. Health is tracked per target for the whole process, so every router sharing a
+target sees the same incident:
+
+- an exponentially weighted moving average of latency (time to first token when
+  streaming, otherwise the whole request) and of the error rate, and
+- a circuit breaker that opens after `failure_threshold` consecutive failures or when
+  the error rate passes `error_threshold`. An open target gets no traffic for
+  `cooldown` seconds, then one probe request decides whether it closes again.
+
+With `strategy="latency"` (the default) targets are ranked by latency, penalised by
+their error rate and divided by their weight; a small `explore` fraction of requests
+goes to a runner-up so its numbers stay current. `strategy="priority"` keeps the listed
+order and only fails over. A stream fails over only until its first chunk arrives.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+STRATEGIES = ("latency", "priority")
+
+
+class RoutingError(RuntimeError):
+    """Every target of a router failed; `errors` holds (target, exception) pairs."""
+
+    def __init__(self, errors: List[Tuple[str, BaseException]]) -> None:
+        self.errors = errors
+        detail = "; ".join(f"{target}: {type(e).__name__}: {e}" for target, e in errors)
+        super().__init__(f"All routed targets failed ({detail})" if errors else "No routed targets available")
+
+
+class TargetHealth:
+    """Moving averages and circuit-breaker state of one "provider:model" target."""
+
+    def __init__(self) -> None:
+        self.latency: Optional[float] = None  # EWMA, seconds
+        self.error_rate = 0.0  # EWMA of failures (0..1)
+        self.calls = 0
+        self.failures = 0  # consecutive
+        self.opened_at: Optional[float] = None  # monotonic time the breaker opened
+        self.probe_at: Optional[float] = None  # when the current half-open probe started
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return "closed" if self.opened_at is None else "open"
+
+    def available(self, now: float, cooldown: float) -> bool:
+        """Closed, or open long enough ago that one probe request may go through."""
+
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if now - self.opened_at < cooldown:
+                return False
+            # Half-open: one probe per cooldown, in case a claimed probe was never sent.
+            if self.probe_at is not None and now - self.probe_at < cooldown:
+                return False
+            self.probe_at = now
+            return True
+
+    def record_success(self, latency: float, alpha: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.failures = 0
+            self.latency = latency if self.latency is None else alpha * latency + (1 - alpha) * self.latency
+            self.error_rate *= 1 - alpha
+            self.opened_at = self.probe_at = None
+
+    def record_failure(self, alpha: float, failure_threshold: int, error_threshold: float, now: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self.error_rate = alpha + (1 - alpha) * self.error_rate
+            # Error rates from the first few calls are noise; consecutive failures are not.
+            tripped = self.failures >= failure_threshold or (self.calls >= 10 and self.error_rate >= error_threshold)
+            if tripped or self.opened_at is not None:
+                self.opened_at = now
+                self.probe_at = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "calls": self.calls,
+            "consecutive_failures": self.failures,
+        }
+
+
+_health: Dict[str, TargetHealth] = {}
+_health_lock = threading.Lock()
+
+
+def health(target: str) -> TargetHealth:
+    """The process-wide health record of a target."""
+
+    record = _health.get(target)
+    if record is None:
+        with _health_lock:
+            record = _health.setdefault(target, TargetHealth())
+    return record
+
+
+def health_snapshot() -> Dict[str, Dict[str, Any]]:
+    """target -> state, latency, error_rate, calls and consecutive_failures."""
+
+    return {target: record.snapshot() for target, record in list(_health.items())}
+
+
+def reset() -> None:
+    """Forget all health records (mainly for tests)."""
+
+    with _health_lock:
+        _health.clear()
+
+
+@dataclass(frozen=True)
+class Router:
+    """An ordered set of equivalent targets and how to pick among them."""
+
+    targets: Tuple[str, ...]
+    weights: Optional[Tuple[float, ...]] = None  # higher = preferred (latency strategy)
+    strategy: str = "latency"
+    explore: float = 0.05  # fraction of requests sent to a runner-up (latency strategy)
+    alpha: float = 0.2  # EWMA smoothing
+    failure_threshold: int = 3
+    error_threshold: float = 0.5
+    cooldown: float = 30.0  # seconds an open circuit stays shut
+
+    def __post_init__(self) -> None:
+        # Lists are accepted; stored as tuples so routers can key the chat model pool.
+        object.__setattr__(self, "targets", tuple(self.targets))
+        if self.weights is not None:
+            object.__setattr__(self, "weights", tuple(float(w) for w in self.weights))
+        if not self.targets:
+            raise ValueError("A router needs at least one target")
+        if self.weights is not None and len(self.weights) != len(self.targets):
+            raise ValueError("weights must match targets one to one")
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy: {self.strategy} (expected one of {', '.join(STRATEGIES)})")
+
+    @property
+    def label(self) -> str:
+        """Compact name for metrics and cache keys."""
+
+        return "|".join(self.targets)
+
+    def _score(self, index: int) -> float:
+        record = health(self.targets[index])
+        weight = self.weights[index] if self.weights is not None else 1.0
+        latency = record.latency
+        if latency is None:
+            # Untried targets look as fast as possible, so each gets tried once; targets
+            # that have only ever failed go last.
+            latency = math.inf if record.calls else 0.0
+        return latency * (1 + 4 * record.error_rate) / max(weight, 1e-9)
+
+    def candidates(self) -> List[str]:
+        """Targets to try for one request, best first; open circuits are skipped."""
+
+        now = time.monotonic()
+        indexes = [i for i, t in enumerate(self.targets) if health(t).available(now, self.cooldown)]
+        if not indexes:
+            # Every circuit is open: try the one that opened first rather than failing outright.
+            oldest = min(self.targets, key=lambda t: health(t).opened_at or 0.0)
+            return [oldest]
+        if self.strategy == "latency":
+            indexes.sort(key=self._score)  # stable: ties keep the listed order
+            if self.explore and len(indexes) > 1 and random.random() < self.explore:
+                indexes.insert(0, indexes.pop(random.randrange(1, len(indexes))))
+        return [self.targets[i] for i in indexes]
+
+    def record_success(self, target: str, latency: float) -> None:
+        health(target).record_success(latency, self.alpha)
+
+    def record_failure(self, target: str) -> None:
+        health(target).record_failure(self.alpha, self.failure_threshold, self.error_threshold, time.monotonic())
+
+
+RouteSpec = Union[Router, Sequence[str]]
+
+
+def as_router(spec: RouteSpec) -> Router:
+    """A Router for `spec`: a Router, or a list/tuple of "provider:model" targets."""
+
+    if isinstance(spec, Router):
+        return spec
+    if isinstance(spec, (list, tuple)):
+        return Router(tuple(spec))
+    raise TypeError(f"Expected a Router or a sequence of targets, not {type(spec).__name__}")
+
+
+def is_route(model: Any) -> bool:
+    """True for values `create_chat_model` routes instead of resolving one model."""
+
+    return isinstance(model, (Router, list, tuple))
+
+
+_routed_cls = None
+
+
+def _routed_model_cls():
+    # Built lazily: LangChain is only imported once a routed model is created.
+    global _routed_cls
+    if _routed_cls is None:
+        from langchain_core.language_models.chat_models import (
+            BaseChatModel,
+            agenerate_from_stream,
+            generate_from_stream,
+        )
+        from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+        class RoutedChatModel(BaseChatModel):
+            """Chat model that sends each request to the best target of a `Router`."""
+
+            router: Any
+            chat_kwargs: Dict[str, Any] = {}
+            streaming: bool = False
+
+            @property
+            def _llm_type(self) -> str:
+                return "slick-router"
+
+            @property
+            def _identifying_params(self) -> Dict[str, Any]:
+                return {"targets": list(self.router.targets), "strategy": self.router.strategy}
+
+            def _target_chat(self, target: str) -> Tuple[Any, str]:
+                from .models import create_chat_model, resolve_model
+
+                model, provider = resolve_model(target)
+                return create_chat_model(model=model, provider=provider, **self.chat_kwargs), provider
+
+            def _generate(self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any) -> Any:
+                if self.streaming:
+                    return generate_from_stream(self._stream(messages, stop, run_manager, **kwargs))
+                errors: List[Tuple[str, BaseException]] = []
+                for target in self.router.candidates():
+                    start = time.perf_counter()
+                    try:
+                        chat, _ = self._target_chat(target)
+                        result = chat.generate([messages], stop=stop, **kwargs)
+                    except Exception as e:
+                        self.router.record_failure(target)
+                        errors.append((target, e))
+                        continue
+                    self.router.record_success(target, time.perf_counter() - start)
+                    return _chat_result(ChatResult, result, target)
+                raise RoutingError(errors)
+
+            async def _agenerate(
+                self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any
+            ) -> Any:
+                if self.streaming:
+                    return await agenerate_from_stream(self._astream(messages, stop, run_manager, **kwargs))
+                errors: List[Tuple[str, BaseException]] = []
+                for target in self.router.candidates():
+                    try:
+                        chat, provider = self._target_chat(target)
+                        async with _admission(provider, messages):
+                            start = time.perf_counter()  # queueing is not the target's latency
+                            result = await chat.agenerate([messages], stop=stop, **kwargs)
+                    except Exception as e:
+                        self.router.record_failure(target)
+                        errors.append((target, e))
+                        continue
+                    self.router.record_success(target, time.perf_counter() - start)
+                    return _chat_result(ChatResult, result, target)
+                raise RoutingError(errors)
+
+            def _stream(self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any) -> Any:
+                errors: List[Tuple[str, BaseException]] = []
+                for target in self.router.candidates():
+                    start = time.perf_counter()
+                    started = False
+                    try:
+                        chat, _ = self._target_chat(target)
+                        for chunk in chat.stream(messages, stop=stop, **kwargs):
+                            if not started:
+                                started = True
+                                self.router.record_success(target, time.perf_counter() - start)
+                            gen = ChatGenerationChunk(message=chunk)
+                            if run_manager is not None:
+                                run_manager.on_llm_new_token(gen.text, chunk=gen)
+                            yield gen
+                    except Exception as e:
+                        self.router.record_failure(target)
+                        if started:
+                            raise  # part of the answer was already handed out
+                        errors.append((target, e))
+                        continue
+                    return
+                raise RoutingError(errors)
+
+            async def _astream(
+                self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any
+            ) -> Any:
+                errors: List[Tuple[str, BaseException]] = []
+                for target in self.router.candidates():
+                    started = False
+                    try:
+                        chat, provider = self._target_chat(target)
+                        async with _admission(provider, messages):
+                            start = time.perf_counter()
+                            async for chunk in chat.astream(messages, stop=stop, **kwargs):
+                                if not started:
+                                    started = True
+                                    self.router.record_success(target, time.perf_counter() - start)
+                                gen = ChatGenerationChunk(message=chunk)
+                                if run_manager is not None:
+                                    await run_manager.on_llm_new_token(gen.text, chunk=gen)
+                                yield gen
+                    except Exception as e:
+                        self.router.record_failure(target)
+                        if started:
+                            raise
+                        errors.append((target, e))
+                        continue
+                    return
+                raise RoutingError(errors)
+
+        _routed_cls = RoutedChatModel
+    return _routed_cls
+
+
+def _chat_result(result_cls: Any, result: Any, target: str) -> Any:
+    llm_output = dict(result.llm_output or {})
+    llm_output["slick_target"] = target
+    return result_cls(generations=result.generations[0], llm_output=llm_output)
+
+
+class _NoAdmission:
+    async def __aenter__(self) -> None:
+        return None
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+
+def _admission(provider: str, messages: Iterable[Any]) -> Any:
+    """The target provider's limiter slot (each target is admitted by its own provider)."""
+
+    try:
+        from .models import get_limiter
+
+        limiter = get_limiter(provider)
+    except Exception:
+        return _NoAdmission()
+    chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return limiter.limit(chars // 4)
+
+
+def make_routed_chat(spec: RouteSpec, **kwargs: Any) -> Any:
+    """A routed chat model; `callbacks` and `streaming` apply to it, the remaining
+    kwargs to each target's chat model."""
+
+    outer = {k: kwargs.pop(k) for k in ("callbacks", "streaming") if k in kwargs}
+    return _routed_model_cls()(router=as_router(spec), chat_kwargs=kwargs, **outer)
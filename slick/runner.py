@@ -0,0 +1,294 @@
+"""Run a function over a JSONL file: streaming, bounded concurrency, resumable.
+
+Used by `slick run`:
+
+    slick run mypkg.steps:classify --input records.jsonl --output labels.jsonl -c 64
+
+Each input line is one record, bound to the function like a `batch` item: an object
+gives keyword arguments, an array positional arguments, and any other value the first
+parameter. Decorated steps run through their async path (provider limiter, result
+cache, metrics); plain functions are called directly, sync ones in worker threads.
+
+Every finished record is appended to the output as one line:
+
+    {"index": 0, "input": {...}, "output": ..., "error": null}
+
+`index` is the record's position among the non-empty input lines. Lines are written in
+completion order, so they can be slightly out of input order. A failed record has
+`"output": null` and `"error": {"type": ..., "message": ...}`.
+
+The output file is the checkpoint. Running the same command again skips every record
+already in it, so an interrupted run picks up where it stopped; a line cut short by a
+crash is dropped first. Records that ended in an error count as done unless
+`retry_errors` is set; a retried record gets a new line, and the last line for an index
+wins. Input is read lazily and at most `concurrency` records are in flight. Records
+complete at most `window` positions ahead of the oldest unfinished one, so the state
+kept for resuming stays small however long the file is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+
+# Seconds between fsyncs of the output file (lines are flushed as they complete).
+SYNC_INTERVAL = 5.0
+
+
+@dataclass
+class RunStats:
+    ok: int = 0
+    errors: int = 0
+    skipped: int = 0  # already in the output from an earlier run
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        rate = (self.ok + self.errors) / self.elapsed if self.elapsed else 0.0
+        return (
+            f"{self.ok} ok, {self.errors} errors, {self.skipped} already done "
+            f"in {self.elapsed:.1f}s ({rate:.1f} records/s)"
+        )
+
+
+def load_function(spec: str, file_module: Optional[str] = None) -> Callable[..., Any]:
+    """Import "package.module:function" or "path/to/file.py:function" (dotted
+    attributes allowed after the colon). A file is imported as the module
+    `file_module`, by default its stem."""
+
+    module_name, sep, attr = spec.partition(":")
+    if not sep or not module_name or not attr:
+        raise ValueError(f"Expected module:function, got {spec!r}")
+    if module_name.endswith(".py"):
+        path = Path(module_name).resolve()
+        name = file_module or path.stem
+        module_spec = importlib.util.spec_from_file_location(name, path)
+        if module_spec is None or module_spec.loader is None:
+            raise ImportError(f"Cannot load {module_name}")
+        module = importlib.util.module_from_spec(module_spec)
+        sys.modules[name] = module
+        module_spec.loader.exec_module(module)
+    else:
+        # Like `python -m`, resolve modules relative to the working directory.
+        if "" not in sys.path and os.getcwd() not in sys.path:
+            sys.path.insert(0, os.getcwd())
+        module = importlib.import_module(module_name)
+    obj: Any = module
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    if not callable(obj):
+        raise TypeError(f"{spec} is not callable")
+    return obj
+
+
+def iter_records(path: str) -> Iterator[Tuple[int, Any]]:
+    """(index, record) for each non-empty line, read lazily."""
+
+    with open(path, encoding="utf-8") as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            yield index, json.loads(line)
+            index += 1
+
+
+class _Completed:
+    """Finished indexes: everything below `watermark`, plus a sparse set above it."""
+
+    def __init__(self) -> None:
+        self.watermark = 0
+        self.above: Set[int] = set()
+
+    def add(self, index: int) -> None:
+        if index < self.watermark:
+            return
+        self.above.add(index)
+        while self.watermark in self.above:
+            self.above.remove(self.watermark)
+            self.watermark += 1
+
+    def __contains__(self, index: int) -> bool:
+        return index < self.watermark or index in self.above
+
+
+def _repair_tail(path: Path) -> None:
+    """Drop a partial last line left by a crash mid-write."""
+
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        pos = size
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                end = pos - step + newline + 1
+                if end != size:
+                    f.truncate(end)
+                return
+            pos -= step
+        f.truncate(0)
+
+
+def _scan_output(path: Path, retry_errors: bool) -> Tuple[_Completed, Set[int]]:
+    """Records already in the output, and (with retry_errors) those to run again."""
+
+    done = _Completed()
+    retry: Set[int] = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            index = entry["index"]
+            done.add(index)
+            if retry_errors:
+                if entry.get("error") is not None:
+                    retry.add(index)
+                else:
+                    retry.discard(index)
+    return done, retry
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _caller(fn: Callable[..., Any]) -> Callable[[Any], Any]:
+    """Async callable running one record through `fn`; exceptions are returned."""
+
+    abatch = getattr(fn, "abatch", None)
+    if abatch is not None:
+        # A decorated step: its async path binds the record and applies limits/caching.
+        async def call_step(record: Any) -> Any:
+            if isinstance(record, list):
+                record = tuple(record)
+            return (await abatch([record]))[0]
+
+        return call_step
+
+    is_async = inspect.iscoroutinefunction(fn)
+
+    async def call_plain(record: Any) -> Any:
+        if isinstance(record, Mapping):
+            args, kwargs = (), dict(record)
+        elif isinstance(record, list):
+            args, kwargs = tuple(record), {}
+        else:
+            args, kwargs = (record,), {}
+        try:
+            if is_async:
+                return await fn(*args, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(None, lambda: fn(*args, **kwargs))
+        except Exception as e:
+            return e
+
+    return call_plain
+
+
+async def arun_jsonl(
+    fn: Callable[..., Any],
+    input_path: str,
+    output_path: str,
+    concurrency: int = 32,
+    window: Optional[int] = None,
+    resume: bool = True,
+    retry_errors: bool = False,
+    include_input: bool = True,
+) -> RunStats:
+    """Run `fn` over every record of `input_path`, appending results to `output_path`.
+
+    With `resume=False` the output is truncated and every record runs again.
+    """
+
+    concurrency = max(1, concurrency)
+    window = max(window or concurrency * 8, concurrency)
+    out = Path(output_path)
+    done, retry = _Completed(), set()
+    if resume and out.exists() and out.stat().st_size:
+        _repair_tail(out)
+        done, retry = _scan_output(out, retry_errors)
+    call = _caller(fn)
+    stats = RunStats()
+    start = time.perf_counter()
+    last_sync = start
+
+    async def one(index: int, record: Any) -> Tuple[int, Any, Any]:
+        return index, record, await call(record)
+
+    f = open(out, "a" if resume else "w", encoding="utf-8")
+    pending: Set["asyncio.Task[Tuple[int, Any, Any]]"] = set()
+
+    def write(task: "asyncio.Task[Tuple[int, Any, Any]]") -> None:
+        index, record, result = task.result()
+        entry: Dict[str, Any] = {"index": index}
+        if include_input:
+            entry["input"] = record
+        if isinstance(result, Exception):
+            entry.update(output=None, error={"type": type(result).__name__, "message": str(result)})
+            stats.errors += 1
+        else:
+            entry.update(output=result, error=None)
+            stats.ok += 1
+        try:
+            line = json.dumps(entry, ensure_ascii=False, default=_jsonable)
+        except (TypeError, ValueError) as e:
+            entry.update(output=None, error={"type": type(e).__name__, "message": f"Unserializable output: {e}"})
+            line = json.dumps(entry, ensure_ascii=False, default=str)
+        f.write(line + "\n")
+        done.add(index)
+
+    async def drain() -> None:
+        nonlocal pending, last_sync
+        finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in finished:
+            write(task)
+        f.flush()
+        now = time.perf_counter()
+        if now - last_sync >= SYNC_INTERVAL:
+            os.fsync(f.fileno())
+            last_sync = now
+
+    try:
+        for index, record in iter_records(input_path):
+            if index in done and index not in retry:
+                stats.skipped += 1
+                continue
+            # Keep completions within `window` of the oldest unfinished record.
+            while len(pending) >= concurrency or (pending and index >= done.watermark + window):
+                await drain()
+            pending.add(asyncio.ensure_future(one(index, record)))
+        while pending:
+            await drain()
+    finally:
+        for task in pending:
+            task.cancel()
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def run_jsonl(fn: Callable[..., Any], input_path: str, output_path: str, **options: Any) -> RunStats:
+    """Blocking `arun_jsonl`."""
+
+    return asyncio.run(arun_jsonl(fn, input_path, output_path, **options))
@@ -0,0 +1,240 @@
+"""`slick serve`: a long-lived daemon answering requests on a Unix domain socket.
+
+Python imports, chat model construction and a new TLS connection per provider cost
+seconds in a short-lived process. The daemon pays them once and keeps everything warm:
+pooled chat models and HTTP connections, loaded and compiled steps, limiters and the
+result cache. Clients (`slick.client`, and `slick models test` / `slick run` when a
+daemon is up) talk to it over the socket; see `slick.client` for the wire format.
+
+Operations:
+
+    ping       version, pid, uptime and loaded functions
+    chat       one completion: prompt, model, provider, kwargs
+    call       call a "module:function" with args / kwargs; returns JSON
+    run        `slick.runner.arun_jsonl` over an input file (paths from the client)
+    shutdown   stop the daemon
+
+Requests on one connection run concurrently and replies carry the request id. A client
+that disconnects cancels its unfinished requests (an interrupted `run` resumes like a
+local one). Functions given as "file.py:function" are reloaded when the file changes,
+each file under its own module name. "module:function" specs are imported once, from
+the directory the daemon was started in (like `python -m` there), and only for clients
+in that directory: modules of the same name in other projects would collide in
+`sys.modules`. Restart the daemon to pick up edits to modules.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from .client import connect, socket_path
+
+# Longest request line accepted (records passed to `call` can be large).
+MAX_LINE = 32 * 1024 * 1024
+
+
+class Server:
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or socket_path()
+        self.started = time.time()
+        self.cwd = os.getcwd()
+        self._functions: Dict[str, Tuple[Any, Callable[..., Any]]] = {}
+        self._stop: Optional[asyncio.Event] = None
+        self._ops: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+            "ping": self._ping,
+            "chat": self._chat,
+            "call": self._call,
+            "run": self._run,
+            "shutdown": self._shutdown,
+        }
+
+    # -- lifecycle ------------------------------------------------------------------
+
+    def _claim_socket(self) -> None:
+        if os.path.exists(self.path):
+            live = connect(self.path, timeout=1.0)
+            if live is not None:
+                live.close()
+                raise RuntimeError(f"A slick daemon is already listening on {self.path}")
+            os.unlink(self.path)  # left behind by a daemon that did not exit cleanly
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    async def serve(
+        self,
+        load: Iterable[str] = (),
+        warm: Optional[Iterable[str]] = None,
+        ready: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Listen until `shutdown` or SIGINT/SIGTERM. `load` preloads functions and
+        `warm` opens connections to providers or `provider:model` targets."""
+
+        self._stop = asyncio.Event()
+        self._claim_socket()
+        for spec in load:
+            self.function(spec, self.cwd)
+        if warm is not None:
+            from .transport import awarmup
+
+            await awarmup(list(warm) or None)
+        server = await asyncio.start_unix_server(self._connection, path=self.path, limit=MAX_LINE)
+        os.chmod(self.path, 0o600)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError, ValueError):  # e.g. not the main thread
+                pass
+        try:
+            async with server:
+                if ready is not None:
+                    ready()
+                await self._stop.wait()
+        finally:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    # -- protocol -------------------------------------------------------------------
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op = self._ops.get(request.get("op"))
+            if op is None:
+                raise ValueError(f"Unknown operation: {request.get('op')!r}")
+            reply = {"id": request_id, "ok": True, "result": await op(request)}
+        except Exception as e:
+            reply = {"id": request_id, "ok": False, "error": {"type": type(e).__name__, "message": str(e)}}
+        from .runner import _jsonable
+
+        try:
+            data = json.dumps(reply, ensure_ascii=False, default=_jsonable)
+        except (TypeError, ValueError) as e:
+            data = json.dumps(
+                {"id": request_id, "ok": False, "error": {"type": type(e).__name__, "message": f"Unserializable result: {e}"}}
+            )
+        writer.write(data.encode("utf-8") + b"\n")
+        await writer.drain()
+
+    # -- operations -----------------------------------------------------------------
+
+    def function(self, spec: str, cwd: str) -> Callable[..., Any]:
+        """Load "module:function" / "file.py:function" once; files reload when changed."""
+
+        from .runner import load_function
+
+        module = spec.partition(":")[0]
+        file_module = None
+        if module.endswith(".py"):
+            path = os.path.realpath(os.path.join(cwd, module))
+            spec = f"{path}:{spec.partition(':')[2]}"
+            stamp: Any = os.stat(path).st_mtime_ns
+            # Same-named files from different projects must not share a module.
+            file_module = f"_slick_file_{hashlib.sha1(path.encode()).hexdigest()[:12]}_{Path(path).stem}"
+        elif os.path.realpath(cwd) != os.path.realpath(self.cwd):
+            raise ValueError(
+                f"{spec}: the daemon imports modules from {self.cwd}, where it was started, not {cwd}; "
+                "pass path/to/file.py:function or run without the daemon"
+            )
+        else:
+            stamp = None
+        cached = self._functions.get(spec)
+        if cached is None or cached[0] != stamp:
+            cached = self._functions[spec] = (stamp, load_function(spec, file_module))
+        return cached[1]
+
+    async def _ping(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from . import __version__
+
+        return {
+            "version": __version__,
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "functions": sorted(self._functions),
+        }
+
+    async def _chat(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from langchain_core.messages import HumanMessage
+
+        from .models import create_chat_model, get_limiter, resolve_model
+
+        model, provider = resolve_model(request.get("model"), request.get("provider"))
+        chat = create_chat_model(model=model, provider=provider, **(request.get("kwargs") or {}))
+        messages = [HumanMessage(content=request.get("prompt") or "Hello!")]
+        try:
+            limiter = get_limiter(provider)
+        except Exception:
+            limiter = None
+        if limiter is None:
+            response = await chat.ainvoke(messages)
+        else:
+            async with limiter.limit():
+                response = await chat.ainvoke(messages)
+        return {"text": getattr(response, "content", str(response)), "model": model, "provider": provider}
+
+    async def _call(self, request: Dict[str, Any]) -> Any:
+        fn = self.function(request["function"], request.get("cwd") or self.cwd)
+        args, kwargs = request.get("args") or [], request.get("kwargs") or {}
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, lambda: fn(*args, **kwargs))
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from .runner import arun_jsonl
+
+        fn = self.function(request["function"], request.get("cwd") or self.cwd)
+        stats = await arun_jsonl(fn, request["input"], request["output"], **(request.get("options") or {}))
+        return dataclasses.asdict(stats)
+
+    async def _shutdown(self, request: Dict[str, Any]) -> None:
+        if self._stop is not None:
+            # After this reply is written.
+            asyncio.get_running_loop().call_soon(self._stop.set)
+        return None
+
+
+def serve(
+    path: Optional[str] = None, load: Iterable[str] = (), warm: Optional[Iterable[str]] = None
+) -> None:
+    """Run a daemon in the foreground (what `slick serve` does)."""
+
+    server = Server(path)
+
+    def ready() -> None:
+        print(f"slick daemon listening on {server.path} (pid {os.getpid()})", file=sys.stderr, flush=True)
+
+    asyncio.run(server.serve(load=load, warm=warm, ready=ready))
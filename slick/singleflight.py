@@ -0,0 +1,54 @@
+"""In-process single-flight coalescing for async calls.
+
+Concurrent callers that ask for the same key share one execution: the first caller
+starts the work as a task, later callers await the same task, and everyone receives
+the same result object (or the same exception). The work is cancelled only when every
+waiter has gone away.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls that share a key into one execution."""
+
+    def __init__(self) -> None:
+        # Keyed per event loop: a task can only be awaited from the loop that runs it.
+        self._flights: Dict[Tuple[int, Hashable], _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            flight = _Flight(loop.create_task(fn()))
+            self._flights[flight_key] = flight
+
+            def _forget(_: asyncio.Task[Any], flight: _Flight = flight) -> None:
+                if self._flights.get(flight_key) is flight:
+                    del self._flights[flight_key]
+
+            flight.task.add_done_callback(_forget)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                if self._flights.get(flight_key) is flight:
+                    del self._flights[flight_key]
@@ -0,0 +1,257 @@
+"""Shared HTTP transport per provider, and connection warmup.
+
+Each provider gets one `httpx.Client` and one `httpx.AsyncClient`, created on first
+use and shared by the provider's SDK clients (model listing) and the LangChain chat
+models built by `create_chat_model`. Connections are kept alive between calls, HTTP/2
+is used when the `h2` package is installed, and pool size and timeouts are tunable per
+provider:
+
+    [providers.openai]
+    max_connections = 200
+    max_keepalive_connections = 50
+    keepalive_expiry = 120
+    connect_timeout = 3
+    http2 = true
+
+or at runtime with `configure_transport("openai", max_connections=200)`.
+
+`slick.warmup()` (or `await slick.awarmup()` for the async pools) opens connections
+to each provider at process start, so the first real call does not pay for DNS, TCP
+and TLS setup.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Where `warmup` connects to when no base_url is configured for the provider.
+BASE_URLS: Dict[str, str] = {
+    "openai": "https://api.openai.com/v1",
+    "anthropic": "https://api.anthropic.com",
+    "google": "https://generativelanguage.googleapis.com",
+    "mistral": "https://api.mistral.ai/v1",
+    "groq": "https://api.groq.com/openai/v1",
+    "together": "https://api.together.xyz/v1",
+    "fireworks": "https://api.fireworks.ai/inference/v1",
+}
+
+
+@dataclass(frozen=True)
+class TransportSettings:
+    """Connection pool and timeout settings for one provider's HTTP clients."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0  # seconds an idle connection is kept
+    connect_timeout: float = 5.0
+    timeout: float = 600.0  # read/write/pool timeout; generations can be slow
+    http2: bool = True  # used only when the h2 package is installed
+
+
+_FIELDS = tuple(f.name for f in fields(TransportSettings))
+
+_lock = threading.Lock()
+# provider -> (settings, sync client, async client)
+_clients: Dict[str, Tuple[TransportSettings, Any, Any]] = {}
+_overrides: Dict[str, Dict[str, Any]] = {}
+
+
+def settings_for(provider: str) -> TransportSettings:
+    """Defaults, overridden by the provider's config section, overridden by
+    `configure_transport`."""
+
+    from .config import provider_settings
+
+    values = {k: v for k, v in provider_settings(provider).items() if k in _FIELDS}
+    values.update(_overrides.get(provider, {}))
+    return replace(TransportSettings(), **values)
+
+
+def configure_transport(provider: str, **settings: Any) -> None:
+    """Override transport settings for a provider; clients are rebuilt on next use.
+
+    Chat models pooled by `create_chat_model` hold on to their clients, so the pool is
+    cleared as well.
+    """
+
+    unknown = set(settings) - set(_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown transport setting(s): {', '.join(sorted(unknown))}")
+    with _lock:
+        _overrides.setdefault(provider, {}).update(settings)
+    from .models import clear_chat_model_cache
+
+    clear_chat_model_cache()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # type: ignore[import-not-found]  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build(settings: TransportSettings) -> Tuple[Any, Any]:
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+    timeout = httpx.Timeout(settings.timeout, connect=settings.connect_timeout)
+    http2 = settings.http2 and _http2_available()
+    common = {"limits": limits, "timeout": timeout, "http2": http2, "follow_redirects": True}
+    return httpx.Client(**common), httpx.AsyncClient(**common)
+
+
+def _clients_for(provider: str) -> Tuple[Any, Any]:
+    settings = settings_for(provider)
+    cached = _clients.get(provider)
+    if cached is not None and cached[0] == settings:
+        return cached[1], cached[2]
+    with _lock:
+        cached = _clients.get(provider)
+        if cached is None or cached[0] != settings:
+            # Clients that were replaced are left open: chat models may still use them.
+            cached = _clients[provider] = (settings, *_build(settings))
+    return cached[1], cached[2]
+
+
+def get_client(provider: str) -> Any:
+    """The shared `httpx.Client` for a provider."""
+
+    return _clients_for(provider)[0]
+
+
+def get_async_client(provider: str) -> Any:
+    """The shared `httpx.AsyncClient` for a provider."""
+
+    return _clients_for(provider)[1]
+
+
+def chat_kwargs(provider: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the shared clients to LangChain chat model kwargs (explicit ones win).
+
+    For integrations that accept `http_client` / `http_async_client`.
+    """
+
+    if "http_client" in kwargs and "http_async_client" in kwargs:
+        return kwargs
+    sync_client, async_client = _clients_for(provider)
+    return {"http_client": sync_client, "http_async_client": async_client, **kwargs}
+
+
+def reset() -> None:
+    """Close all shared clients and forget overrides (mainly for tests)."""
+
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _overrides.clear()
+    for _, sync_client, _async_client in clients:
+        sync_client.close()
+
+
+def _warm_url(provider: str) -> Optional[str]:
+    from .config import provider_settings
+
+    return provider_settings(provider).get("base_url") or BASE_URLS.get(provider)
+
+
+def _default_targets() -> List[str]:
+    from .models import PROVIDERS, get_provider
+
+    targets = []
+    for name in PROVIDERS:
+        if name not in BASE_URLS:
+            continue
+        try:
+            has_key = bool(get_provider(name).get_api_key())
+        except Exception:  # SDK not installed
+            continue
+        if has_key:
+            targets.append(name)
+    return targets
+
+
+def _split(targets: Optional[Iterable[str]]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Providers to connect to and (model, provider) pairs to build chat models for."""
+
+    if targets is None:
+        return _default_targets(), []
+    from .models import PROVIDERS, resolve_model
+
+    providers: List[str] = []
+    chats: List[Tuple[str, str]] = []
+    for target in targets:
+        if target in PROVIDERS:
+            provider = target
+        else:
+            model, provider = resolve_model(target)
+            chats.append((model, provider))
+        if provider not in providers:
+            providers.append(provider)
+    return providers, chats
+
+
+def warmup(targets: Optional[Iterable[str]] = None, timeout: float = 5.0) -> Dict[str, Optional[str]]:
+    """Open connections to providers ahead of the first call.
+
+    `targets` are provider names or models ("provider:model" or a model id); models
+    also get their chat client built and pooled. By default every provider whose API
+    key is set is warmed. Returns provider -> None on success or an error message.
+    Warm-up requests are unauthenticated HEAD requests; only the connection matters.
+    """
+
+    providers, chats = _split(targets)
+    if chats:
+        from .models import create_chat_model
+
+        for model, provider in chats:
+            create_chat_model(model=model, provider=provider)
+
+    def warm(provider: str) -> Optional[str]:
+        url = _warm_url(provider)
+        if not url:
+            return None
+        try:
+            get_client(provider).head(url, timeout=timeout)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    if not providers:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(providers)) as pool:
+        return dict(zip(providers, pool.map(warm, providers)))
+
+
+async def awarmup(targets: Optional[Iterable[str]] = None, timeout: float = 5.0) -> Dict[str, Optional[str]]:
+    """Like `warmup`, for the async connection pools used by async steps."""
+
+    import asyncio
+
+    providers, chats = _split(targets)
+    if chats:
+        from .models import create_chat_model
+
+        for model, provider in chats:
+            create_chat_model(model=model, provider=provider)
+
+    async def warm(provider: str) -> Optional[str]:
+        url = _warm_url(provider)
+        if not url:
+            return None
+        try:
+            await get_async_client(provider).head(url, timeout=timeout)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    results = await asyncio.gather(*(warm(p) for p in providers))
+    return dict(zip(providers, results))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+"""Shared fixtures: isolated cache/config directories and an offline chat model."""
+
+import dataclasses
+from pathlib import Path
+from typing import Any, Iterator, List
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[Path]:
+    """Keep the catalog, result cache and config files away from the user's real ones."""
+
+    from slick import catalog, config
+
+    cache_dir = tmp_path / "slick-cache"
+    monkeypatch.setenv("SLICK_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config-home"))
+    for name in ("SLICK_CONFIG", "SLICK_MODEL", "SLICK_PROVIDER"):
+        monkeypatch.delenv(name, raising=False)
+    catalog.reset()
+    config.clear_cache()
+    yield cache_dir
+    catalog.reset()
+    config.clear_cache()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_limiters(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Undo `configure_limits` calls (overrides, PROVIDERS entries, built limiters)."""
+
+    from slick import models
+
+    monkeypatch.setattr(models, "_limiters", {})
+    monkeypatch.setattr(models, "_explicit_limits", {})
+    for name, spec in models.PROVIDERS.items():
+        monkeypatch.setitem(models.PROVIDERS, name, dataclasses.replace(spec))
+
+
+@pytest.fixture
+def fake_responses(monkeypatch: pytest.MonkeyPatch) -> Iterator[List[str]]:
+    """Make every provider return the offline fake model cycling through the yielded list."""
+
+    from slick import models
+    from slick.providers.fake import FakeChatModel
+
+    responses: List[str] = ["ok"]
+
+    class _FakeProvider:
+        @staticmethod
+        def make_chat(model: str, **kwargs: Any) -> FakeChatModel:
+            return FakeChatModel(responses=responses, chunk_chars=1)
+
+    monkeypatch.setattr(models, "_load_provider", lambda name: _FakeProvider)
+    models.clear_chat_model_cache()
+    yield responses
+    models.clear_chat_model_cache()
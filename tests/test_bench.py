@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+"""Tests for `slick.bench` and the `slick bench` command, against the fake provider."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from slick import bench, models
+
+
+def test_resolve_model_accepts_provider_prefix() -> None:
+    assert models.resolve_model("groq:llama-3.1-8b-instant") == ("llama-3.1-8b-instant", "groq")
+    assert models.resolve_model("fake:fake-slow") == ("fake-slow", "fake")
+    # Not a provider prefix: left alone (e.g. tagged local model names).
+    assert models.resolve_model("llama3:8b", provider="openai") == ("llama3:8b", "openai")
+
+
+def test_run_bench_reports_latency_ttft_and_errors() -> None:
+    results = bench.run_bench(
+        ["fake:fake", "fake:fake-flaky"],
+        ["hello"],
+        requests=20,
+        concurrency=5,
+        warmup=0,
+        latency=0.02,
+        chunk_rate=1000.0,
+        seed=1,
+    )
+    ok, flaky = (r.summary() for r in results)
+    assert ok["requests"] == 20 and ok["ok"] == 20
+    assert ok["error_rate"] == 0.0
+    assert 20 <= ok["ttft_p50_ms"] <= ok["latency_p50_ms"] <= ok["latency_p99_ms"]
+    assert ok["output_tokens"] > 0 and not ok["tokens_estimated"]
+    assert ok["throughput_rps"] > 0
+    assert flaky["provider"] == "fake"
+
+    errors = bench.run_bench(["fake:fake"], ["hi"], requests=4, warmup=0, error_rate=1.0)[0].summary()
+    assert errors["ok"] == 0
+    assert errors["error_rate"] == errors["rate_limit_rate"] == 1.0
+    assert errors["latency_p50_ms"] is None
+    assert "FakeRateLimitError" in errors["first_error"]
+
+
+def test_timeouts_count_as_errors() -> None:
+    result = bench.run_bench(["fake:fake"], ["hi"], requests=2, warmup=0, timeout=0.01, latency=0.5)[0]
+    assert [s.error for s in result.samples] == ["timeout", "timeout"]
+
+
+def test_load_prompts(tmp_path: Path) -> None:
+    single = tmp_path / "prompt.txt"
+    single.write_text("line one\nline two\n")
+    assert bench.load_prompts(str(single)) == ["line one\nline two\n"]
+
+    many = tmp_path / "prompts.jsonl"
+    many.write_text('"a"\n\n{"prompt": "b"}\n')
+    assert bench.load_prompts(str(many)) == ["a", "b"]
+
+
+def test_format_table_has_one_row_per_target() -> None:
+    summaries = [r.summary() for r in bench.run_bench(["fake", "fake-fast"], ["hi"], requests=2, warmup=0, latency=0)]
+    lines = bench.format_table(summaries).splitlines()
+    assert lines[0].split()[:2] == ["target", "ok"]
+    assert lines[1].startswith("fake ") and "2/2" in lines[1]
+
+
+@pytest.mark.parametrize("extra", [[], ["--json"]])
+def test_cli_bench(extra: list) -> None:
+    cp = subprocess.run(
+        [sys.executable, "-m", "slick.cli", "bench", "fake:fake", "-n", "3", "-c", "2", *extra],
+        capture_output=True,
+        text=True,
+    )
+    assert cp.returncode == 0, cp.stderr
+    if extra:
+        (summary,) = json.loads(cp.stdout)
+        assert summary["target"] == "fake:fake" and summary["ok"] == 3
+    else:
+        assert "fake:fake" in cp.stdout and "3/3" in cp.stdout
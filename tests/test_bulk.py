@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+"""Tests for batch submission (`slick.bulk`) against local stand-ins for the batch endpoints."""
+
+import json
+from typing import Any, Dict, Iterator, List
+
+import httpx
+import pytest
+from pydantic import BaseModel
+
+from slick import llm_step, transport
+from slick.providers.batches import AnthropicBatchAPI, BatchAPI, BatchError, OpenAIBatchAPI
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+class OpenAIStandIn:
+    """Files + Batches endpoints; a request whose prompt mentions "fail" errors."""
+
+    def __init__(self) -> None:
+        self.files: Dict[str, str] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.submitted: List[Dict[str, Any]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert request.headers["authorization"] == "Bearer sk-test"
+        path = request.url.path
+        if request.method == "POST" and path == "/v1/files":
+            body = request.read().decode()
+            lines = [json.loads(line) for line in body.splitlines() if line.startswith('{"custom_id"')]
+            self.submitted = lines
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = "".join(json.dumps(line) + "\n" for line in lines)
+            return httpx.Response(200, json={"id": file_id})
+        if request.method == "POST" and path == "/v1/batches":
+            spec = json.loads(request.content)
+            batch_id = f"batch_{len(self.batches)}"
+            self.batches[batch_id] = {"id": batch_id, "status": "validating", "polls": 0, **spec}
+            return httpx.Response(200, json=self.batches[batch_id])
+        if request.method == "GET" and path.startswith("/v1/batches/"):
+            job = self.batches[path.rsplit("/", 1)[1]]
+            job["polls"] += 1
+            if job["polls"] >= 2 and job["status"] != "completed":
+                self._complete(job)
+            return httpx.Response(200, json=job)
+        if request.method == "GET" and path.endswith("/content"):
+            return httpx.Response(200, text=self.files[path.split("/")[3]])
+        return httpx.Response(404, json={"error": {"message": f"no route {path}"}})
+
+    def _complete(self, job: Dict[str, Any]) -> None:
+        out, err = [], []
+        for line in self.files[job["input_file_id"]].splitlines():
+            req = json.loads(line)
+            prompt = req["body"]["messages"][-1]["content"]
+            if "fail" in prompt:
+                err.append({"custom_id": req["custom_id"], "response": None, "error": {"message": "boom"}})
+            else:
+                content = json.dumps({"summary": prompt.split()[-1].rstrip(".")})
+                body = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+                out.append({"custom_id": req["custom_id"], "response": {"status_code": 200, "body": body}, "error": None})
+        self.files["file-out"] = "".join(json.dumps(e) + "\n" for e in out)
+        self.files["file-err"] = "".join(json.dumps(e) + "\n" for e in err)
+        job.update(
+            status="completed",
+            output_file_id="file-out",
+            error_file_id="file-err" if err else None,
+            request_counts={"total": len(out) + len(err), "completed": len(out), "failed": len(err)},
+        )
+
+
+@pytest.fixture
+def stand_in(monkeypatch: pytest.MonkeyPatch) -> Iterator[OpenAIStandIn]:
+    server = OpenAIStandIn()
+    mock = httpx.MockTransport(server)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(transport, "_build", lambda settings: (httpx.Client(transport=mock), httpx.AsyncClient(transport=mock)))
+    transport.reset()
+    yield server
+    transport.reset()
+
+
+def test_submit_batch_maps_results_back_in_order(stand_in: OpenAIStandIn) -> None:
+    @llm_step(model="openai:gpt-4o-mini", temperature=0, cache=True)
+    def summarize(text: str) -> Answer:
+        """
+        Summarize {{ text }}.
+        """
+
+    items = ["apples", "fail", "pears", "apples", {"nope": 1}]
+    handle = summarize.submit_batch(items)
+    assert handle.id == "batch_0" and len(handle) == 5
+    assert [r["custom_id"] for r in stand_in.submitted] == ["item-0", "item-1", "item-2"]
+    body = stand_in.submitted[0]["body"]
+    assert body["model"] == "gpt-4o-mini" and body["temperature"] == 0
+    # Native structured output: the schema travels as response_format, not in the prompt.
+    assert [m["role"] for m in body["messages"]] == ["user"]
+    assert body["response_format"]["json_schema"]["name"] == "Answer"
+    assert not handle.status().done
+
+    results = handle.results(poll_interval=0)
+    assert results[0] == Answer(summary="apples") and results[3] == results[0]
+    assert isinstance(results[1], BatchError) and "boom" in str(results[1])
+    assert results[2] == Answer(summary="pears")
+    assert isinstance(results[4], TypeError)
+
+    # Parsed results went to the result cache; only the failure is sent again.
+    again = summarize.submit_batch(["apples", "pears", "fail"])
+    assert [r["custom_id"] for r in stand_in.submitted] == ["item-2"]
+    assert again.results(poll_interval=0)[:2] == [Answer(summary="apples"), Answer(summary="pears")]
+
+    reattached = summarize.attach_batch("batch_0", ["x", "fail"])
+    assert isinstance(reattached.results(poll_interval=0)[1], BatchError)
+
+
+def test_wait_times_out(stand_in: OpenAIStandIn) -> None:
+    @llm_step(model="openai:gpt-4o-mini")
+    def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    handle = greet.submit_batch(["a"])
+    stand_in.batches["batch_0"]["polls"] = -100
+    with pytest.raises(TimeoutError):
+        handle.wait(poll_interval=0.01, timeout=0.05)
+
+
+def test_routed_and_unsupported_steps_are_rejected() -> None:
+    @llm_step(model=["openai:gpt-4o-mini", "groq:llama-3.1-8b-instant"])
+    def routed(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    @llm_step(model="fake:fake")
+    def offline(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    with pytest.raises(ValueError, match="routed"):
+        routed.submit_batch(["a"])
+    with pytest.raises(ValueError, match="no batch API"):
+        offline.submit_batch(["a"])
+
+
+def test_anthropic_message_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    seen: List[Dict[str, Any]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["x-api-key"] == "ak-test"
+        path = request.url.path
+        if request.method == "POST" and path == "/v1/messages/batches":
+            seen.extend(json.loads(request.content)["requests"])
+            return httpx.Response(200, json={"id": "msgbatch_1", "processing_status": "in_progress"})
+        if path == "/v1/messages/batches/msgbatch_1":
+            counts = {"processing": 0, "succeeded": 1, "errored": 1, "canceled": 0, "expired": 0}
+            return httpx.Response(
+                200,
+                json={
+                    "id": "msgbatch_1",
+                    "processing_status": "ended",
+                    "request_counts": counts,
+                    "results_url": "https://api.anthropic.com/v1/messages/batches/msgbatch_1/results",
+                },
+            )
+        if path.endswith("/results"):
+            lines = [
+                {"custom_id": "a", "result": {"type": "succeeded", "message": {"content": [{"type": "text", "text": "hi"}]}}},
+                {"custom_id": "b", "result": {"type": "errored", "error": {"type": "error", "error": {"message": "overloaded"}}}},
+            ]
+            return httpx.Response(200, text="".join(json.dumps(line) + "\n" for line in lines))
+        return httpx.Response(404)
+
+    mock = httpx.MockTransport(handler)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "ak-test")
+    monkeypatch.setattr(transport, "_build", lambda settings: (httpx.Client(transport=mock), httpx.AsyncClient(transport=mock)))
+    transport.reset()
+    try:
+        api = AnthropicBatchAPI()
+        block = {"type": "text", "text": "Be brief.", "cache_control": {"type": "ephemeral"}}
+        messages = [SystemMessage(content=[block]), HumanMessage(content="Say hi")]
+        request = api.build_request("a", "claude-3-5-haiku-latest", messages, {"temperature": 0, "stop": ["\n"]})
+        assert request["params"]["system"] == [block]
+        assert request["params"]["messages"] == [{"role": "user", "content": "Say hi"}]
+        assert request["params"]["max_tokens"] == 4096 and request["params"]["stop_sequences"] == ["\n"]
+        with pytest.raises(BatchError):
+            api.build_request("a", "claude-3-5-haiku-latest", messages, {"n": 2})
+
+        batch_id = api.submit([request, {**request, "custom_id": "b"}])
+        assert batch_id == "msgbatch_1" and [r["custom_id"] for r in seen] == ["a", "b"]
+        status = api.status(batch_id)
+        assert status.done and (status.total, status.succeeded, status.failed) == (2, 1, 1)
+        results = dict(api.results(batch_id))
+        assert results["a"] == ["hi"]
+        assert isinstance(results["b"], BatchError) and "overloaded" in str(results["b"])
+    finally:
+        transport.reset()
+
+
+def test_incomplete_batch_adapter_fails_at_instantiation() -> None:
+    class Partial(BatchAPI):
+        def submit(self, requests: List[Dict[str, Any]]) -> str:
+            return "batch_1"
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial("openai", "OPENAI_API_KEY")
+    OpenAIBatchAPI()
+    AnthropicBatchAPI()
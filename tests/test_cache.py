@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+"""Tests for the persistent result cache."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import List
+
+from pydantic import BaseModel
+
+from slick import llm_step, llm_step_async
+from slick.cache import ResultCache, make_key
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+def test_roundtrip_and_ttl(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "c.sqlite3", ttl=0.05)
+    cache.set("k", {"a": [1, 2]})
+    assert cache.get("k") == {"a": [1, 2]}
+    time.sleep(0.1)
+    assert cache.get("k") is ResultCache.MISS
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "c.sqlite3", max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    cache.get("a")
+    cache.set("c", 3)
+    cache.evict()
+    assert len(cache) == 2
+    assert cache.get("b") is ResultCache.MISS
+    assert cache.get("a") == 1
+
+
+def test_make_key_is_order_independent() -> None:
+    assert make_key({"a": 1, "b": 2}) == make_key({"b": 2, "a": 1})
+    assert make_key({"a": 1}) != make_key({"a": 2})
+
+
+def test_step_results_round_trip_through_cache(tmp_path: Path, fake_responses: List[str]) -> None:
+    fake_responses[:] = ['{"summary": "first"}', '{"summary": "second"}']
+    cache = ResultCache(tmp_path / "c.sqlite3")
+
+    @llm_step(model="m", cache=cache)
+    def summarize(text: str) -> Answer:
+        """
+        Summarize: {{ text }}
+        """
+
+    first = summarize("same", stream=False)
+    again = summarize("same", stream=False)
+    other = summarize("different", stream=False)
+
+    assert isinstance(again, Answer)
+    assert first == again == Answer(summary="first")
+    assert other.summary == "second"
+
+
+def test_async_dict_results_and_batch_hits(tmp_path: Path, fake_responses: List[str]) -> None:
+    fake_responses[:] = ['{"output": {"n": 1}}', '{"output": {"n": 2}}']
+    cache = ResultCache(tmp_path / "c.sqlite3")
+
+    @llm_step_async(model="m", cache=cache)
+    async def extract(text: str) -> dict:
+        """
+        Extract from {{ text }}
+        """
+
+    assert asyncio.run(extract("x", stream=False)) == {"n": 1}
+    assert asyncio.run(extract.abatch(["x", "y"])) == [{"n": 1}, {"n": 2}]
+    assert len(cache) == 2
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+"""Tests for recording chat traffic to a cassette and replaying it (`slick.cassette`)."""
+
+import asyncio
+import gzip
+import json
+import time
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from slick import llm_step_async, models
+from slick.cassette import CassetteMiss, ReplayedError, play, use_cassette
+from slick.limits import is_rate_limit_error
+
+
+def _offline(monkeypatch: pytest.MonkeyPatch) -> None:
+    def refuse(name: str):
+        raise AssertionError(f"replay built a {name} chat model")
+
+    monkeypatch.setattr(models, "_load_provider", refuse)
+    models.clear_chat_model_cache()
+
+
+def test_step_replays_without_the_provider(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "traffic.jsonl.gz"
+
+    @llm_step_async(model="fake:fake", latency=0.2, responses=["Hello Ada", "Hello Bob"])
+    async def greet(name: str) -> str:
+        """
+        Say hello to {{ name }}.
+        """
+
+    async def both():
+        return await asyncio.gather(greet("Ada"), greet("Bob"))
+
+    with use_cassette(path, mode="record") as tape:
+        recorded = asyncio.run(both())
+    assert len(tape.entries) == 2
+    with gzip.open(path, "rt") as f:
+        entry = json.loads(f.readline())
+    assert entry["provider"] == "fake" and entry["settings"]["latency"] == 0.2
+    assert entry["total"] >= 0.2 and entry["messages"][-1]["data"]["content"].startswith("Say hello to")
+
+    _offline(monkeypatch)
+    with use_cassette(path):
+        start = time.perf_counter()
+        assert asyncio.run(both()) == recorded
+        assert time.perf_counter() - start >= 0.19  # original latency
+        with pytest.raises(CassetteMiss):
+            asyncio.run(greet("Eve"))
+        with pytest.raises(CassetteMiss, match="were used"):
+            asyncio.run(greet("Ada"))  # its one recording was replayed already
+    monkeypatch.setenv("SLICK_CASSETTE", str(path))
+    monkeypatch.setenv("SLICK_CASSETTE_LATENCY_SCALE", "0")
+    start = time.perf_counter()
+    assert asyncio.run(both()) == recorded
+    assert time.perf_counter() - start < 0.15
+
+
+def test_streaming_timing_and_errors(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "stream.jsonl"
+    messages = [HumanMessage(content="Count")]
+    with use_cassette(path, mode="record"):
+        chat = models.create_chat_model("fake", provider="fake", responses=["abcdefgh"], chunk_chars=2, chunk_rate=20)
+        recorded = [chunk.content for chunk in chat.stream(messages)]
+        flaky = models.create_chat_model("fake", provider="fake", error_rate=1.0)
+        with pytest.raises(Exception):
+            flaky.invoke(messages)
+    assert recorded == ["ab", "cd", "ef", "gh"]
+
+    _offline(monkeypatch)
+    with use_cassette(path, latency_scale=2.0, repeat=True):
+        chat = models.create_chat_model("fake", provider="fake", responses=["abcdefgh"], chunk_chars=2, chunk_rate=20)
+        start, arrivals = time.perf_counter(), []
+        for chunk in chat.stream(messages):
+            arrivals.append((chunk.content, time.perf_counter() - start))
+        assert [text for text, _ in arrivals] == recorded
+        assert arrivals[-1][1] >= 0.29  # three 50ms gaps, doubled
+        # With repeat=True the recording answers again; a streamed one also serves a
+        # non-streaming call with the whole text.
+        assert chat.invoke(messages).content == "abcdefgh"
+
+        flaky = models.create_chat_model("fake", provider="fake", error_rate=1.0)
+        with pytest.raises(ReplayedError) as error:
+            flaky.invoke(messages)
+        assert is_rate_limit_error(error.value)
+
+
+def test_play_reproduces_the_schedule(tmp_path: Path) -> None:
+    path = tmp_path / "load.jsonl.gz"
+    with use_cassette(path, mode="record"):
+        chat = models.create_chat_model("fake", provider="fake", latency=0.05)
+        for i in range(3):
+            chat.invoke([HumanMessage(content=f"request {i}")])
+            time.sleep(0.1)
+
+    report = play(path, time_scale=0.5)
+    summary = report.summary()
+    assert summary["requests"] == 3 and summary["errors"] == 0
+    assert [round(call.at, 2) for call in report.calls] == pytest.approx([0.0, 0.075, 0.15], abs=0.03)
+    assert all(call.latency >= 0.045 for call in report.calls)
+    assert report.wall_time >= 0.19
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+"""Tests for the cached model catalog, parallel listing and provider inference."""
+
+import subprocess
+import sys
+import time
+from typing import List
+
+import pytest
+
+from slick import catalog, models
+
+
+class _ListingProvider:
+    calls: List[str] = []
+
+    @staticmethod
+    def list_models() -> List[str]:
+        _ListingProvider.calls.append("list")
+        return ["m-b", "m-a"]
+
+
+def test_list_models_is_cached_on_disk(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(models, "_load_provider", lambda name: _ListingProvider)
+    _ListingProvider.calls = []
+
+    assert models.list_models("openai") == ["m-b", "m-a"]
+    catalog.reset()  # force a re-read from disk
+    assert models.list_models("openai") == ["m-a", "m-b"]
+    assert _ListingProvider.calls == ["list"]
+
+    models.list_models("openai", refresh=True)
+    assert _ListingProvider.calls == ["list", "list"]
+
+
+def test_catalog_entries_expire() -> None:
+    catalog.put("groq", ["llama"])
+    assert catalog.get("groq") == ["llama"]
+    assert catalog.get("groq", ttl=-1) is None
+
+
+def test_list_all_models_runs_providers_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Slow:
+        @staticmethod
+        def list_models() -> List[str]:
+            time.sleep(0.2)
+            return ["slow-model"]
+
+    monkeypatch.setattr(models, "_load_provider", lambda name: _Slow)
+    start = time.monotonic()
+    listing = models.list_all_models(providers=["openai", "groq", "mistral"])
+    assert time.monotonic() - start < 0.5
+    assert listing == {p: ["slow-model"] for p in ["openai", "groq", "mistral"]}
+
+
+def test_list_all_models_times_out_per_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Hangs:
+        @staticmethod
+        def list_models() -> List[str]:
+            time.sleep(1.0)
+            return ["late"]
+
+    catalog.put("groq", ["stale-model"])
+    monkeypatch.setattr(models, "_load_provider", lambda name: _Hangs)
+    start = time.monotonic()
+    listing = models.list_all_models(providers=["groq", "openai"], timeout=0.1, refresh=True)
+    assert time.monotonic() - start < 0.5
+    assert listing == {"groq": ["stale-model"], "openai": []}
+
+
+def test_list_all_models_timeout_bounds_the_process() -> None:
+    # Threads still fetching after the timeout must not delay interpreter exit.
+    script = (
+        "import time\n"
+        "from slick import models\n"
+        "class Hangs:\n"
+        "    @staticmethod\n"
+        "    def list_models():\n"
+        "        time.sleep(5)\n"
+        "        return ['late']\n"
+        "models._load_provider = lambda name: Hangs\n"
+        "print(models.list_all_models(providers=['groq'], timeout=0.1, refresh=True))\n"
+    )
+    start = time.monotonic()
+    cp = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+    assert cp.returncode == 0, cp.stderr
+    assert "'groq': []" in cp.stdout
+    assert time.monotonic() - start < 3.0
+
+
+def test_provider_inferred_from_index_and_prefixes() -> None:
+    catalog.put("together", ["meta-llama/Llama-3-70b"])
+    catalog.put("google", ["models/gemini-2.0-flash"])
+
+    assert models.resolve_model("meta-llama/Llama-3-70b") == ("meta-llama/Llama-3-70b", "together")
+    assert models.resolve_model("gemini-2.0-flash")[1] == "google"
+    assert models.resolve_model("claude-3-5-sonnet-latest")[1] == "anthropic"
+    assert models.resolve_model("gpt-4o", provider="groq")[1] == "groq"
+    assert models.resolve_model("unknown-model")[1] == "openai"
@@ -1,18 +1,124 @@
 from __future__ import annotations
 
-"""Tests for config precedence and env reading (skeleton)."""
+"""Tests for config precedence, TOML loading and the mtime-invalidated cache."""
+
+import warnings
+from pathlib import Path
 
 import pytest
 
+from slick import config, models
+
+
+@pytest.fixture
+def user_config(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    path = tmp_path / "user.toml"
+    monkeypatch.setenv("SLICK_CONFIG", str(path))
+    monkeypatch.setattr(config, "STAT_INTERVAL", 0.0)
+    return path
+
+
+@pytest.fixture
+def project_dir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    monkeypatch.chdir(project / "src")
+    monkeypatch.setattr(config, "STAT_INTERVAL", 0.0)
+    return project
+
+
+def test_env_vars_precedence(monkeypatch: pytest.MonkeyPatch, user_config: Path) -> None:
+    """Env should take effect if in-memory default not set, over config files."""
+
+    user_config.write_text('default_model = "from-file"\n')
+    monkeypatch.setenv("SLICK_MODEL", "gpt-4o-mini")
+    m, p = config.resolve_defaults()
+    assert m == "gpt-4o-mini"
+    assert p is None
+
+
+def test_user_config_over_project_config(user_config: Path, project_dir: Path) -> None:
+    (project_dir / "pyproject.toml").write_text(
+        '[tool.slick]\ndefault_model = "claude-3-5-haiku-latest"\n'
+        '[tool.slick.providers.openai]\ntimeout = 5\nrpm = 10\n'
+    )
+    assert config.resolve_defaults() == ("claude-3-5-haiku-latest", None)
+    assert config.load_project_config()["default_model"] == "claude-3-5-haiku-latest"
+
+    user_config.write_text('default_model = "gpt-4.1"\n[providers.openai]\ntimeout = 30\n')
+    assert config.resolve_defaults() == ("gpt-4.1", None)
+    # Provider sections merge key by key.
+    assert config.provider_settings("openai") == {"timeout": 30, "rpm": 10}
+    assert config.provider_settings("anthropic") == {}
+
+
+def test_files_are_reread_only_when_changed(
+    monkeypatch: pytest.MonkeyPatch, user_config: Path
+) -> None:
+    user_config.write_text('default_model = "a"\n')
+    assert config.resolve_defaults()[0] == "a"
+    gen = config.generation()
+
+    parses = []
+    real_parse = config._parse_toml
+    monkeypatch.setattr(config, "_parse_toml", lambda path: parses.append(path) or real_parse(path))
+    for _ in range(5):
+        assert config.resolve_defaults()[0] == "a"
+    assert parses == []
+    assert config.generation() == gen
+
+    user_config.write_text('default_model = "bb"\n')
+    assert config.resolve_defaults()[0] == "bb"
+    assert parses == [user_config]
+    assert config.generation() > gen
+
+
+def test_invalid_config_file_warns_once(user_config: Path) -> None:
+    user_config.write_text('default_model = "unterminated\n')
+    with pytest.warns(UserWarning, match="invalid config file"):
+        assert config.resolve_defaults() == (None, None)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert config.resolve_defaults() == (None, None)  # cached until the file changes
+
+
+def test_stat_calls_are_throttled(monkeypatch: pytest.MonkeyPatch, user_config: Path) -> None:
+    user_config.write_text('default_model = "a"\n')
+    monkeypatch.setattr(config, "STAT_INTERVAL", 3600.0)
+    assert config.resolve_defaults()[0] == "a"
+    user_config.write_text('default_model = "bb"\n')
+    assert config.resolve_defaults()[0] == "a"
+    config.clear_cache()
+    assert config.resolve_defaults()[0] == "bb"
+
+
+def test_models_use_config_defaults_and_provider_settings(
+    monkeypatch: pytest.MonkeyPatch, user_config: Path
+) -> None:
+    user_config.write_text(
+        'default_model = "claude-3-5-haiku-latest"\n'
+        '[providers.anthropic]\nbase_url = "http://proxy.local"\ntimeout = 7\nmax_concurrency = 3\n'
+    )
+    monkeypatch.setattr(models, "_default_model", None)
+    monkeypatch.setattr(models, "_default_provider", None)
+    assert models.resolve_model() == ("claude-3-5-haiku-latest", "anthropic")
+    assert models.get_default_model() == ("claude-3-5-haiku-latest", None)
 
-@pytest.mark.skip(reason="Pending config/models implementation")
-def test_env_vars_precedence(monkeypatch: pytest.MonkeyPatch) -> None:
-    """Env should take effect if in-memory default not set."""
+    seen = []
 
-    # from slick import config
-    # monkeypatch.setenv("SLICK_MODEL", "gpt-4o-mini")
-    # m, p = config.resolve_defaults()
-    # assert m == "gpt-4o-mini"
-    pass
+    class _Provider:
+        @staticmethod
+        def make_chat(model: str, **kwargs: object) -> object:
+            seen.append(kwargs)
+            return object()
 
+    monkeypatch.setattr(models, "_load_provider", lambda name: _Provider)
+    models.clear_chat_model_cache()
+    models.create_chat_model(timeout=1)
+    assert seen == [{"base_url": "http://proxy.local", "timeout": 1}]
+    models.clear_chat_model_cache()
 
+    monkeypatch.setattr(models.PROVIDERS["anthropic"], "max_concurrency", 64)
+    assert models.get_limiter("anthropic").concurrency.maximum == 3
+    models.configure_limits("anthropic", max_concurrency=5)
+    assert models.get_limiter("anthropic").concurrency.maximum == 5
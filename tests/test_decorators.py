@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+"""Offline tests for llm_step / llm_step_async against a fake chat model."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+from pydantic import BaseModel
+
+from slick import llm_step, llm_step_async
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+def test_llm_step_returns_text(fake_responses: List[str]) -> None:
+    fake_responses[:] = ["hello there"]
+
+    @llm_step(model="m")
+    def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    assert greet("bob", stream=False) == "hello there"
+
+
+def test_llm_step_parses_pydantic(fake_responses: List[str]) -> None:
+    fake_responses[:] = ['{"summary": "short"}']
+
+    @llm_step(model="m")
+    def summarize(text: str) -> Answer:
+        """
+        Summarize: {{ text }}
+        """
+
+    result = summarize("long text", stream=False)
+    assert isinstance(result, Answer)
+    assert result.summary == "short"
+
+
+def test_llm_step_async_parses_dict(fake_responses: List[str]) -> None:
+    fake_responses[:] = ['```json\n{"output": {"a": 1}}\n```']
+
+    @llm_step_async(model="m")
+    async def extract(text: str) -> dict:
+        """
+        Extract from {{ text }}
+        """
+
+    assert asyncio.run(extract("x", stream=False)) == {"a": 1}
+
+
+def test_template_is_compiled_once(fake_responses: List[str]) -> None:
+    """The template and its variables are prepared once, on the first call."""
+
+    from slick.decorators import _Step
+
+    def fn(text: str, style: str = "brief") -> str:
+        """
+        {{ style }}: {{ text }} {{ extra }}
+        """
+
+    step = _Step(fn, "m", {})
+    assert step.prompt is None  # nothing is built until the first call
+    inputs = step.bind(("hi",), {})
+    assert sorted(step.input_variables) == ["extra", "style", "text"]
+    assert step.prompt.format(**inputs) == "brief: hi "
+    assert step.prompt._compiled is not None
+
+
+def test_batch_preserves_order_and_captures_errors(fake_responses: List[str]) -> None:
+    fake_responses[:] = ['{"summary": "a"}', "not json", '{"summary": "c"}']
+
+    @llm_step(model="m")
+    def summarize(text: str) -> Answer:
+        """
+        Summarize: {{ text }}
+        """
+
+    results = summarize.batch(["one", {"text": "two"}, ("three",), ("x", "too many")], max_concurrency=1)
+
+    assert results[0].summary == "a"
+    assert isinstance(results[1], Exception)
+    assert results[2].summary == "c"
+    assert isinstance(results[3], TypeError)
+
+
+def test_abatch_runs_async(fake_responses: List[str]) -> None:
+    fake_responses[:] = ["x"]
+
+    @llm_step_async(model="m")
+    async def echo(text: str) -> str:
+        """
+        Echo {{ text }}
+        """
+
+    assert asyncio.run(echo.abatch(["a", "b", "c"], max_concurrency=2)) == ["x", "x", "x"]
+
+
+def test_async_step_is_admitted_through_provider_limiter(fake_responses: List[str]) -> None:
+    from slick import models
+
+    fake_responses[:] = ["x"]
+    models.configure_limits("openai", initial_concurrency=2)
+
+    @llm_step_async(model="m")
+    async def echo(text: str) -> str:
+        """
+        Echo {{ text }}
+        """
+
+    async def main() -> List[str]:
+        return await asyncio.gather(*(echo(str(i), stream=False) for i in range(5)))
+
+    assert asyncio.run(main()) == ["x"] * 5
+    limiter = models.get_limiter("openai")
+    assert limiter.concurrency.baseline_latency is not None
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_stream_yields_text_chunks(fake_responses: List[str]) -> None:
+    fake_responses[:] = ["hello world"]
+
+    @llm_step(model="m")
+    def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    chunks = list(greet.stream("bob"))
+    assert len(chunks) > 1
+    assert "".join(chunks) == "hello world"
+
+
+def test_astream_yields_text_chunks(fake_responses: List[str]) -> None:
+    fake_responses[:] = ["abc"]
+
+    @llm_step_async(model="m")
+    async def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    async def main() -> List[str]:
+        return [chunk async for chunk in greet.astream(name="bob")]
+
+    assert asyncio.run(main()) == ["a", "b", "c"]
+
+
+def test_plain_calls_register_no_stdout_handler(
+    fake_responses: List[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from slick import models
+
+    seen: List[dict] = []
+    real = models.create_chat_model
+
+    def spy(*args, **kwargs):
+        seen.append(kwargs)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(models, "create_chat_model", spy)
+
+    @llm_step(model="m")
+    def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    greet("bob")
+    list(greet.stream("bob"))
+    assert all("callbacks" not in kw and "streaming" not in kw for kw in seen)
+
+
+def test_static_prefix_and_format_instructions_go_to_system_message(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from langchain_core.messages import HumanMessage, SystemMessage
+
+    from slick import models
+    from slick.providers.fake import FakeChatModel
+
+    sent: List[list] = []
+
+    class _Recording(FakeChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):  # type: ignore[no-untyped-def]
+            sent.append(messages)
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+    class _Provider:
+        @staticmethod
+        def make_chat(model: str, **kwargs: object) -> FakeChatModel:
+            return _Recording(responses=['{"summary": "s"}'])
+
+        @staticmethod
+        def mark_cacheable(message: SystemMessage) -> SystemMessage:
+            return SystemMessage(content=message.content, additional_kwargs={"cached": True})
+
+    monkeypatch.setattr(models, "_load_provider", lambda name: _Provider)
+    models.clear_chat_model_cache()
+
+    @llm_step(model="m")
+    def summarize(text: str) -> Answer:
+        """
+        You summarize documents.
+        Keep it short.
+
+        Document: {{ text }}
+        """
+
+    summarize("one")
+    summarize("two")
+    (system1, human1), (system2, human2) = sent
+    assert isinstance(system1, SystemMessage) and isinstance(human1, HumanMessage)
+    assert system1.content == system2.content
+    assert system1.content.startswith("You summarize documents.\nKeep it short.")
+    assert "JSON schema" in system1.content
+    assert system1.additional_kwargs == {"cached": True}
+    assert human1.content == "Document: one" and human2.content == "Document: two"
+    models.clear_chat_model_cache()
+
+
+def test_prompt_without_static_part_stays_one_user_message(fake_responses: List[str]) -> None:
+    @llm_step(model="m")
+    def echo(text: str) -> str:
+        """
+        {{ text }}
+        """
+
+    echo("hi")
+    from slick.decorators import _Step
+
+    step = _Step(echo.__wrapped__, "m", {})
+    step.compile()
+    assert step.system is None
+    assert [type(m).__name__ for m in step.messages({"text": "hi"})] == ["HumanMessage"]
+
+
+def test_native_structured_output_skips_format_instructions(monkeypatch: pytest.MonkeyPatch) -> None:
+    from langchain_core.exceptions import OutputParserException
+
+    from slick import models
+    from slick.providers.fake import FakeChatModel
+
+    sent: List[tuple] = []
+    replies = ['{"summary": "s"}', '{"a": [1]}', "not json"]
+
+    class _Recording(FakeChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):  # type: ignore[no-untyped-def]
+            sent.append((messages, kwargs))
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+    class _Provider:
+        @staticmethod
+        def make_chat(model: str, **kwargs: object) -> FakeChatModel:
+            return _Recording(responses=replies)
+
+        @staticmethod
+        def structured_output(model: str, name: str, schema: dict) -> dict:
+            return {"response_format": {"name": name, "schema": schema}}
+
+    monkeypatch.setattr(models, "_load_provider", lambda name: _Provider)
+    models.clear_chat_model_cache()
+
+    @llm_step(model="m")
+    def summarize(text: str) -> Answer:
+        """
+        You summarize documents.
+
+        Document: {{ text }}
+        """
+
+    @llm_step(model="m")
+    def extract(text: str) -> dict:
+        """
+        Extract from {{ text }}
+        """
+
+    assert summarize("one") == Answer(summary="s")
+    messages, kwargs = sent[0]
+    assert messages[0].content == "You summarize documents."
+    assert kwargs["response_format"]["name"] == "Answer"
+    assert kwargs["response_format"]["schema"]["required"] == ["summary"]
+    assert extract("x") == {"a": [1]}
+    with pytest.raises(OutputParserException):
+        summarize("two")
+    models.clear_chat_model_cache()
+
+
+def test_native_structured_output_needs_opt_in_for_custom_endpoints(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    from slick import config
+    from slick.decorators import _Step
+    from slick.providers.openai import OpenAIProvider
+
+    monkeypatch.setattr(config, "STAT_INTERVAL", 0.0)
+    user_config = tmp_path / "slick.toml"
+    monkeypatch.setenv("SLICK_CONFIG", str(user_config))
+
+    def summarize(text: str) -> Answer:
+        """
+        Summarize {{ text }}.
+        """
+
+    def native(**llm_kwargs: Any) -> bool:
+        step = _Step(summarize, "openai:gpt-4o-mini", llm_kwargs)
+        step.compile()
+        return step.structured() is not None
+
+    assert native()
+    assert not native(base_url="http://localhost:8000/v1")
+    user_config.write_text('[providers.openai]\nstructured_output = true\n')
+    assert native(base_url="http://localhost:8000/v1")
+    user_config.write_text('[providers.openai]\nstructured_output = false\n')
+    assert not native()
+
+    # Allow-list: models without json_schema response formats keep prompt-based parsing.
+    for model in ("gpt-4o-mini", "gpt-4o-2024-08-06", "gpt-4.1-nano", "o3-mini", "o4-mini-2025-04-16"):
+        assert OpenAIProvider.structured_output(model, "A", {}) is not None, model
+    for model in ("gpt-4o-2024-05-13", "o1-mini", "o1-preview", "gpt-4-turbo", "gpt-3.5-turbo"):
+        assert OpenAIProvider.structured_output(model, "A", {}) is None, model
+
+
+def _counting_provider(monkeypatch: pytest.MonkeyPatch, replies: List[str], supports_n: bool, **model: Any) -> list:
+    """Route every model to a fake that records the chat kwargs of each request."""
+
+    from slick import models
+    from slick.providers.fake import FakeChatModel
+
+    calls: list = []
+
+    class _Counting(FakeChatModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):  # type: ignore[no-untyped-def]
+            calls.append(self.n)
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):  # type: ignore[no-untyped-def]
+            calls.append(self.n)
+            if len(calls) == 1 and model.get("first_delay"):
+                await asyncio.sleep(model["first_delay"])
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+    class _Provider:
+        @staticmethod
+        def make_chat(name: str, **kwargs: Any) -> FakeChatModel:
+            return _Counting(responses=replies, n=kwargs.get("n", 1))
+
+    _Provider.supports_n = supports_n  # type: ignore[attr-defined]
+    monkeypatch.setattr(models, "_load_provider", lambda name: _Provider)
+    models.clear_chat_model_cache()
+    return calls
+
+
+def test_multi_output_uses_native_n(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _counting_provider(monkeypatch, ['{"summary": "a"}', "junk", '{"summary": "c"}'], supports_n=True)
+
+    @llm_step(model="m", n=3)
+    def drafts(text: str) -> List[Answer]:
+        """
+        Summarize {{ text }}
+        """
+
+    # One request for all candidates; the unparseable one is dropped.
+    assert drafts("x") == [Answer(summary="a"), Answer(summary="c")]
+    assert calls == [3]
+
+
+def test_multi_output_fans_out_without_native_n(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _counting_provider(monkeypatch, ['{"summary": "a"}'], supports_n=False)
+
+    @llm_step(model="m", n=3)
+    def drafts(text: str) -> List[Answer]:
+        """
+        Summarize {{ text }}
+        """
+
+    @llm_step(model="m", n=2)
+    def labels(text: str) -> List[str]:
+        """
+        Label {{ text }}
+        """
+
+    assert drafts("x") == [Answer(summary="a")] * 3
+    assert calls == [1, 1, 1]
+    assert labels("x") == ['{"summary": "a"}'] * 2
+
+
+def test_first_k_returns_before_slow_candidates(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _counting_provider(monkeypatch, ['{"summary": "a"}'], supports_n=True, first_delay=2.0)
+
+    @llm_step_async(model="m", n=3, first_k=2)
+    async def drafts(text: str) -> List[Answer]:
+        """
+        Summarize {{ text }}
+        """
+
+    start = time.perf_counter()
+    assert asyncio.run(drafts("x")) == [Answer(summary="a")] * 2
+    assert time.perf_counter() - start < 1.0
+    assert calls == [1, 1, 1]  # first_k fans out even where n is native
+
+    with pytest.raises(ValueError):
+        llm_step(model="m", n=3, first_k=0)(lambda text: None)
+
+    @llm_step(model="m", first_k=1)
+    def single(text: str) -> Answer:
+        """
+        Summarize {{ text }}
+        """
+
+    with pytest.raises(ValueError, match="first_k"):
+        single("x")
+
+
+def test_first_k_is_part_of_the_cache_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = _counting_provider(monkeypatch, ['{"summary": "a"}'], supports_n=True)
+
+    def drafts(text: str) -> List[Answer]:
+        """
+        Summarize {{ text }}
+        """
+
+    two = llm_step(model="m", n=3, first_k=2, cache=True)(drafts)
+    three = llm_step(model="m", n=3, cache=True)(drafts)
+    assert len(two("x")) == 2
+    assert len(three("x")) == 3  # not the two candidates cached for first_k=2
+    assert calls[-1] == 3  # one native request for `three`
+    sent = len(calls)
+    assert len(two("x")) == 2 and len(three("x")) == 3
+    assert len(calls) == sent  # both served from their own cache entries
+
+
+def test_prompt_cache_reads_are_reported() -> None:
+    from slick import metrics
+
+    records: List[metrics.CallRecord] = []
+    metrics.add_sink(records.append)
+    try:
+
+        @llm_step(model="fake")
+        def summarize(text: str) -> Answer:
+            """
+            Summarize the document.
+            Document: {{ text }}
+            """
+
+        summarize("a")
+        summarize("b")
+    finally:
+        metrics.clear_sinks()
+    first, second = records
+    assert first.cache_read_tokens == 0
+    # The schema goes out as a native response format, so the cached prefix is the static lines.
+    assert second.cache_read_tokens and second.cache_read_tokens > 0
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+"""Tests for the offline `fake` provider used by the benchmark suite."""
+
+import asyncio
+import time
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from slick import llm_step, llm_step_async, models
+from slick.limits import is_rate_limit_error
+from slick.providers.fake import FakeChatModel, FakeRateLimitError
+
+
+class Item(BaseModel):
+    name: str
+    tags: List[str]
+    score: Optional[float] = None
+
+
+class Report(BaseModel):
+    title: str
+    items: List[Item]
+    count: int
+
+
+def test_fake_provider_is_registered() -> None:
+    assert "fake" in models.list_providers()
+    assert "fake-fast" in models.list_models("fake")
+    assert models.resolve_model("fake-slow") == ("fake-slow", "fake")
+
+
+def test_structured_steps_get_schema_conforming_responses() -> None:
+    @llm_step(model="fake")
+    def report(topic: str) -> Report:
+        """
+        Write a report about {{ topic }}.
+        """
+
+    @llm_step(model="fake")
+    def as_dict(topic: str) -> dict:
+        """
+        Describe {{ topic }}.
+        """
+
+    result = report("owls")
+    assert isinstance(result, Report)
+    assert isinstance(result.items[0], Item)
+    assert isinstance(as_dict("owls"), dict)  # native JSON output, not a wrapped string
+
+
+def test_canned_responses_cycle_and_report_usage() -> None:
+    chat = FakeChatModel(responses=["a", "b"])
+    assert [chat.invoke("hi").content for _ in range(3)] == ["a", "b", "a"]
+    usage = chat.invoke("hi").usage_metadata
+    assert usage is not None and usage["total_tokens"] == usage["input_tokens"] + usage["output_tokens"]
+
+
+def test_latency_and_chunk_rate_shape_timing() -> None:
+    chat = FakeChatModel(responses=["abcdefgh"], latency=0.05, chunk_rate=100.0, chunk_chars=2)
+
+    start = time.perf_counter()
+    first = None
+    chunks = []
+    for chunk in chat.stream("hi"):
+        if first is None:
+            first = time.perf_counter() - start
+        chunks.append(chunk.content)
+    total = time.perf_counter() - start
+
+    assert chunks == ["ab", "cd", "ef", "gh"]
+    assert first is not None and 0.05 <= first < total
+    assert total >= 0.05 + 3 / 100.0
+
+
+def test_latency_distributions_are_seeded() -> None:
+    a = FakeChatModel(latency=0.1, latency_distribution="lognormal", seed=7)
+    b = FakeChatModel(latency=0.1, latency_distribution="lognormal", seed=7)
+    samples = [a.sample_latency() for _ in range(5)]
+    assert samples == [b.sample_latency() for _ in range(5)]
+    assert len(set(samples)) > 1
+    assert FakeChatModel(latency=0.1).sample_latency() == 0.1
+
+
+def test_error_rate_raises_rate_limit_errors() -> None:
+    @llm_step_async(model="fake", error_rate=1.0)
+    async def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    with pytest.raises(FakeRateLimitError) as info:
+        asyncio.run(greet("bob"))
+    assert is_rate_limit_error(info.value)
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+"""Tests for hedged requests (`slick.hedging`) and the decorators' `hedge=` option."""
+
+import asyncio
+import time
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from slick import HedgePolicy, llm_step, llm_step_async
+from slick.hedging import Hedger, Progress, resolve_policy
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+def _async_attempt(ttft: float, result: str, log: List[str]):
+    async def run(progress: Progress) -> str:
+        progress.admitted()
+        try:
+            await asyncio.sleep(ttft)
+            progress.first_token()
+            await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            log.append(f"cancelled {result}")
+            raise
+        return result
+
+    return run
+
+
+def _sync_attempt(ttft: float, result: str, log: List[str]):
+    def run(progress: Progress) -> str:
+        time.sleep(ttft)
+        progress.first_token()
+        if progress.cancelled.is_set():
+            log.append(f"stopped {result}")
+            return "lost"
+        return result
+
+    return run
+
+
+def test_resolve_policy() -> None:
+    assert resolve_policy(None) is None and resolve_policy(False) is None
+    assert resolve_policy(True) == HedgePolicy()
+    assert resolve_policy(0.5) == HedgePolicy(delay=0.5)
+    with pytest.raises(TypeError):
+        resolve_policy("fast")
+
+
+def test_slow_primary_is_hedged_and_cancelled() -> None:
+    hedger = Hedger(HedgePolicy(delay=0.05, max_rate=1.0))
+    log: List[str] = []
+    result = asyncio.run(hedger.arun(_async_attempt(1.0, "primary", log), _async_attempt(0.0, "backup", log)))
+    assert result == "backup"
+    assert log == ["cancelled primary"]
+    assert (hedger.calls, hedger.hedged, hedger.backup_wins) == (1, 1, 1)
+
+
+def test_fast_first_token_is_not_hedged() -> None:
+    hedger = Hedger(HedgePolicy(delay=0.1, max_rate=1.0))
+    log: List[str] = []
+    result = asyncio.run(hedger.arun(_async_attempt(0.0, "primary", log), _async_attempt(0.0, "backup", log)))
+    assert result == "primary" and hedger.hedged == 0
+
+
+def test_hedge_rate_is_capped() -> None:
+    hedger = Hedger(HedgePolicy(delay=0.01, max_rate=0.5))
+    log: List[str] = []
+
+    async def main() -> List[str]:
+        return [
+            await hedger.arun(_async_attempt(0.1, "primary", log), _async_attempt(0.0, "backup", log))
+            for _ in range(4)
+        ]
+
+    assert asyncio.run(main()) == ["primary", "backup", "primary", "backup"]
+    assert (hedger.calls, hedger.hedged) == (4, 2)
+
+
+def test_adaptive_delay_waits_for_samples() -> None:
+    hedger = Hedger(HedgePolicy(percentile=50, min_samples=3))
+    assert hedger.delay() is None
+    for ttft in (0.3, 0.1, 0.2):
+        hedger.observe(ttft)
+    assert hedger.delay() == 0.2
+
+
+def test_failed_attempt_falls_back_to_the_other() -> None:
+    hedger = Hedger(HedgePolicy(delay=0.01, max_rate=1.0))
+
+    async def failing(progress: Progress) -> str:
+        progress.admitted()
+        await asyncio.sleep(0.05)
+        raise RuntimeError("primary down")
+
+    assert asyncio.run(hedger.arun(failing, _async_attempt(0.1, "backup", []))) == "backup"
+    with pytest.raises(RuntimeError, match="primary down"):
+        asyncio.run(hedger.arun(failing, failing))
+
+
+def test_sync_hedge_tells_the_loser_to_stop() -> None:
+    hedger = Hedger(HedgePolicy(delay=0.05, max_rate=1.0))
+    log: List[str] = []
+    assert hedger.run(_sync_attempt(0.3, "primary", log), _sync_attempt(0.0, "backup", log)) == "backup"
+    time.sleep(0.4)
+    assert log == ["stopped primary"]
+    assert hedger.run(_sync_attempt(0.0, "primary", log), _sync_attempt(0.0, "backup", log)) == "primary"
+    assert hedger.hedged == 1
+
+
+def test_llm_step_hedges_to_another_model() -> None:
+    # Seeded fake models: fake-slow takes ~1.5s to its first token, fake-fast ~0.2s.
+    @llm_step(model="fake:fake-slow", seed=0, hedge=HedgePolicy(delay=0.05, max_rate=1.0, target="fake:fake-fast"))
+    def summarize(text: str) -> Answer:
+        """
+        Summarize {{ text }}.
+        """
+
+    start = time.perf_counter()
+    assert isinstance(summarize("a"), Answer)
+    assert time.perf_counter() - start < 1.0
+    assert summarize.hedger.backup_wins == 1
+
+
+def test_llm_step_async_hedge() -> None:
+    @llm_step_async(model="fake:fake-slow", seed=0, hedge=HedgePolicy(delay=0.05, max_rate=1.0, target="fake:fake-fast"))
+    async def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    async def main() -> List[str]:
+        return [await greet("a"), await greet("b")]
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, str) and r for r in results)
+    assert (greet.hedger.hedged, greet.hedger.backup_wins) == (2, 2)
+
+
+def test_adaptive_hedging_covers_multi_output_steps() -> None:
+    policy = HedgePolicy(min_samples=3, window=3, max_rate=1.0)
+
+    @llm_step_async(model="fake", latency=0.05, n=2, hedge=policy)
+    async def greet(name: str) -> List[str]:
+        """
+        Say hi to {{ name }}.
+        """
+
+    async def main() -> None:
+        for name in "abc":
+            assert len(await greet(name)) == 2
+
+    asyncio.run(main())
+    assert greet.hedger.delay() is not None and greet.hedger.hedged == 0
+
+    # Recent calls were much faster: the next one is slow enough to be hedged.
+    for _ in range(3):
+        greet.hedger.observe(0.001)
+    asyncio.run(main())
+    assert greet.hedger.hedged >= 1
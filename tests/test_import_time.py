@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+"""Import-time regression tests: `import slick` and light CLI commands must not load
+LangChain, pydantic or provider SDKs, and must stay within a time budget."""
+
+import json
+import subprocess
+import sys
+
+# Generous enough for slow CI machines; the heavy stack alone costs well over this.
+IMPORT_BUDGET_SECONDS = 0.3
+
+HEAVY = ["langchain", "langchain_core", "langchain_openai", "openai", "pydantic", "jinja2"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import slick
+from slick import llm_step
+
+@llm_step(model="m")
+def step(x: str) -> str:
+    '''{{ x }}'''
+
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def test_import_and_decorate_do_not_load_heavy_modules() -> None:
+    cp = subprocess.run([sys.executable, "-c", _PROBE % (HEAVY,)], capture_output=True, text=True)
+    assert cp.returncode == 0, cp.stderr
+    report = json.loads(cp.stdout)
+    assert report["loaded"] == []
+    assert report["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_cli_version_and_providers_stay_light() -> None:
+    probe = (
+        "import sys\n"
+        "sys.argv = ['slick'] + sys.argv[1:]\n"
+        "from slick import cli\n"
+        "cli.main()\n"
+        "print([m for m in %r if m in sys.modules])\n" % (HEAVY,)
+    )
+    for args in (["--version"], ["models", "providers"]):
+        cp = subprocess.run([sys.executable, "-c", probe, *args], capture_output=True, text=True)
+        assert cp.returncode == 0, cp.stderr
+        assert cp.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""Tests for per-provider rate limiting and adaptive concurrency."""
+
+import asyncio
+import random
+import time
+from typing import List
+
+import pytest
+
+from slick.limits import AdaptiveConcurrency, ProviderLimiter, TokenBucket, is_rate_limit_error
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+
+def test_token_bucket_reports_wait_once_exhausted() -> None:
+    bucket = TokenBucket(per_minute=60, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0, abs=0.05)
+
+
+def test_window_slow_starts_then_grows_additively() -> None:
+    window = AdaptiveConcurrency(initial=2, maximum=64)
+    for _ in range(4):
+        window.in_flight += 1
+        window.release("ok")
+    assert window.limit == 6
+
+    window.in_flight += 1
+    window.release("throttled")
+    assert window.limit == 3
+
+    for _ in range(3):
+        window.in_flight += 1
+        window.release("ok")
+    assert 3 < window.limit < 4
+
+
+def test_heavy_tailed_latency_does_not_shrink_window() -> None:
+    window = AdaptiveConcurrency(initial=64, maximum=64)
+    rng = random.Random(0)
+    for _ in range(500):
+        window.in_flight += 1
+        window.release("ok", latency=rng.lognormvariate(-1.5, 1.5))
+    assert window.limit == 64
+    assert window.baseline_latency is not None
+
+
+def test_is_rate_limit_error() -> None:
+    assert is_rate_limit_error(_RateLimited())
+    assert not is_rate_limit_error(ValueError("boom"))
+
+
+def test_limiter_bounds_in_flight_requests() -> None:
+    limiter = ProviderLimiter(initial_concurrency=3, max_concurrency=3)
+    active: List[int] = [0]
+    peak: List[int] = [0]
+
+    async def call() -> None:
+        async with limiter.limit():
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*(call() for _ in range(20)))
+
+    asyncio.run(main())
+    assert peak[0] == 3
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_limiter_shrinks_on_429() -> None:
+    limiter = ProviderLimiter(initial_concurrency=8)
+
+    async def main() -> None:
+        with pytest.raises(_RateLimited):
+            async with limiter.limit():
+                raise _RateLimited()
+
+    asyncio.run(main())
+    assert limiter.stats()["limit"] == 4
+
+
+def test_unthrottled_gather_is_not_slowed_down() -> None:
+    from slick import models
+
+    limiter = models.get_limiter("openai")
+
+    async def call() -> None:
+        async with limiter.limit():
+            await asyncio.sleep(0.2)
+
+    async def main() -> float:
+        start = time.monotonic()
+        await asyncio.gather(*(call() for _ in range(limiter.concurrency.maximum)))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 0.35
+
+
+def test_budgeted_limiter_starts_small() -> None:
+    assert ProviderLimiter(rpm=600).stats()["limit"] == 8
+    assert ProviderLimiter().stats()["limit"] == 64
+
+
+def test_get_limiter_uses_provider_settings() -> None:
+    from slick import models
+
+    models.configure_limits("groq", rpm=30, max_concurrency=2)
+    limiter = models.get_limiter("groq")
+    assert limiter is models.get_limiter("groq")
+    assert limiter.requests is not None and limiter.requests.rate == 0.5
+    assert limiter.concurrency.maximum == 2
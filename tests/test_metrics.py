@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+"""Tests for per-phase call metrics, the histogram registry and Prometheus export."""
+
+import asyncio
+from typing import Iterator, List
+
+import pytest
+from pydantic import BaseModel
+
+from slick import llm_step, llm_step_async, metrics
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+@pytest.fixture
+def records() -> Iterator[List[metrics.CallRecord]]:
+    collected: List[metrics.CallRecord] = []
+    metrics.add_sink(collected.append)
+    yield collected
+    metrics.clear_sinks()
+
+
+def test_sync_call_records_phases_tokens_and_tags(records: List[metrics.CallRecord]) -> None:
+    @llm_step(model="fake", latency=0.02)
+    def summarize(text: str) -> Answer:
+        """
+        Summarize {{ text }}.
+        """
+
+    with metrics.tags(tenant="acme"):
+        summarize("a")
+
+    (record,) = records
+    assert record.function.endswith("<locals>.summarize")
+    assert (record.provider, record.model) == ("fake", "fake")
+    assert record.status == "ok" and not record.streamed
+    assert set(record.phases) == {"client", "render", "ttft", "generation", "parse"}
+    assert record.phases["ttft"] >= 0.02
+    assert sum(record.phases.values()) == pytest.approx(record.duration, abs=1e-3)
+    assert record.input_tokens and record.output_tokens
+    assert record.tags == {"tenant": "acme"}
+
+
+def test_async_stream_records_queue_and_generation(records: List[metrics.CallRecord]) -> None:
+    @llm_step_async(model="fake", latency=0.02, chunk_rate=200.0, response_tokens=8)
+    async def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    async def main() -> None:
+        await greet("a")
+        async for _ in greet.astream("b"):
+            pass
+
+    asyncio.run(main())
+    plain, streamed = records
+    assert "queue" in plain.phases and not plain.streamed
+    assert streamed.streamed
+    assert streamed.phases["ttft"] >= 0.02
+    assert streamed.phases["generation"] > 0
+
+
+def test_batch_cache_hits_and_errors_are_recorded(
+    records: List[metrics.CallRecord], fake_responses: List[str]
+) -> None:
+    @llm_step(model="m", cache=True)
+    def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    greet.batch(["a", "b", "a"])
+    assert [r.status for r in records] == ["ok", "ok"]
+    greet("a")
+    assert records[-1].status == "cache_hit" and records[-1].phases == {}
+
+    @llm_step(model="m")
+    def failing(name: str) -> Answer:
+        """
+        Say hi to {{ name }}.
+        """
+
+    with pytest.raises(Exception):
+        failing("x")  # "ok" is not an Answer
+    assert records[-1].status == "error"
+    assert records[-1].error == "OutputParserException"
+    assert records[-1].phases["parse"] >= 0
+
+
+def test_coalesced_calls_are_recorded(records: List[metrics.CallRecord]) -> None:
+    @llm_step_async(model="fake", latency=0.05)
+    async def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    async def many():
+        return await asyncio.gather(*(greet("Ada") for _ in range(5)))
+
+    asyncio.run(many())
+    assert sorted(r.status for r in records) == ["coalesced"] * 4 + ["ok"]
+    shared = [r for r in records if r.status == "coalesced"]
+    assert all(r.phases == {} and r.input_tokens is None and r.duration >= 0.04 for r in shared)
+
+    registry = metrics.MetricsRegistry()
+    for record in records:
+        registry(record)
+    assert 'status="coalesced"} 4' in registry.to_prometheus()
+
+
+def test_no_timer_without_sinks(fake_responses: List[str]) -> None:
+    metrics.clear_sinks()
+
+    @llm_step(model="m")
+    def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    assert greet("a") == "ok"
+    from slick.decorators import _Step
+
+    assert _Step(greet, "m", {}).timer() is None
+
+
+def test_broken_sink_does_not_fail_calls(fake_responses: List[str]) -> None:
+    def broken(record: metrics.CallRecord) -> None:
+        raise RuntimeError("sink down")
+
+    metrics.add_sink(broken)
+    try:
+
+        @llm_step(model="m")
+        def greet(name: str) -> str:
+            """
+            Say hi to {{ name }}.
+            """
+
+        assert greet("a") == "ok"
+    finally:
+        metrics.remove_sink(broken)
+
+
+def test_histogram_quantiles() -> None:
+    hist = metrics.Histogram((0.1, 0.2, 0.5))
+    for value in (0.05, 0.15, 0.15, 0.3, 1.0):
+        hist.observe(value)
+    assert hist.counts == [1, 2, 1, 1]
+    assert hist.count == 5 and hist.sum == pytest.approx(1.65)
+    assert 0.1 <= hist.quantile(0.5) <= 0.2
+    assert hist.quantile(0.99) == 0.5  # +Inf bucket reports its lower bound
+    assert metrics.Histogram().quantile(0.5) is None
+
+
+def test_registry_prometheus_export() -> None:
+    registry = metrics.MetricsRegistry(buckets=(0.1, 1.0))
+    record = metrics.CallRecord(
+        function='f"n',
+        provider="openai",
+        model="gpt-4o-mini",
+        status="ok",
+        duration=0.5,
+        phases={"ttft": 0.4, "parse": 0.01},
+        input_tokens=10,
+        output_tokens=3,
+        retries=1,
+    )
+    registry(record)
+    registry(metrics.CallRecord(function='f"n', provider="openai", model="gpt-4o-mini", status="cache_hit", duration=0.0))
+
+    text = registry.to_prometheus()
+    labels = 'function="f\\"n",provider="openai",model="gpt-4o-mini"'
+    assert "# TYPE slick_call_duration_seconds histogram" in text
+    assert f'slick_call_duration_seconds_bucket{{{labels},le="0.1"}} 0' in text
+    assert f'slick_call_duration_seconds_bucket{{{labels},le="1.0"}} 1' in text
+    assert f'slick_call_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"slick_call_duration_seconds_count{{{labels}}} 1" in text
+    assert f'slick_call_phase_seconds_count{{{labels},phase="ttft"}} 1' in text
+    assert f'slick_calls_total{{{labels},status="cache_hit"}} 1' in text
+    assert f'slick_tokens_total{{{labels},direction="input"}} 10' in text
+    assert f"slick_retries_total{{{labels}}} 1" in text
+    assert registry.counter("slick_calls_total", status="ok") == 1
+    assert registry.summary()['f"n']["ttft"]["count"] == 1
+
+
+def test_prometheus_counters_keep_full_precision() -> None:
+    registry = metrics.MetricsRegistry()
+    registry(metrics.CallRecord(function="f", provider="openai", model="m", status="ok", duration=0.1, input_tokens=1234567))
+    registry._inc("slick_retries_total", (("function", "f"),), 0.1 + 0.2)
+    text = registry.to_prometheus()
+    assert 'direction="input"} 1234567\n' in text
+    assert f'slick_retries_total{{function="f"}} {0.1 + 0.2!r}' in text
+
+
+def test_percentile_is_nearest_rank() -> None:
+    values = list(range(1, 101))
+    assert metrics.percentile(values, 50) == 50
+    assert metrics.percentile(values, 95) == 95
+    assert metrics.percentile(values, 99) == 99
+    assert metrics.percentile([3.0], 99) == 3.0
+    assert metrics.percentile([], 50) is None
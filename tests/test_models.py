@@ -53,3 +53,43 @@ def test_create_chat_model_not_implemented() -> None:
     pass
 
 
+class _CountingProvider:
+    built = 0
+
+    @staticmethod
+    def make_chat(model: str, **kwargs):
+        _CountingProvider.built += 1
+        return {"model": model, **kwargs}
+
+
+def test_create_chat_model_reuses_pooled_instances(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Identical configurations share one instance; different kwargs get their own."""
+
+    from slick import models
+
+    monkeypatch.setattr(models, "_load_provider", lambda name: _CountingProvider)
+    models.clear_chat_model_cache()
+    _CountingProvider.built = 0
+
+    a = models.create_chat_model(model="m", provider="openai", temperature=0.1, stop=["x"])
+    b = models.create_chat_model(provider="openai", model="m", stop=["x"], temperature=0.1)
+    c = models.create_chat_model(model="m", provider="openai", temperature=0.2, stop=["x"])
+
+    assert a is b
+    assert a is not c
+    assert _CountingProvider.built == 2
+
+
+def test_chat_model_pool_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    from slick import models
+
+    monkeypatch.setattr(models, "_load_provider", lambda name: _CountingProvider)
+    monkeypatch.setattr(models, "CHAT_MODEL_POOL_SIZE", 2)
+    models.clear_chat_model_cache()
+
+    first = models.create_chat_model(model="m1", provider="openai")
+    models.create_chat_model(model="m2", provider="openai")
+    models.create_chat_model(model="m3", provider="openai")
+
+    assert models.create_chat_model(model="m1", provider="openai") is not first
+    models.clear_chat_model_cache()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+"""Tests for incremental partial-object parsing of streamed JSON."""
+
+import asyncio
+import json
+from typing import Any, List
+
+import pytest
+from pydantic import BaseModel, create_model
+
+from slick import llm_step, llm_step_async, partial
+from slick.partial import PartialModelStream
+
+
+class Article(BaseModel):
+    title: str
+    tags: List[str]
+    body: str
+
+
+DOC = '```json\n{"title": "Hi", "tags": ["a", "b"], "body": "long text"}\n```'
+
+
+def _feed_all(text: str, size: int = 3) -> list:
+    stream = PartialModelStream(Article)
+    updates = [stream.feed(text[i : i + size]) for i in range(0, len(text), size)]
+    return [u for u in updates if u is not None] + [stream.finish()]
+
+
+def test_fields_complete_in_order() -> None:
+    updates = _feed_all(DOC)
+    completions = [name for u in updates for name in u.newly_completed]
+    assert completions == ["title", "tags", "body"]
+
+    first_title = next(u for u in updates if "title" in u.completed)
+    assert first_title.value.title == "Hi"
+    assert "body" not in first_title.completed
+
+    final = updates[-1]
+    assert final.done
+    assert final.value == Article(title="Hi", tags=["a", "b"], body="long text")
+
+
+def test_partial_values_grow() -> None:
+    updates = _feed_all(DOC, size=1)
+    bodies = [u.value.body for u in updates if "body" in u.value.__dict__]
+    assert bodies[0] != "long text"
+    assert bodies[-1] == "long text"
+
+
+def test_long_stream_is_parsed_incrementally(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A few-KB object in small chunks: each top-level member is parsed about once."""
+
+    Wide = create_model("Wide", **{f"f{i}": (str, ...) for i in range(150)}, body=(str, ...))
+    data = {f"f{i}": f"value number {i} " * 2 for i in range(150)}
+    data["body"] = "word " * 200
+    doc = json.dumps(data)
+    assert len(doc) > 5000
+
+    parsed = [0]
+    real_loads = json.loads
+
+    def counting_loads(s: str, **kwargs: Any) -> Any:
+        parsed[0] += len(s)
+        return real_loads(s, **kwargs)
+
+    monkeypatch.setattr(partial.json, "loads", counting_loads)
+    stream = partial.PartialModelStream(Wide)
+    updates = [stream.feed(doc[i : i + 4]) for i in range(0, len(doc), 4)]
+    final = stream.finish()
+
+    assert final.value.model_dump() == data
+    assert len(final.completed) == 151
+    bodies = [u.value.body for u in updates if u is not None and "body" in u.value.__dict__]
+    assert len(bodies) > 100 and bodies[-1] == data["body"]
+    # Re-reading the whole buffer per chunk would parse ~len(doc)**2 / 8 characters.
+    assert parsed[0] < len(doc) * 40
+
+
+def test_incomplete_stream_raises() -> None:
+    stream = PartialModelStream(Article)
+    stream.feed('{"title": "x"')
+    with pytest.raises(ValueError):
+        stream.finish()
+
+
+def test_step_stream_partial(fake_responses: List[str]) -> None:
+    fake_responses[:] = [DOC]
+
+    @llm_step(model="m")
+    def write(topic: str) -> Article:
+        """
+        Write about {{ topic }}.
+        """
+
+    updates = list(write.stream_partial("cats"))
+    assert updates[-1].done and updates[-1].value.tags == ["a", "b"]
+    assert any(not u.done and "title" in u.completed for u in updates)
+
+
+def test_step_astream_partial_requires_model(fake_responses: List[str]) -> None:
+    fake_responses[:] = [DOC]
+
+    @llm_step_async(model="m")
+    async def write(topic: str) -> Article:
+        """
+        Write about {{ topic }}.
+        """
+
+    @llm_step_async(model="m")
+    async def plain(topic: str) -> str:
+        """
+        Write about {{ topic }}.
+        """
+
+    async def main() -> list:
+        return [u async for u in write.astream_partial("cats")]
+
+    assert asyncio.run(main())[-1].value.title == "Hi"
+    with pytest.raises(TypeError):
+        plain.astream_partial("cats")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+"""Tests for step graphs (`slick.pipeline`)."""
+
+import asyncio
+import time
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from slick import Pipeline, llm_step_async
+from slick.pipeline import PipelineError
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+async def _slow(value: str, delay: float = 0.2) -> str:
+    await asyncio.sleep(delay)
+    return value
+
+
+def _diamond() -> Pipeline:
+    pipe = Pipeline()
+
+    @pipe.node()
+    async def left(doc: str) -> str:
+        return await _slow(f"L({doc})")
+
+    @pipe.node()
+    async def right(doc: str) -> str:
+        return await _slow(f"R({doc})")
+
+    @pipe.node()
+    def join(left: str, right: str, sep: str = "+") -> str:  # sync: runs in a worker thread
+        return left + sep + right
+
+    return pipe
+
+
+def test_independent_nodes_run_concurrently() -> None:
+    pipe = _diamond()
+    assert pipe.inputs == ["doc"] and pipe.deps("join") == ("left", "right")
+
+    start = time.perf_counter()
+    result = pipe.run(doc="d")
+    elapsed = time.perf_counter() - start
+    assert result["join"] == "L(d)+R(d)"
+    assert elapsed < 0.35  # both 0.2s branches overlap
+    trace = result.trace
+    assert {t.status for t in trace.nodes.values()} == {"ok"}
+    assert trace.nodes["join"].ready >= max(trace.nodes["left"].end, trace.nodes["right"].end)
+    assert trace.critical_path()[-1] == "join" and len(trace.critical_path()) == 2
+    assert "critical path" in trace.summary()
+
+
+def test_streams_events_as_nodes_finish() -> None:
+    pipe = Pipeline()
+    pipe.add(lambda doc: _slow("fast", 0.01), name="fast")
+    pipe.add(lambda doc: _slow("slow", 0.2), name="slow")
+
+    async def main() -> List[str]:
+        return [event.name async for event in pipe.astream(doc="d")]
+
+    assert asyncio.run(main()) == ["fast", "slow"]
+
+
+def test_steps_as_nodes(fake_responses: List[str]) -> None:
+    fake_responses[:] = ['{"summary": "short"}', "Short title"]
+
+    @llm_step_async(model="m")
+    async def summarize(doc: str) -> Answer:
+        """
+        Summarize {{ doc }}
+        """
+
+    @llm_step_async(model="m")
+    async def title(text: str) -> str:
+        """
+        Title for {{ text }}
+        """
+
+    pipe = Pipeline()
+    pipe.add(summarize)
+    pipe.add(lambda summarize: summarize.summary, name="text")
+    pipe.add(title, inputs={"text": "text"})
+    result = asyncio.run(pipe.arun(doc="long text"))
+    assert result["summarize"] == Answer(summary="short") and result["title"] == "Short title"
+
+
+def test_failures_skip_dependents_only() -> None:
+    def boom(doc: str) -> str:
+        raise RuntimeError("nope")
+
+    pipe = Pipeline()
+    pipe.add(boom)
+    pipe.add(lambda boom: boom, name="after")
+    pipe.add(lambda doc: doc.upper(), name="other")
+    with pytest.raises(PipelineError) as info:
+        pipe.run(doc="d")
+    error = info.value
+    assert list(error.errors) == ["boom"] and isinstance(error.errors["boom"], RuntimeError)
+    assert error.result.outputs == {"other": "D"}
+    assert error.result.trace.nodes["after"].status == "skipped"
+
+
+def test_validation_and_pruning() -> None:
+    pipe = _diamond()
+    with pytest.raises(TypeError, match="doc"):
+        pipe.run()
+    with pytest.raises(ValueError, match="Duplicate"):
+        pipe.add(lambda doc: doc, name="left")
+    with pytest.raises(ValueError, match="no parameter"):
+        pipe.add(lambda doc: doc, name="x", inputs={"nope": "doc"})
+    assert list(pipe.run(outputs=["left"], doc="d").outputs) == ["left"]
+
+    loop = Pipeline()
+    loop.add(lambda b: b, name="a")
+    loop.add(lambda a: a, name="b")
+    with pytest.raises(ValueError, match="cycle"):
+        loop.run()
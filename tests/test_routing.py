@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+"""Tests for multi-provider routing, health tracking and circuit breaking."""
+
+import asyncio
+import time
+from typing import Any, Iterator, List
+
+import pytest
+
+from slick import llm_step, llm_step_async, models, routing
+from slick.providers.fake import FakeChatModel
+from slick.routing import Router, RoutingError
+
+
+@pytest.fixture(autouse=True)
+def _fresh_health() -> Iterator[None]:
+    routing.reset()
+    models.clear_chat_model_cache()
+    yield
+    routing.reset()
+    models.clear_chat_model_cache()
+
+
+@pytest.fixture
+def outage(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """Fake provider whose model answers with its own name; models listed here fail."""
+
+    down: List[str] = ["down"]
+
+    class _Provider:
+        @staticmethod
+        def make_chat(model: str, **kwargs: Any) -> FakeChatModel:
+            return FakeChatModel(responses=[model], error_rate=1.0 if model in down else 0.0, latency=0.0)
+
+    monkeypatch.setattr(models, "_load_provider", lambda name: _Provider)
+    return down
+
+
+def test_router_validation() -> None:
+    assert Router(["fake:a", "fake:b"]).targets == ("fake:a", "fake:b")
+    with pytest.raises(ValueError):
+        Router([])
+    with pytest.raises(ValueError):
+        Router(["fake:a"], weights=[1, 2])
+    with pytest.raises(ValueError):
+        Router(["fake:a"], strategy="random")
+
+
+def test_fails_over_to_the_next_target(outage: List[str]) -> None:
+    assert models.create_chat_model(model=["fake:down", "fake:up"]) is models.create_chat_model(
+        model=["fake:down", "fake:up"]
+    )
+    # No exploration: untried targets tie, so "down" is always tried first.
+    chat = models.create_chat_model(model=Router(["fake:down", "fake:up"], explore=0))
+    result = chat.invoke("hi")
+    assert result.content == "up"
+    assert routing.health("fake:down").failures == 1
+    assert routing.health("fake:up").latency is not None
+
+    outage.append("up")
+    models.clear_chat_model_cache()  # rebuild "up" as failing
+    chat = models.create_chat_model(model=Router(["fake:down", "fake:up"], explore=0))
+    with pytest.raises(RoutingError) as info:
+        chat.invoke("hi")
+    assert [target for target, _ in info.value.errors] == ["fake:up", "fake:down"]
+
+
+def test_breaker_opens_and_probes_after_cooldown() -> None:
+    router = Router(["fake:a", "fake:b"], failure_threshold=2, cooldown=0.05, explore=0)
+    router.record_failure("fake:a")
+    assert router.candidates()[0] == "fake:b"  # only-failed targets rank last
+    router.record_failure("fake:a")
+    assert routing.health("fake:a").state == "open"
+    assert router.candidates() == ["fake:b"]
+
+    time.sleep(0.06)
+    assert router.candidates()[-1] == "fake:a"  # half-open: one probe
+    assert router.candidates() == ["fake:b"]
+    router.record_success("fake:a", 0.01)
+    assert routing.health("fake:a").state == "closed"
+
+
+def test_latency_ranking_weights_and_priority() -> None:
+    fast_last = Router(["fake:slow", "fake:fast"], explore=0)
+    assert fast_last.candidates() == ["fake:slow", "fake:fast"]  # untried: listed order
+    fast_last.record_success("fake:slow", 1.0)
+    fast_last.record_success("fake:fast", 0.2)
+    assert fast_last.candidates() == ["fake:fast", "fake:slow"]
+
+    weighted = Router(["fake:slow", "fake:fast"], weights=[10, 1], explore=0)
+    assert weighted.candidates() == ["fake:slow", "fake:fast"]
+
+    priority = Router(["fake:slow", "fake:fast"], strategy="priority")
+    assert priority.candidates() == ["fake:slow", "fake:fast"]
+
+
+def test_stream_fails_over_before_the_first_chunk(outage: List[str]) -> None:
+    chat = models.create_chat_model(model=Router(["fake:down", "fake:up"], strategy="priority"))
+    assert "".join(chunk.content for chunk in chat.stream("hi")) == "up"
+
+
+def test_routed_steps(outage: List[str]) -> None:
+    @llm_step(model=["fake:down", "fake:up"])
+    def greet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    @llm_step_async(model=Router(["fake:down", "fake:up"], strategy="priority"))
+    async def agreet(name: str) -> str:
+        """
+        Say hi to {{ name }}.
+        """
+
+    assert greet("a") == "up"
+    assert asyncio.run(agreet("b")) == "up"
+    assert greet.batch(["c", "d"]) == ["up", "up"]
+
+
+def test_provider_cannot_be_combined_with_a_route() -> None:
+    with pytest.raises(ValueError):
+        models.create_chat_model(model=["fake:a"], provider="openai")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+"""Tests for the resumable JSONL runner (`slick.runner`) and `slick run`."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from pydantic import BaseModel
+
+from slick import llm_step, runner
+
+
+class Answer(BaseModel):
+    summary: str
+
+
+def _lines(path: Path) -> List[Dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _write_records(path: Path, records: List[Any]) -> Path:
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    return path
+
+
+def test_runs_a_step_over_records(tmp_path: Path, fake_responses: List[str]) -> None:
+    fake_responses[:] = ['{"summary": "ok"}']
+
+    @llm_step(model="m")
+    def summarize(text: str) -> Answer:
+        """
+        Summarize {{ text }}.
+        """
+
+    source = _write_records(tmp_path / "in.jsonl", [{"text": "a"}, "b", ["c"], {"nope": 1}])
+    out = tmp_path / "out.jsonl"
+    stats = runner.run_jsonl(summarize, str(source), str(out), concurrency=2)
+    assert (stats.ok, stats.errors, stats.skipped) == (3, 1, 0)
+    by_index = {entry["index"]: entry for entry in _lines(out)}
+    assert sorted(by_index) == [0, 1, 2, 3]
+    assert by_index[0] == {"index": 0, "input": {"text": "a"}, "output": {"summary": "ok"}, "error": None}
+    assert by_index[2]["input"] == ["c"] and by_index[2]["output"] == {"summary": "ok"}
+    assert by_index[3]["error"]["type"] == "TypeError"  # no parameter named "nope"
+
+
+def test_interrupted_run_resumes_without_redoing_records(tmp_path: Path) -> None:
+    source = _write_records(tmp_path / "in.jsonl", list(range(50)))
+    out = tmp_path / "out.jsonl"
+    calls: List[int] = []
+
+    async def crashing(n: int) -> int:
+        if n == 30:
+            raise KeyboardInterrupt
+        calls.append(n)
+        return n * 2
+
+    with pytest.raises(KeyboardInterrupt):
+        runner.run_jsonl(crashing, str(source), str(out), concurrency=4)
+    first = {entry["index"] for entry in _lines(out)}
+    assert 0 < len(first) < 50 and 30 not in first
+    with out.open("a") as f:
+        f.write('{"index": 49, "inp')  # a line cut short by the crash
+
+    def double(n: int) -> int:
+        calls.append(n)
+        return n * 2
+
+    calls.clear()
+    stats = runner.run_jsonl(double, str(source), str(out), concurrency=4)
+    assert stats.skipped == len(first)
+    assert sorted(calls) == sorted(set(range(50)) - first)
+    entries = _lines(out)
+    assert sorted(e["index"] for e in entries) == list(range(50))
+    assert all(e["output"] == e["input"] * 2 for e in entries)
+
+
+def test_errors_are_recorded_and_retried_on_request(tmp_path: Path) -> None:
+    source = _write_records(tmp_path / "in.jsonl", [1, 0, 2])
+    out = tmp_path / "out.jsonl"
+    stats = runner.run_jsonl(lambda n: 10 // n, str(source), str(out), include_input=False)
+    assert (stats.ok, stats.errors) == (2, 1)
+    (failed,) = [e for e in _lines(out) if e["error"]]
+    assert failed["index"] == 1 and failed["output"] is None and "input" not in failed
+    assert failed["error"]["type"] == "ZeroDivisionError"
+
+    assert runner.run_jsonl(lambda n: 0, str(source), str(out)).skipped == 3
+    stats = runner.run_jsonl(lambda n: -1, str(source), str(out), retry_errors=True)
+    assert (stats.ok, stats.skipped) == (1, 2)
+    assert _lines(out)[-1]["index"] == 1 and _lines(out)[-1]["output"] == -1
+
+
+def test_completed_tracker_stays_sparse() -> None:
+    done = runner._Completed()
+    for index in (2, 0, 1, 5):
+        done.add(index)
+    assert done.watermark == 3 and done.above == {5}
+    assert 1 in done and 5 in done and 4 not in done
+
+
+def test_cli_run(tmp_path: Path) -> None:
+    module = tmp_path / "steps.py"
+    module.write_text(
+        "from slick import llm_step\n\n"
+        "@llm_step(model='fake:fake', responses=['hi there'])\n"
+        "def greet(name: str) -> str:\n"
+        "    '''\n    Say hi to {{ name }}.\n    '''\n"
+    )
+    source = _write_records(tmp_path / "in.jsonl", [{"name": "a"}, {"name": "b"}])
+    out = tmp_path / "out.jsonl"
+    cmd = [sys.executable, "-m", "slick.cli", "run", f"{module}:greet", "-i", str(source), "-o", str(out)]
+    cp = subprocess.run(cmd, capture_output=True, text=True)
+    assert cp.returncode == 0, cp.stderr
+    assert "2 ok" in cp.stderr
+    assert [e["output"] for e in _lines(out)] == ["hi there", "hi there"]
+
+    cp = subprocess.run(cmd, capture_output=True, text=True)
+    assert "2 already done" in cp.stderr
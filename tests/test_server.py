@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+"""Tests for the `slick serve` daemon (`slick.server`) and its client (`slick.client`)."""
+
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from slick import client
+from slick.server import Server
+
+STEPS = (
+    "from pydantic import BaseModel\n"
+    "from slick import llm_step_async\n\n"
+    "class Answer(BaseModel):\n"
+    "    summary: str\n\n"
+    "@llm_step_async(model='fake:fake', responses=['{\"summary\": \"ok\"}'])\n"
+    "async def summarize(text: str) -> Answer:\n"
+    "    '''\n    Summarize {{ text }}.\n    '''\n\n"
+    "def fail(n: int) -> int:\n"
+    "    raise ValueError(f'bad {n}')\n"
+)
+
+
+@pytest.fixture
+def socket_path(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    # Unix socket paths are limited to ~100 characters; pytest's tmp_path can be longer.
+    directory = tempfile.mkdtemp(prefix="slick-")
+    path = os.path.join(directory, "d.sock")
+    monkeypatch.setenv("SLICK_SOCKET", path)
+    yield path
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def daemon(socket_path: str) -> Iterator[Server]:
+    server = Server(socket_path)
+    ready = threading.Event()
+    thread = threading.Thread(target=lambda: asyncio.run(server.serve(ready=ready.set)), daemon=True)
+    thread.start()
+    assert ready.wait(10)
+    yield server
+    live = client.connect(socket_path)
+    if live is not None:
+        with live:
+            live.shutdown()
+    thread.join(10)
+    assert not os.path.exists(socket_path)
+
+
+def test_connect_without_daemon(socket_path: str) -> None:
+    assert client.connect() is None
+    Path(socket_path).touch()  # stale socket file from a crashed daemon
+    assert client.connect() is None
+
+
+def test_call_and_reload(daemon: Server, tmp_path: Path) -> None:
+    steps = tmp_path / "steps.py"
+    steps.write_text(STEPS)
+    with client.connect() as conn:
+        info = conn.ping()
+        assert info["pid"] == os.getpid()
+        assert conn.call(f"{steps}:summarize", "text") == {"summary": "ok"}
+        assert conn.call(f"{steps}:summarize", text="again") == {"summary": "ok"}
+        with pytest.raises(client.DaemonError) as error:
+            conn.call(f"{steps}:fail", 3)
+        assert error.value.type == "ValueError" and "bad 3" in str(error.value)
+        assert conn.ping()["functions"] == [f"{steps}:fail", f"{steps}:summarize"]
+
+        steps.write_text(STEPS + "\ndef fail(n: int) -> int:\n    return -n\n")
+        os.utime(steps, ns=(1, 1))  # make the change visible even within mtime granularity
+        assert conn.call(f"{steps}:fail", 3) == -3
+        assert "lorem" in conn.chat("Hi", model="fake:fake")
+        with pytest.raises(client.DaemonError, match="Unknown operation"):
+            conn.request("nope")
+
+
+def test_functions_from_other_projects_do_not_collide(tmp_path: Path) -> None:
+    server = Server(str(tmp_path / "d.sock"))
+    for project in ("a", "b"):
+        (tmp_path / project).mkdir()
+        (tmp_path / project / "steps.py").write_text(f"def name() -> str:\n    return {project!r}\n")
+    first = server.function("steps.py:name", str(tmp_path / "a"))
+    second = server.function("steps.py:name", str(tmp_path / "b"))
+    assert (first(), second()) == ("a", "b")
+    assert first.__module__ != second.__module__
+
+    path = list(sys.path)
+    with pytest.raises(ValueError, match="where it was started"):
+        server.function("steps:name", str(tmp_path / "a"))
+    assert sys.path == path
+
+
+def test_second_daemon_refuses_the_socket(daemon: Server, socket_path: str) -> None:
+    with pytest.raises(RuntimeError, match="already listening"):
+        asyncio.run(Server(socket_path).serve())
+
+
+def test_cli_uses_the_daemon(daemon: Server, tmp_path: Path, socket_path: str) -> None:
+    steps = tmp_path / "steps.py"
+    steps.write_text(STEPS)
+    source = tmp_path / "in.jsonl"
+    source.write_text('{"text": "a"}\n{"text": "b"}\n')
+    out = tmp_path / "out.jsonl"
+    env = {**os.environ, "SLICK_SOCKET": socket_path}
+    cmd = [sys.executable, "-m", "slick.cli", "run", f"{steps}:summarize", "-i", str(source), "-o", str(out)]
+    cp = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    assert cp.returncode == 0, cp.stderr
+    assert "2 ok" in cp.stderr
+    assert [json.loads(line)["output"] for line in out.read_text().splitlines()] == [{"summary": "ok"}] * 2
+    with client.connect() as conn:
+        assert f"{steps}:summarize" in conn.ping()["functions"]  # ran inside the daemon
+
+    cmd = [sys.executable, "-m", "slick.cli", "models", "test", "--model", "fake:fake", "--prompt", "hi"]
+    cp = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    assert "lorem" in cp.stdout
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+"""Tests for single-flight coalescing of identical in-flight calls."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from slick import llm_step, llm_step_async
+from slick.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution() -> None:
+    flights = SingleFlight()
+    calls: List[int] = []
+
+    async def work() -> object:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    async def main() -> List[object]:
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert len(flights) == 0
+
+
+def test_failures_reach_every_waiter() -> None:
+    flights = SingleFlight()
+
+    async def boom() -> None:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def main() -> List[BaseException]:
+        return await asyncio.gather(*(flights.do("k", boom) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert errors[0] is errors[1] is errors[2]
+
+
+def test_work_survives_one_waiter_cancelling() -> None:
+    flights = SingleFlight()
+
+    async def work() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main() -> str:
+        first = asyncio.ensure_future(flights.do("k", work))
+        second = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_identical_async_step_calls_send_one_request(fake_responses: List[str]) -> None:
+    fake_responses[:] = ["a", "b"]
+
+    @llm_step_async(model="m")
+    async def echo(text: str) -> str:
+        """
+        Echo {{ text }}
+        """
+
+    async def main() -> List[str]:
+        return await asyncio.gather(*(echo("same", stream=False) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["a"] * 5
+
+
+def test_batch_collapses_duplicate_inputs(fake_responses: List[str]) -> None:
+    fake_responses[:] = ["a", "b"]
+
+    @llm_step(model="m")
+    def echo(text: str) -> str:
+        """
+        Echo {{ text }}
+        """
+
+    assert echo.batch(["x", "x", {"text": "y"}, "x"], max_concurrency=1) == ["a", "a", "b", "a"]
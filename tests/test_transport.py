@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+"""Tests for shared per-provider HTTP clients and warmup."""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+from slick import config, models, transport
+
+
+@pytest.fixture(autouse=True)
+def _reset_transport() -> Iterator[None]:
+    transport.reset()
+    yield
+    transport.reset()
+
+
+@pytest.fixture
+def server() -> Iterator[List[str]]:
+    """A local HTTP server recording the request lines it sees."""
+
+    seen: List[str] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_HEAD(self) -> None:  # noqa: N802
+            seen.append(f"{self.command} {self.path}")
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    # Threaded: the keep-alive connection of one client must not block the other.
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    seen.append(f"http://127.0.0.1:{httpd.server_address[1]}")
+    yield seen
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_clients_are_shared_and_rebuilt_on_settings_change() -> None:
+    client = transport.get_client("openai")
+    assert transport.get_client("openai") is client
+    assert transport.get_client("groq") is not client
+    assert transport.get_async_client("openai") is transport.get_async_client("openai")
+
+    transport.configure_transport("openai", max_connections=7)
+    assert transport.settings_for("openai").max_connections == 7
+    assert transport.get_client("openai") is not client
+
+    with pytest.raises(ValueError):
+        transport.configure_transport("openai", pool="big")
+
+
+def test_settings_come_from_config_files(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = tmp_path / "config.toml"
+    path.write_text("[providers.groq]\nmax_keepalive_connections = 3\nconnect_timeout = 1.5\nhttp2 = false\n")
+    monkeypatch.setenv("SLICK_CONFIG", str(path))
+    config.clear_cache()
+    settings = transport.settings_for("groq")
+    assert (settings.max_keepalive_connections, settings.connect_timeout, settings.http2) == (3, 1.5, False)
+    transport.configure_transport("groq", connect_timeout=2.0)
+    assert transport.settings_for("groq").connect_timeout == 2.0
+
+
+def test_openai_chat_models_use_the_shared_clients(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    models.clear_chat_model_cache()
+    chat = models.create_chat_model(model="gpt-4o-mini", provider="openai")
+    assert chat.http_client is transport.get_client("openai")
+    assert chat.http_async_client is transport.get_async_client("openai")
+    models.clear_chat_model_cache()
+
+
+def test_warmup_connects_to_configured_base_url(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, server: List[str]
+) -> None:
+    base_url = server[0]
+    path = tmp_path / "config.toml"
+    path.write_text(f'[providers.openai]\nbase_url = "{base_url}/v1"\n')
+    monkeypatch.setenv("SLICK_CONFIG", str(path))
+    config.clear_cache()
+
+    assert transport.warmup(["openai"]) == {"openai": None}
+    assert asyncio.run(transport.awarmup(["openai"])) == {"openai": None}
+    assert server[1:] == ["HEAD /v1", "HEAD /v1"]
+
+
+def test_warmup_reports_errors_and_builds_chat_models(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(transport, "BASE_URLS", {**transport.BASE_URLS, "groq": "http://127.0.0.1:9"})
+    result = transport.warmup(["groq"], timeout=1.0)
+    assert result["groq"] and "Error" in result["groq"]
+
+    models.clear_chat_model_cache()
+    assert transport.warmup(["fake:fake-fast"]) == {"fake": None}
+    assert len(models._chat_pool) == 1
+    models.clear_chat_model_cache()